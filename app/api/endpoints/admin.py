@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import asyncio
+import hmac
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+
+from app.core.config import settings
+from app.core.container import Container, get_container
+from app.core.profiler import StackSampler, TaskFilter
+
+router = APIRouter()
+
+PROFILE_HEADER = "x-profile"
+
+# Set while a request is profiled; tasks it creates inherit it and join its profile.
+_request_tasks: ContextVar[TaskFilter | None] = ContextVar("request_tasks", default=None)
+
+
+def is_admin(request: Request) -> bool:
+    token = request.headers.get("x-admin-token")
+    return bool(settings.admin_token) and token is not None and hmac.compare_digest(token, settings.admin_token)
+
+
+def require_admin(request: Request) -> None:
+    if not settings.admin_token:
+        raise HTTPException(status_code=404, detail="Admin endpoints are disabled; set ADMIN_TOKEN")
+    if not is_admin(request):
+        raise HTTPException(status_code=403, detail="Missing or invalid X-Admin-Token")
+
+
+def wants_request_profile(request: Request) -> bool:
+    """True when the caller asked (with a valid admin token) to profile this request."""
+    if request.headers.get(PROFILE_HEADER) is None:
+        return False
+    require_admin(request)
+    return True
+
+
+def _install_task_tracking(loop: asyncio.AbstractEventLoop) -> None:
+    """Wraps the loop's task factory so tasks created by a profiled request are tracked."""
+    previous = loop.get_task_factory()
+    if getattr(previous, "tracks_request_tasks", False):
+        return
+
+    def factory(loop, coro, **kwargs):
+        task = previous(loop, coro, **kwargs) if previous is not None else asyncio.Task(coro, loop=loop, **kwargs)
+        tracked = _request_tasks.get()
+        if tracked is not None:
+            tracked.add(task)
+        return task
+
+    factory.tracks_request_tasks = True
+    loop.set_task_factory(factory)
+
+
+@asynccontextmanager
+async def request_profile(enabled: bool):
+    """Samples the block's own work on the event-loop thread; yields None when not enabled.
+
+    Only stacks running the current task, or a task it started (directly or not), are
+    counted, so concurrent requests on the same loop stay out of the profile. Work handed to
+    worker threads is not sampled.
+    """
+    if not enabled:
+        yield None
+        return
+    _install_task_tracking(asyncio.get_running_loop())
+    tasks = TaskFilter([asyncio.current_task()])
+    token = _request_tasks.set(tasks)
+    sampler = StackSampler(interval_ms=settings.profile_interval_ms, thread_ids={threading.get_ident()}, frame_filter=tasks)
+    sampler.start()
+    try:
+        yield sampler
+    finally:
+        sampler.stop()
+        _request_tasks.reset(token)
+
+
+@router.get("/profile", dependencies=[Depends(require_admin)])
+async def profile_worker(
+    seconds: float = Query(10.0, gt=0, le=120),
+    format: Literal["collapsed", "speedscope"] = "collapsed",
+    threads: Literal["all", "loop"] = "all",
+    interval_ms: float | None = Query(None, ge=1, le=1000),
+    container: Container = Depends(get_container),
+) -> Response:
+    """Samples this worker's stacks for ``seconds`` and returns a flamegraph-ready profile."""
+    if container.profile_lock.locked():
+        raise HTTPException(status_code=409, detail="A profile is already running on this worker")
+    async with container.profile_lock:
+        sampler = StackSampler(
+            interval_ms=interval_ms or settings.profile_interval_ms,
+            thread_ids={threading.get_ident()} if threads == "loop" else None,
+        )
+        sampler.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            sampler.stop()
+
+    name = f"worker-{os.getpid()}-{int(time.time())}"
+    headers = {"X-Worker-Pid": str(os.getpid()), "X-Profile-Samples": str(sampler.samples)}
+    if format == "speedscope":
+        headers["Content-Disposition"] = f'attachment; filename="{name}.speedscope.json"'
+        return JSONResponse(sampler.speedscope(name=name), headers=headers)
+    headers["Content-Disposition"] = f'attachment; filename="{name}.collapsed.txt"'
+    return PlainTextResponse(sampler.collapsed(), headers=headers)
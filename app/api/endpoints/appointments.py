@@ -1,13 +1,13 @@
-from fastapi import APIRouter
-from app.services.appointment_manager import AppointmentManager
+from fastapi import APIRouter, Depends
+
+from app.core.container import Container, get_container
 
 router = APIRouter()
-appointment_manager = AppointmentManager()
 
 @router.get("/insights")
-async def get_test_insights():
+async def get_test_insights(container: Container = Depends(get_container)):
     """
     Test endpoint to fetch dummy improvement insights generated from transcripts.
     """
-    insights = await appointment_manager.get_improvement_insights()
+    insights = await container.appointment_manager.get_improvement_insights()
     return {"status": "success", "data": insights}
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+
+from app.api.endpoints.admin import require_admin
+from app.core.container import Container, get_container
+from app.core.startup import provider_available
+from app.services.export_service import EXPORT_FORMATS, EXPORT_KINDS, parse_timestamp, validate_export_args
+
+router = APIRouter()
+
+_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+@router.get("/{kind}", dependencies=[Depends(require_admin)])
+async def export_records(
+    kind: str,
+    format: str = "ndjson",
+    since: datetime | None = None,
+    until: datetime | None = None,
+    after: str | None = None,
+    limit: int | None = None,
+    container: Container = Depends(get_container),
+) -> StreamingResponse:
+    if kind not in EXPORT_KINDS:
+        raise HTTPException(status_code=404, detail=f"Unknown export kind: {kind}")
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported export format: {format}")
+    if format == "parquet" and not provider_available("pyarrow"):
+        raise HTTPException(status_code=400, detail="pyarrow is required for Parquet export")
+    # Streaming has already sent a 200 by the time the first record is read, so bad
+    # arguments must be caught here rather than inside the stream.
+    try:
+        validate_export_args(kind, after, limit)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    stream = container.export_service.aiter_encoded(
+        kind,
+        format,
+        since=parse_timestamp(since),
+        until=parse_timestamp(until),
+        after=after,
+        limit=limit,
+    )
+    return StreamingResponse(
+        stream,
+        media_type=_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{kind}.{format}"'},
+    )
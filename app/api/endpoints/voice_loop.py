@@ -1,48 +1,52 @@
 from __future__ import annotations
 
+import asyncio
+import base64
+import json
 import logging
+from contextlib import nullcontext
 from pathlib import Path
+from typing import Literal
 
-from fastapi import APIRouter, HTTPException, Request
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import FileResponse, StreamingResponse
 
-from app.clients.llm_blackbox import BlackboxLLMClient
-from app.clients.modulate_client import ModulateClient
-from app.clients.tts_free import FreeTTSClient
 from app.core.config import settings
-from app.repositories.session_store import SessionStore
+from app.api.endpoints.admin import request_profile, wants_request_profile
+from app.core.container import Container, get_container
+from app.core.profiler import StackSampler
+from app.services.admission import AdmissionRejected
+from app.services.idempotency import MAX_KEY_LENGTH, IdempotencyStore, StoredResponse
 from app.schemas.voice_loop import StartSessionResponse, VoiceLoopProcessResponse
+from app.services.turn_jobs import TurnJob
 from app.services.voice_loop_service import VoiceLoopService
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
-def _build_service() -> VoiceLoopService:
-    session_store = SessionStore(settings.voice_loop_data_dir)
-    return VoiceLoopService(
-        modulate_client=ModulateClient(settings),
-        llm_client=BlackboxLLMClient(session_store),
-        tts_client=FreeTTSClient(settings),
-        session_store=session_store,
-    )
-
-
-voice_loop_service = _build_service()
+def _admitted(voice_loop_service: VoiceLoopService, session_key: str):
+    if voice_loop_service.admission is None:
+        return nullcontext()
+    return voice_loop_service.admission.admit(session_key)
 
 
 @router.post("/sessions/start", response_model=StartSessionResponse)
-def start_voice_session() -> StartSessionResponse:
-    return voice_loop_service.start_session()
+def start_voice_session(container: Container = Depends(get_container)) -> StartSessionResponse:
+    return container.voice_loop_service.start_session()
 
 
 @router.post("/process", response_model=VoiceLoopProcessResponse)
 async def process_voice_input(
     request: Request,
     session_id: str | None = None,
+    mode: Literal["sync", "async"] = "sync",
+    container: Container = Depends(get_container),
 ) -> VoiceLoopProcessResponse:
+    voice_loop_service = container.voice_loop_service
     if not settings.modulate_api_key:
         raise HTTPException(status_code=400, detail="MODULATE_API_KEY is required")
+    profile = wants_request_profile(request)
 
     try:
         audio_bytes = await request.body()
@@ -50,13 +54,45 @@ async def process_voice_input(
             raise HTTPException(status_code=400, detail="request body was empty")
 
         content_type = request.headers.get("content-type", "application/octet-stream")
-        return await voice_loop_service.process_audio(
-            audio_bytes=audio_bytes,
-            content_type=content_type,
-            session_id=session_id,
+
+        async def execute() -> StoredResponse:
+            if mode == "async":
+                content = _start_turn_job(container, request, audio_bytes, content_type, session_id, profile)
+                return StoredResponse(status_code=202, body=json.dumps(content).encode("utf-8"))
+            session_key = session_id or (request.client.host if request.client else "anonymous")
+            async with _admitted(voice_loop_service, session_key):
+                async with request_profile(profile) as sampler:
+                    response = await voice_loop_service.process_audio(
+                        audio_bytes=audio_bytes,
+                        content_type=content_type,
+                        session_id=session_id,
+                    )
+            _attach_profile(container, response.session_id, sampler, mode)
+            return StoredResponse(status_code=200, body=response.model_dump_json().encode("utf-8"))
+
+        idempotency_key = request.headers.get("idempotency-key")
+        idempotency = container.idempotency
+        if idempotency_key and idempotency is not None:
+            if len(idempotency_key) > MAX_KEY_LENGTH:
+                raise HTTPException(status_code=400, detail=f"Idempotency-Key longer than {MAX_KEY_LENGTH} characters")
+            fingerprint = IdempotencyStore.fingerprint(idempotency_key, audio_bytes, session_id, mode)
+            stored, replayed = await idempotency.run(fingerprint, execute)
+        else:
+            stored, replayed = await execute(), False
+        return Response(
+            content=stored.body,
+            status_code=stored.status_code,
+            media_type="application/json",
+            headers={"Idempotent-Replayed": "true"} if replayed else None,
         )
     except HTTPException:
         raise
+    except AdmissionRejected as exc:
+        raise HTTPException(
+            status_code=exc.status_code,
+            detail=f"Voice loop is busy ({exc.reason}); retry later",
+            headers={"Retry-After": str(exc.retry_after_s)},
+        ) from None
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail=f"Unknown session_id: {session_id}") from None
     except Exception as exc:  # noqa: BLE001
@@ -64,27 +100,177 @@ async def process_voice_input(
         raise HTTPException(status_code=500, detail=f"Voice loop processing failed: {exc}") from exc
 
 
+def _start_turn_job(
+    container: Container,
+    request: Request,
+    audio_bytes: bytes,
+    content_type: str,
+    session_id: str | None,
+    profile: bool = False,
+) -> dict:
+    if session_id is None:
+        session_id = container.voice_loop_service.start_session().session_id
+    else:
+        container.session_store.get_session(session_id)
+    job = container.turn_jobs.create(session_id)
+    client_key = request.client.host if request.client else "anonymous"
+    task = asyncio.create_task(_run_turn_job(container, job, audio_bytes, content_type, client_key, profile))
+    container.job_tasks.add(task)
+    task.add_done_callback(container.job_tasks.discard)
+    base = f"{settings.api_v1_str}/voice-loop/turns/{job.turn_id}"
+    return {
+        "turn_id": job.turn_id,
+        "session_id": session_id,
+        "status": job.status,
+        "status_url": base,
+        "events_url": f"{base}/events",
+    }
+
+
+async def _run_turn_job(
+    container: Container,
+    job: TurnJob,
+    audio_bytes: bytes,
+    content_type: str,
+    client_key: str,
+    profile: bool = False,
+) -> None:
+    turn_jobs = container.turn_jobs
+
+    async def on_progress(stage: str, payload: dict) -> None:
+        turn_jobs.publish(job, stage, payload)
+
+    try:
+        async with _admitted(container.voice_loop_service, job.session_id or client_key):
+            async with request_profile(profile) as sampler:
+                response = await container.voice_loop_service.process_audio(
+                    audio_bytes=audio_bytes,
+                    content_type=content_type,
+                    session_id=job.session_id,
+                    on_progress=on_progress,
+                )
+        _attach_profile(container, job.session_id, sampler, "async")
+    except AdmissionRejected as exc:
+        turn_jobs.publish(
+            job,
+            "failed",
+            {"status_code": exc.status_code, "detail": f"Voice loop is busy ({exc.reason})", "retry_after_s": exc.retry_after_s},
+        )
+        return
+    except Exception as exc:  # noqa: BLE001
+        logger.exception("Voice loop job %s failed: %s", job.turn_id, exc)
+        turn_jobs.publish(job, "failed", {"status_code": 500, "detail": f"Voice loop processing failed: {exc}"})
+        return
+
+    job.audio_bytes = base64.b64decode(response.tts_audio_b64) if response.tts_audio_b64 else None
+    job.audio_mime_type = response.tts_mime_type
+    job.result = response.model_dump(exclude={"tts_audio_b64"})
+    audio_url = f"{settings.api_v1_str}/voice-loop/turns/{job.turn_id}/audio" if job.audio_bytes else None
+    turn_jobs.publish(
+        job,
+        "completed",
+        {
+            "output_status": response.output_status,
+            "audio_url": audio_url,
+            "tts_mime_type": response.tts_mime_type,
+            "tts_provider": response.tts_provider,
+        },
+    )
+
+
+def _attach_profile(container: Container, session_id: str, sampler: StackSampler | None, mode: str) -> None:
+    if sampler is not None:
+        container.session_store.append_event(session_id, "request_profile", {"mode": mode, **sampler.summary()})
+
+
+@router.get("/turns/{turn_id}")
+def get_turn_job(turn_id: str, container: Container = Depends(get_container)) -> dict:
+    return _get_job(container, turn_id).summary()
+
+
+@router.get("/turns/{turn_id}/events")
+async def stream_turn_events(
+    turn_id: str,
+    request: Request,
+    container: Container = Depends(get_container),
+) -> StreamingResponse:
+    turn_jobs = container.turn_jobs
+    job = _get_job(container, turn_id)
+    try:
+        after = int(request.headers.get("last-event-id", "-1"))
+    except ValueError:
+        after = -1
+
+    async def body():
+        async for event in turn_jobs.subscribe(job, after=after):
+            if event is None:
+                yield ": keep-alive\n\n"
+                continue
+            yield f"id: {event['id']}\nevent: {event['stage']}\ndata: {json.dumps(event['payload'])}\n\n"
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/turns/{turn_id}/audio")
+def get_turn_audio(turn_id: str, container: Container = Depends(get_container)) -> Response:
+    job = _get_job(container, turn_id)
+    if job.audio_bytes is None:
+        raise HTTPException(status_code=404, detail=f"No audio for turn {turn_id} (status: {job.status})")
+    return Response(content=job.audio_bytes, media_type=job.audio_mime_type or "application/octet-stream")
+
+
+def _get_job(container: Container, turn_id: str) -> TurnJob:
+    job = container.turn_jobs.get(turn_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Turn not found or expired: {turn_id}")
+    return job
+
+
 @router.get("/sessions/{session_id}")
-def get_voice_session(session_id: str) -> dict:
+def get_voice_session(session_id: str, container: Container = Depends(get_container)) -> dict:
     try:
-        return voice_loop_service.get_session(session_id)
+        return container.voice_loop_service.get_session(session_id)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Session not found: {session_id}") from None
+
+
+@router.get("/sessions/{session_id}/signals")
+def get_voice_session_signals(session_id: str, container: Container = Depends(get_container)) -> dict:
+    try:
+        return container.voice_loop_service.get_signal_timeline(session_id)
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail=f"Session not found: {session_id}") from None
 
 
 @router.post("/sessions/{session_id}/summary")
-async def generate_session_summary(session_id: str) -> dict:
+async def generate_session_summary(session_id: str, container: Container = Depends(get_container)) -> dict:
     try:
-        summary_payload = await voice_loop_service.llm_client.generate_session_summary(session_id)
+        summary_payload = await container.voice_loop_service.llm_client.generate_session_summary(session_id)
         return {
             "session_id": session_id,
             "summary": summary_payload.get("summary", "No prior context."),
             "conversation": summary_payload.get("conversation", {"turns": []}),
+            "insights_job_id": summary_payload.get("insights_job_id"),
         }
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail=f"Session not found: {session_id}") from None
 
 
+@router.get("/metrics")
+def get_voice_loop_metrics(container: Container = Depends(get_container)) -> dict:
+    return {
+        **container.voice_loop_service.metrics(),
+        "turn_jobs": container.turn_jobs.stats(),
+        "idempotency": container.idempotency.stats() if container.idempotency is not None else None,
+        "event_loop": container.loop_monitor.stats() if container.loop_monitor is not None else None,
+        "worker": container.describe(),
+    }
+
+
 @router.get("/demo")
 def voice_loop_demo() -> FileResponse:
     ui_path = Path(__file__).resolve().parents[3] / "frontend" / "index.html"
@@ -1,7 +1,9 @@
 from fastapi import APIRouter
-from app.api.endpoints import hello, appointments, voice_loop
+from app.api.endpoints import hello, appointments, voice_loop, export, admin
 
 router = APIRouter()
 router.include_router(hello.router, prefix="/hello", tags=["hello"])
 router.include_router(appointments.router, prefix="/appointments", tags=["appointments"])
 router.include_router(voice_loop.router, prefix="/voice-loop", tags=["voice-loop"])
+router.include_router(export.router, prefix="/export", tags=["export"])
+router.include_router(admin.router, prefix="/admin", tags=["admin"])
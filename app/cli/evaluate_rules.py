@@ -0,0 +1,85 @@
+"""Compare a candidate rules.json against the active rules on stored conversations.
+
+Usage:
+    python -m app.cli.evaluate_rules candidate_rules.json --source sessions --limit 500
+    python -m app.cli.evaluate_rules candidate_rules.json --source db --llm airia --concurrency 32
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+
+
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("candidate", help="Path to the candidate rules JSON list")
+    parser.add_argument("--baseline", default="app/data/rules.json", help="Rules file to compare against")
+    parser.add_argument("--source", choices=("sessions", "db"), default="sessions")
+    parser.add_argument("--since", help="ISO-8601 lower bound for conversations")
+    parser.add_argument("--until", help="ISO-8601 upper bound for conversations")
+    parser.add_argument("--limit", type=int, help="Maximum number of conversations")
+    parser.add_argument("--llm", choices=("local", "airia"), default="local")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent LLM calls")
+    parser.add_argument("--workers", type=int, help="Scoring processes (defaults to CPU count)")
+    parser.add_argument("--data-dir", help="Override VOICE_LOOP_DATA_DIR")
+    parser.add_argument("--out", help="Write the JSON report here instead of stdout")
+    return parser.parse_args(argv)
+
+
+def _load_rules(path: str):
+    from app.repositories.rules_registry import RulesSnapshot
+
+    with open(path, encoding="utf-8") as handle:
+        return RulesSnapshot.from_rules(json.load(handle), source=path)
+
+
+async def _run(args: argparse.Namespace) -> dict:
+    from app.clients.llm_local import LocalLLMClient
+    from app.core.config import settings
+    from app.repositories.session_store import SessionStore
+    from app.services.appointment_manager import AppointmentManager
+    from app.services.export_service import ExportService, parse_timestamp
+    from app.services.rule_evaluation import RuleSetEvaluator, aiter_db_cases, iter_session_cases
+
+    manager = AppointmentManager()
+    completer = LocalLLMClient(first_token_delay_s=0.0, token_delay_s=0.0) if args.llm == "local" else manager
+    export_service = ExportService(SessionStore(args.data_dir or settings.voice_loop_data_dir))
+    since, until = parse_timestamp(args.since), parse_timestamp(args.until)
+    if args.source == "db":
+        cases = aiter_db_cases(export_service, since=since, until=until, limit=args.limit)
+    else:
+        cases = iter_session_cases(export_service, since=since, until=until, limit=args.limit)
+
+    evaluator = RuleSetEvaluator(
+        completer,
+        build_prompt=manager.build_user_prompt,
+        concurrency=args.concurrency,
+        workers=args.workers,
+    )
+    rule_sets = {"baseline": _load_rules(args.baseline), "candidate": _load_rules(args.candidate)}
+    if args.llm == "local":
+        return await evaluator.evaluate(cases, rule_sets)
+
+    import aiohttp
+
+    connector = aiohttp.TCPConnector(limit=args.concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        return await evaluator.evaluate(cases, rule_sets, session=session)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = _parse_args(argv)
+    report = asyncio.run(_run(args))
+    payload = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as handle:
+            handle.write(payload + "\n")
+    else:
+        sys.stdout.write(payload + "\n")
+
+
+if __name__ == "__main__":
+    main()
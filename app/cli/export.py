@@ -0,0 +1,68 @@
+"""Export voice-loop data for offline analysis.
+
+Usage:
+    python -m app.cli.export turns --format parquet --since 2026-01-01 --out turns.parquet
+    python -m app.cli.export events --after <cursor>
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+
+
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    from app.services.export_service import EXPORT_FORMATS, EXPORT_KINDS
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("kind", choices=EXPORT_KINDS)
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="ndjson")
+    parser.add_argument("--since", help="ISO-8601 lower bound (inclusive)")
+    parser.add_argument("--until", help="ISO-8601 upper bound (exclusive)")
+    parser.add_argument("--after", help="Resume after this _cursor value")
+    parser.add_argument("--limit", type=int)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--data-dir", help="Override VOICE_LOOP_DATA_DIR")
+    parser.add_argument("--out", help="Output file (defaults to stdout)")
+    return parser.parse_args(argv)
+
+
+async def _run(args: argparse.Namespace) -> None:
+    from app.core.config import settings
+    from app.repositories.session_store import SessionStore
+    from app.services.export_service import ExportService, parse_timestamp
+
+    service = ExportService(SessionStore(args.data_dir or settings.voice_loop_data_dir), chunk_size=args.chunk_size)
+    stream = service.aiter_encoded(
+        args.kind,
+        args.format,
+        since=parse_timestamp(args.since),
+        until=parse_timestamp(args.until),
+        after=args.after,
+        limit=args.limit,
+    )
+    output = open(args.out, "wb") if args.out else sys.stdout.buffer
+    try:
+        async for chunk in stream:
+            output.write(chunk)
+    finally:
+        if args.out:
+            output.close()
+        else:
+            output.flush()
+
+
+def main(argv: list[str] | None = None) -> None:
+    from app.services.export_service import validate_export_args
+
+    args = _parse_args(argv)
+    try:
+        validate_export_args(args.kind, args.after, args.limit)
+    except ValueError as exc:
+        raise SystemExit(str(exc)) from exc
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
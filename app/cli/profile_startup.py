@@ -0,0 +1,123 @@
+"""Profile cold start: per-module import times and, optionally, time until a worker serves.
+
+Usage:
+    python -m app.cli.profile_startup
+    python -m app.cli.profile_startup --top 30 --serve
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app.main", help="Module whose import is profiled")
+    parser.add_argument("--top", type=int, default=20, help="Modules to list per ranking")
+    parser.add_argument("--serve", action="store_true", help="Also start uvicorn and time liveness, readiness and a first request")
+    parser.add_argument("--path", default="/api/v1/hello/", help="Request timed as the first request with --serve")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Seconds to wait for the server with --serve")
+    return parser.parse_args(argv)
+
+
+def profile_imports(module: str, top: int) -> dict:
+    """Runs a fresh interpreter with ``-X importtime`` and ranks the modules it imported."""
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+    if completed.returncode != 0:
+        raise SystemExit(f"import {module} failed:\n{completed.stderr[-2000:]}")
+
+    rows = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|", 2))
+        if not self_us.isdigit():
+            continue  # the header line
+        rows.append({"module": name.strip(), "self_ms": int(self_us) / 1000, "cumulative_ms": int(cumulative_us) / 1000})
+
+    def ranked(key: str) -> list[dict]:
+        return [
+            {"module": row["module"], "self_ms": round(row["self_ms"], 1), "cumulative_ms": round(row["cumulative_ms"], 1)}
+            for row in sorted(rows, key=lambda row: row[key], reverse=True)[:top]
+        ]
+
+    packages: dict[str, float] = {}
+    for row in rows:
+        root = row["module"].split(".", 1)[0]
+        packages[root] = packages.get(root, 0.0) + row["self_ms"]
+    return {
+        "module": module,
+        "interpreter_wall_ms": round(wall_ms, 1),
+        "import_ms": next((round(row["cumulative_ms"], 1) for row in rows if row["module"] == module), None),
+        "modules_imported": len(rows),
+        "by_package_ms": {name: round(ms, 1) for name, ms in sorted(packages.items(), key=lambda item: -item[1])[:top]},
+        "top_cumulative": ranked("cumulative_ms"),
+        "top_self": ranked("self_ms"),
+    }
+
+
+def profile_serving(path: str, timeout_s: float) -> dict:
+    """Starts one uvicorn worker and times how long until it is live, ready and has served ``path``."""
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    base = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=os.environ.copy(),
+    )
+    timings: dict[str, float] = {}
+    try:
+        deadline = started + timeout_s
+        for phase, url in (("live", "/health/live"), ("ready", "/health/ready"), ("first_request", path)):
+            while True:
+                if server.poll() is not None:
+                    raise SystemExit(f"uvicorn exited with status {server.returncode}")
+                if time.perf_counter() > deadline:
+                    raise SystemExit(f"timed out waiting for {phase}")
+                try:
+                    with urllib.request.urlopen(base + url, timeout=5) as response:
+                        if response.status < 400:
+                            break
+                except urllib.error.HTTPError as exc:
+                    body = json.loads(exc.read() or b"{}") if exc.code == 503 else {}
+                    if body.get("status") == "degraded":
+                        raise SystemExit(f"warmup failed: {body['startup'].get('warmup_error')}") from exc
+                except (urllib.error.URLError, ConnectionError):
+                    pass
+                time.sleep(0.01)
+            timings[f"{phase}_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        with urllib.request.urlopen(base + "/health/ready", timeout=5) as response:
+            in_process = json.loads(response.read())["startup"]
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+    return {"since_spawn": timings, "in_process": in_process}
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = _parse_args(argv)
+    report = {"imports": profile_imports(args.module, args.top)}
+    if args.serve:
+        report["serving"] = profile_serving(args.path, args.timeout)
+    sys.stdout.write(json.dumps(report, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
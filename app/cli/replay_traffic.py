@@ -0,0 +1,67 @@
+"""Replay recorded sessions as load against the voice loop with stand-in providers.
+
+STT, LLM and TTS are replaced by stand-ins that return each turn's recorded transcript and
+reply after its recorded stage latencies, so the run measures the service's own overhead
+and concurrency behaviour rather than the providers'.
+
+Usage:
+    python -m app.cli.replay_traffic --data-dir .data/voice_loop
+    python -m app.cli.replay_traffic --speed 10 --concurrency 64 --latency-scale 0.5
+    python -m app.cli.replay_traffic --inspect
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import dataclasses
+import json
+import sys
+
+from app.core.config import settings
+from app.services.export_service import parse_timestamp
+from app.services.traffic_replay import TrafficReplay, load_recorded_sessions, summarize_sessions
+
+
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", default=settings.voice_loop_data_dir, help="Directory holding sessions/ and events/")
+    parser.add_argument("--speed", type=float, default=1.0, help="Arrival-time multiplier: 1 replays in real time, 10 ten times faster")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="Multiplier applied to recorded provider latencies")
+    parser.add_argument("--concurrency", type=int, default=32, help="Maximum sessions in flight")
+    parser.add_argument("--limit", type=int, default=None, help="Replay only the oldest N sessions")
+    parser.add_argument("--since", type=parse_timestamp, default=None, help="Skip sessions started before this ISO timestamp (UTC unless it has an offset)")
+    parser.add_argument("--streaming", action=argparse.BooleanOptionalAction, default=None, help="Override LLM_STREAMING")
+    parser.add_argument("--output-dir", default=None, help="Keep replayed sessions here instead of a temporary directory")
+    parser.add_argument("--inspect", action="store_true", help="Only summarise the recorded traffic; do not replay it")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = _parse_args(argv)
+    if args.speed <= 0 or args.latency_scale < 0 or args.concurrency < 1:
+        raise SystemExit("--speed must be > 0, --latency-scale >= 0 and --concurrency >= 1")
+    sessions = load_recorded_sessions(args.data_dir, limit=args.limit, since=args.since)
+    if not sessions:
+        raise SystemExit(f"No recorded sessions with turns under {args.data_dir}")
+
+    report = {"recorded": summarize_sessions(sessions)}
+    if not args.inspect:
+        replay_settings = settings
+        if args.streaming is not None:
+            replay_settings = dataclasses.replace(settings, llm_streaming=args.streaming)
+        replay = TrafficReplay(
+            sessions,
+            replay_settings,
+            speed=args.speed,
+            latency_scale=args.latency_scale,
+            concurrency=args.concurrency,
+            data_dir=args.output_dir,
+        )
+        report["replay"] = asyncio.run(replay.run())
+        report["replay"]["llm_streaming"] = replay_settings.llm_streaming
+    sys.stdout.write(json.dumps(report, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
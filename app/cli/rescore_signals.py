@@ -0,0 +1,49 @@
+"""Recompute stored turn signals after a change to the signal heuristics or lexicon.
+
+Sessions are rewritten under the same per-session lock the server takes, so this is safe to
+run while the server is up (except on Windows, where file locks are unavailable).
+
+Usage:
+    python -m app.cli.rescore_signals --dry-run
+    python -m app.cli.rescore_signals --workers 8 --shard-size 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+
+
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", help="Override VOICE_LOOP_DATA_DIR")
+    parser.add_argument("--workers", type=int, help="Scoring processes (defaults to CPU count)")
+    parser.add_argument("--shard-size", type=int, default=200, help="Session files per shard")
+    parser.add_argument("--lexicon", help="Override LEXICON_PATH")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would change without writing")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    args = _parse_args(argv)
+
+    from app.core.config import settings
+    from app.services.signal_scoring import SignalBackfill
+
+    sessions_dir = Path(args.data_dir or settings.voice_loop_data_dir) / "sessions"
+    backfill = SignalBackfill(
+        sessions_dir,
+        workers=args.workers,
+        shard_size=args.shard_size,
+        lexicon_path=args.lexicon or settings.lexicon_path or None,
+    )
+    report = backfill.run(dry_run=args.dry_run)
+    sys.stdout.write(json.dumps(report, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
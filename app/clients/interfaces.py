@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from typing import Protocol
+from collections.abc import Awaitable, Callable
+from typing import TYPE_CHECKING, Any, Protocol
 
 from app.schemas.voice_loop import (
     EmotionResult,
@@ -11,9 +12,23 @@ from app.schemas.voice_loop import (
     TranscriptResult,
 )
 
+if TYPE_CHECKING:
+    from app.services.signal_aggregator import SignalAggregator
+    from app.services.streaming_speech import LLMStream
+    from app.services.transcript import Transcript
+
+# Called for every utterance as it arrives (in ``TranscriptUtterance`` dict form), with the aggregate so far.
+UtteranceCallback = Callable[[dict[str, Any], "SignalAggregator"], Awaitable[None]]
+
 
 class ModulateClientProtocol(Protocol):
-    async def transcribe(self, audio_chunk: bytes, content_type: str, session_id: str) -> TranscriptResult:
+    async def transcribe(
+        self,
+        audio_chunk: bytes,
+        content_type: str,
+        session_id: str,
+        on_utterance: UtteranceCallback | None = None,
+    ) -> Transcript | TranscriptResult:
         ...
 
     async def analyze_intent(self, text: str, session_id: str) -> IntentResult:
@@ -28,6 +43,11 @@ class LLMClientProtocol(Protocol):
         ...
 
 
+class StreamingLLMClientProtocol(LLMClientProtocol, Protocol):
+    async def stream_response(self, request: LLMRequest) -> LLMStream:
+        ...
+
+
 class TTSClientProtocol(Protocol):
     async def synthesize_speech(self, text: str, voice: str | None = None) -> TTSResult:
         ...
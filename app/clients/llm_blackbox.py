@@ -1,16 +1,45 @@
 from __future__ import annotations
 
+import asyncio
+import json
+import logging
+import random
+from pathlib import Path
+
 from app.schemas.voice_loop import LLMRequest, LLMResponse
 from app.repositories.session_store import SessionStore
 from app.services.appointment_manager import AppointmentManager
-from app.core.database import AsyncSessionLocal
-from app.repositories.conversation_repository import add_conversation
+from app.services.job_queue import DurableJobQueue, QueuedJob
+from app.services.response_cache import ResponseCache
+from app.services.rolling_summary import RollingSummary
+from app.services.signal_timeline import SignalTimeline
+from app.services.streaming_speech import LLMStream
+
+logger = logging.getLogger(__name__)
 
 
 class BlackboxLLMClient:
-    def __init__(self, session_store: SessionStore):
+    def __init__(
+        self,
+        session_store: SessionStore,
+        response_cache: ResponseCache | None = None,
+        insights_batch_size: int = 10,
+        insights_max_wait_s: float = 30.0,
+        appointment_manager: AppointmentManager | None = None,
+        session_factory=None,
+        insights_journal_path: Path | None = None,
+    ):
         self.session_store = session_store
-        self.appointment_manager = AppointmentManager()
+        self.appointment_manager = appointment_manager or AppointmentManager()
+        self.response_cache = response_cache
+        self.session_factory = session_factory
+        # Ended calls are journaled here; DB saves and rule analysis run in batches off the request path.
+        self.insights_queue = DurableJobQueue(
+            insights_journal_path or session_store.base_path / "jobs" / "post_call.jsonl",
+            handler=self.process_post_call_batch,
+            batch_size=insights_batch_size,
+            max_wait_s=insights_max_wait_s,
+        )
 
     def _build_previous_messages(self, session_id: str) -> list[dict]:
         session = self.session_store.get_session(session_id)
@@ -30,43 +59,125 @@ class BlackboxLLMClient:
         }
         summary_text = self.appointment_manager.generate_summary(previous_messages, conversation_state)
         turns_json = self.appointment_manager.messages_as_turn_json(previous_messages)
-        print("TURNS_JSON", json.dumps(turns_json, indent=4))
-        
-        await self.save_to_db(
-            patient_phone=random.randint(1000000000, 9999999999),
-            duration_seconds=random.randint(100, 1000),
-            outcome=random.choice(["booked", "cancelled", "rescheduled"]),
-            escalated=False,
-            conversation_json=turns_json,
-            isproceed=True 
-        )
+        logger.debug("TURNS_JSON %s", json.dumps(turns_json, indent=4))
 
-        appointment_manager = AppointmentManager()
-        appointment_manager.get_improvement_insights(f"{turns_json.turns}")
-        return turns_json
+        job_id = self.insights_queue.enqueue({"session_id": session_id, "conversation": turns_json})
+        return {"summary": summary_text, "conversation": turns_json, "insights_job_id": job_id}
+
+    async def process_post_call_batch(self, jobs: list[QueuedJob]) -> None:
+        """
+        Persists each finished conversation and runs one rule-improvement analysis for the whole
+        batch, so the analyzer is called (and rules.json rewritten) once per batch, not per call.
+
+        Both steps are journaled per job: a failed save keeps only that job queued, and a
+        retried batch skips saves (and analyses) that already succeeded.
+        """
+
+        async def save(job: QueuedJob) -> None:
+            if job.done("saved"):
+                return
+            payload = job.payload
+            try:
+                await self.save_to_db(
+                    patient_phone=str(random.randint(1000000000, 9999999999)),
+                    duration_seconds=random.randint(100, 1000),
+                    outcome=random.choice(["booked", "cancelled", "rescheduled"]),
+                    escalated=False,
+                    conversation_json=payload["conversation"],
+                    isproceed=True,
+                )
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Could not save conversation for session %s: %s", payload["session_id"], exc)
+                job.fail(exc)
+                return
+            job.complete("saved")
+
+        await asyncio.gather(*(save(job) for job in jobs))
+
+        pending = [job for job in jobs if not job.done("analyzed")]
+        if not pending:
+            return
+        transcripts = "\n\n".join(
+            f"CONVERSATION {index} (session {job.payload['session_id']}):\n{json.dumps(job.payload['conversation']['turns'])}"
+            for index, job in enumerate(pending, start=1)
+        )
+        await self.appointment_manager.get_improvement_insights(transcripts)
+        for job in pending:
+            job.complete("analyzed")
 
     async def save_to_db(self, **kwargs):
         """
         Helper method to save conversation to the database.
         Pass attributes like patient_phone, duration_seconds, outcome, conversation_json, etc.
         """
-        async with AsyncSessionLocal() as db_session:
+        # SQLAlchemy and the DB driver load on the first save, not when the app imports.
+        from app.core.database import get_sessionmaker
+        from app.repositories.conversation_repository import add_conversation
+
+        session_factory = self.session_factory or get_sessionmaker()
+        async with session_factory() as db_session:
             return await add_conversation(session=db_session, **kwargs)
 
     async def generate_response(self, request: LLMRequest) -> LLMResponse:
-        previous_messages = self._build_previous_messages(request.session_id)
-        conversation_state = {
-            "summary_generated": False,
-            "conversation_summary": "No prior context.",
-        }
+        summary, timeline = await asyncio.to_thread(self._session_context, request.session_id)
+        rules_version = self.appointment_manager.rules_snapshot().version
+        cache_key = self._cache_key(request, rules_version, f"{summary.digest()}:{timeline.digest()}")
+        cached = self.response_cache.get(cache_key) if self.response_cache is not None else None
+        if cached is not None:
+            return LLMResponse(text=cached, tool_commands=[], rules_version=rules_version)
 
         result = await self.appointment_manager.answer_user(
             transcript_input=request.transcript.text,
-            previous_messages=previous_messages,
-            conversation_state=conversation_state,
+            conversation_summary=summary.render(),
+            signal_trend=timeline.describe(),
         )
         response = LLMResponse(
             text=result["assistant_output"],
             tool_commands=[],
+            rules_version=result.get("rules_version"),
         )
+        if self.response_cache is not None:
+            self.response_cache.put(cache_key, response.text)
         return response
+
+    async def stream_response(self, request: LLMRequest) -> LLMStream:
+        summary, timeline = await asyncio.to_thread(self._session_context, request.session_id)
+        rules_version = self.appointment_manager.rules_snapshot().version
+        cache_key = self._cache_key(request, rules_version, f"{summary.digest()}:{timeline.digest()}")
+        cached = self.response_cache.get(cache_key) if self.response_cache is not None else None
+        if cached is not None:
+            return LLMStream(deltas=self._replay_cached(cached), rules_version=rules_version)
+
+        stream = self.appointment_manager.stream_answer(
+            transcript_input=request.transcript.text,
+            conversation_summary=summary.render(),
+            signal_trend=timeline.describe(),
+        )
+        if self.response_cache is not None and cache_key is not None:
+            stream.deltas = self._cache_on_completion(stream.deltas, cache_key)
+        return stream
+
+    def _session_context(self, session_id: str) -> tuple[RollingSummary, SignalTimeline]:
+        # Runs in a worker thread: a legacy session's rebuild waits on the session lock.
+        return self.session_store.get_summary(session_id), self.session_store.get_timeline(session_id)
+
+    def _cache_key(self, request: LLMRequest, rules_version: str, context_digest: str) -> str | None:
+        if self.response_cache is None:
+            return None
+        return self.response_cache.key(
+            request.signals.intent.label,
+            request.transcript.text,
+            rules_version,
+            context_digest,
+        )
+
+    @staticmethod
+    async def _replay_cached(text: str):
+        yield text
+
+    async def _cache_on_completion(self, deltas, cache_key: str):
+        parts: list[str] = []
+        async for delta in deltas:
+            parts.append(delta)
+            yield delta
+        self.response_cache.put(cache_key, "".join(parts))
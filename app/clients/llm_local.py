@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import asyncio
+
+from app.schemas.voice_loop import LLMRequest, LLMResponse
+from app.services.streaming_speech import LLMStream
+
+
+class LocalLLMClient:
+    """Offline stand-in for the Airia pipeline.
+
+    Replies are scripted (or echo the caller) and streamed word by word with configurable
+    latencies, which makes it usable for tests, load replays and streaming experiments.
+    """
+
+    def __init__(
+        self,
+        replies: list[str] | None = None,
+        first_token_delay_s: float = 0.2,
+        token_delay_s: float = 0.02,
+    ) -> None:
+        self.replies = list(replies or [])
+        self.first_token_delay_s = first_token_delay_s
+        self.token_delay_s = token_delay_s
+        self._calls = 0
+
+    async def generate_response(self, request: LLMRequest) -> LLMResponse:
+        text = self._next_reply(request)
+        await asyncio.sleep(self.first_token_delay_s + self.token_delay_s * len(text.split()))
+        return LLMResponse(text=text, tool_commands=[], rules_version="local")
+
+    async def complete_prompt(self, user_prompt: str, system_prompt: str = "", session=None) -> str:
+        _ = system_prompt, session
+        marker = "CURRENT USER MESSAGE:"
+        heard = user_prompt.split(marker, 1)[1].split("Instructions:", 1)[0].strip() if marker in user_prompt else ""
+        text = self.replies[self._calls % len(self.replies)] if self.replies else (
+            f"I heard you say: {heard or 'nothing'}. How can I help you with your appointment today?"
+        )
+        self._calls += 1
+        await asyncio.sleep(self.first_token_delay_s + self.token_delay_s * len(text.split()))
+        return text
+
+    async def stream_response(self, request: LLMRequest) -> LLMStream:
+        return LLMStream(deltas=self._stream(self._next_reply(request)), rules_version="local")
+
+    async def _stream(self, text: str):
+        await asyncio.sleep(self.first_token_delay_s)
+        for index, word in enumerate(text.split(" ")):
+            if index:
+                await asyncio.sleep(self.token_delay_s)
+            yield word if index == 0 else " " + word
+
+    def _next_reply(self, request: LLMRequest) -> str:
+        if self.replies:
+            reply = self.replies[self._calls % len(self.replies)]
+        else:
+            heard = request.transcript.text.strip() or "nothing"
+            reply = f"I heard you say: {heard}. How can I help you with your appointment today?"
+        self._calls += 1
+        return reply
@@ -1,33 +1,53 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
-from collections import Counter
 from typing import Any
 from urllib.parse import urlencode
 
+from app.clients.interfaces import UtteranceCallback
 from app.core.config import Settings
-from app.schemas.voice_loop import EmotionResult, IntentResult, TranscriptResult, TranscriptUtterance
+from app.core.startup import optional_provider_async
+from app.schemas.voice_loop import EmotionResult, IntentResult, TranscriptUtterance
+from app.services.audio_preprocess import AudioSegment, AudioSplitter
+from app.services.deadline import ProviderStatusError
+from app.services.lexicon import Lexicon, get_lexicon
+from app.services.signal_aggregator import SignalAggregator
+from app.services.transcript import Transcript, Utterances
 
 logger = logging.getLogger(__name__)
 
-try:
-    import aiohttp  # type: ignore
-except ImportError:  # pragma: no cover - environment-dependent
-    aiohttp = None
-
 
 class ModulateClient:
-    def __init__(self, settings: Settings) -> None:
+    def __init__(self, settings: Settings, lexicon: Lexicon | None = None) -> None:
         self.settings = settings
+        self.lexicon = lexicon or get_lexicon(settings.lexicon_path or None)
+        self.splitter: AudioSplitter | None = None
+        if settings.long_audio_enabled:
+            self.splitter = AudioSplitter(
+                max_segment_ms=settings.long_audio_segment_ms,
+                min_split_ms=settings.long_audio_min_ms,
+            )
 
-    async def transcribe(self, audio_chunk: bytes, content_type: str, session_id: str) -> TranscriptResult:
-        if aiohttp is None:
+    async def transcribe(
+        self,
+        audio_chunk: bytes,
+        content_type: str,
+        session_id: str,
+        on_utterance: UtteranceCallback | None = None,
+    ) -> Transcript:
+        if await optional_provider_async("aiohttp") is None:
             raise RuntimeError("aiohttp is required for real Modulate STT calls.")
 
+        if self.splitter is not None:
+            segments = await asyncio.to_thread(self.splitter.split, audio_chunk, content_type)
+            if len(segments) > 1:
+                return await self._transcribe_segmented(segments, session_id=session_id, on_utterance=on_utterance)
+
         if self.settings.stt_prefer_streaming:
             try:
-                return await self._transcribe_streaming(audio_chunk, session_id=session_id)
+                return await self._transcribe_streaming(audio_chunk, session_id=session_id, on_utterance=on_utterance)
             except Exception as exc:  # noqa: BLE001
                 logger.warning(
                     "Streaming STT failed for session %s; falling back to batch: %s",
@@ -39,44 +59,30 @@ class ModulateClient:
 
     async def analyze_intent(self, text: str, session_id: str) -> IntentResult:
         _ = session_id
-        lowered = text.lower()
-        if any(word in lowered for word in ["reschedule", "move appointment"]):
-            return IntentResult(label="reschedule_appointment", confidence=0.84, reason="keyword_match")
-        if any(word in lowered for word in ["cancel", "cancellation"]):
-            return IntentResult(label="cancel_appointment", confidence=0.87, reason="keyword_match")
-        if any(word in lowered for word in ["schedule", "book", "appointment"]):
-            return IntentResult(label="schedule_appointment", confidence=0.9, reason="keyword_match")
-        if any(word in lowered for word in ["confirm", "confirmation"]):
-            return IntentResult(label="confirm_appointment", confidence=0.78, reason="keyword_match")
-        return IntentResult(label="general_inquiry", confidence=0.55, reason="fallback")
+        return self.lexicon.intent(text)
 
     async def analyze_emotion(self, text: str, session_id: str) -> EmotionResult:
         _ = session_id
-        lowered = text.lower()
-        if any(word in lowered for word in ["angry", "upset", "frustrated"]):
-            return EmotionResult(label="Frustrated", confidence=0.72, source="text_heuristic")
-        if any(word in lowered for word in ["thanks", "great", "happy"]):
-            return EmotionResult(label="Happy", confidence=0.67, source="text_heuristic")
-        return EmotionResult(label="Neutral", confidence=0.6, source="text_heuristic")
-
-    def summarize_utterance_signals(self, utterances: list[TranscriptUtterance]) -> dict[str, Any]:
-        emotions = [u.emotion for u in utterances if u.emotion]
-        accents = sorted({u.accent for u in utterances if u.accent})
-        languages = sorted({u.language for u in utterances if u.language})
-        speakers = sorted({u.speaker for u in utterances if u.speaker is not None})
-
-        dominant_emotion = "Neutral"
-        if emotions:
-            dominant_emotion = Counter(emotions).most_common(1)[0][0]
+        return self.lexicon.emotion(text)
 
+    def summarize_utterance_signals(self, utterances: Utterances | list[TranscriptUtterance]) -> dict[str, Any]:
+        if isinstance(utterances, Utterances):
+            snapshot = SignalAggregator.from_columns(utterances).snapshot()
+        else:
+            snapshot = SignalAggregator.from_utterances(utterances).snapshot()
         return {
-            "dominant_emotion": dominant_emotion,
-            "accents": accents,
-            "languages": languages,
-            "speakers": speakers,
+            "dominant_emotion": snapshot["dominant_emotion"],
+            "accents": snapshot["accents"],
+            "languages": snapshot["languages"],
+            "speakers": snapshot["speakers"],
         }
 
-    async def _transcribe_streaming(self, audio_chunk: bytes, session_id: str) -> TranscriptResult:
+    async def _transcribe_streaming(
+        self,
+        audio_chunk: bytes,
+        session_id: str,
+        on_utterance: UtteranceCallback | None = None,
+    ) -> Transcript:
         ws_url = self._ws_url()
         params = {
             "api_key": self.settings.modulate_api_key,
@@ -88,10 +94,12 @@ class ModulateClient:
         ws_url_with_query = f"{ws_url}?{urlencode(params)}"
 
         chunk_size = 8192
-        utterances: list[TranscriptUtterance] = []
+        utterances = Utterances()
         raw_messages: list[dict[str, Any]] = []
         duration_ms = 0
+        aggregator = SignalAggregator()
 
+        aiohttp = await optional_provider_async("aiohttp")
         async with aiohttp.ClientSession() as session:  # type: ignore[union-attr]
             async with session.ws_connect(ws_url_with_query) as ws:
                 for idx in range(0, len(audio_chunk), chunk_size):
@@ -104,27 +112,31 @@ class ModulateClient:
                         raw_messages.append(payload)
                         msg_type = payload.get("type")
                         if msg_type == "utterance":
-                            utterances.append(self._parse_utterance(payload["utterance"]))
+                            index = utterances.append_payload(payload["utterance"])
+                            aggregator.add_row(utterances, index)
+                            if on_utterance is not None:
+                                await on_utterance(utterances.row(index), aggregator)
                         elif msg_type == "done":
                             duration_ms = int(payload.get("duration_ms", 0))
                             break
                         elif msg_type == "error":
                             raise RuntimeError(payload.get("error", "unknown streaming stt error"))
                     elif msg.type == aiohttp.WSMsgType.ERROR:
-                        raise RuntimeError(f"Websocket transport error in session {session_id}")
+                        raise ConnectionError(f"Websocket transport error in session {session_id}")
 
-        text = " ".join(u.text for u in utterances).strip()
-        return TranscriptResult(
-            text=text,
+        return Transcript(
+            text=" ".join(utterances.texts).strip(),
             duration_ms=duration_ms,
             utterances=utterances,
             transport="streaming",
             raw_provider_payload={"messages": raw_messages},
+            signals=aggregator,
         )
 
-    async def _transcribe_batch(self, audio_chunk: bytes, content_type: str, session_id: str) -> TranscriptResult:
+    async def _transcribe_batch(self, audio_chunk: bytes, content_type: str, session_id: str) -> Transcript:
         url = self._http_url(self.settings.modulate_stt_batch_path)
         headers = {"X-API-Key": self.settings.modulate_api_key}
+        aiohttp = await optional_provider_async("aiohttp")
         form = aiohttp.FormData()  # type: ignore[union-attr]
         ext = self._guess_extension(content_type)
         form.add_field(
@@ -142,30 +154,85 @@ class ModulateClient:
             async with session.post(url, headers=headers, data=form, timeout=90) as response:
                 response_text = await response.text()
                 if response.status != 200:
-                    raise RuntimeError(f"Batch STT failed: status={response.status} body={response_text}")
+                    raise ProviderStatusError(f"Batch STT failed: status={response.status} body={response_text}", response.status)
                 payload = json.loads(response_text)
 
-        utterances = [self._parse_utterance(item) for item in payload.get("utterances", [])]
-        return TranscriptResult(
+        return Transcript(
             text=payload.get("text", ""),
             duration_ms=int(payload.get("duration_ms", 0)),
-            utterances=utterances,
+            utterances=Utterances.from_payloads(payload.get("utterances", [])),
             transport="batch",
             raw_provider_payload=payload,
         )
 
-    def _parse_utterance(self, data: dict[str, Any]) -> TranscriptUtterance:
-        return TranscriptUtterance(
-            utterance_uuid=str(data.get("utterance_uuid", "")),
-            text=str(data.get("text", "")),
-            start_ms=int(data.get("start_ms", 0)),
-            duration_ms=int(data.get("duration_ms", 0)),
-            speaker=data.get("speaker"),
-            language=data.get("language"),
-            emotion=data.get("emotion"),
-            accent=data.get("accent"),
+    async def _transcribe_segmented(
+        self,
+        segments: list[AudioSegment],
+        session_id: str,
+        on_utterance: UtteranceCallback | None = None,
+    ) -> Transcript:
+        """Batch-transcribes silence-aligned segments concurrently and merges them in order.
+
+        At most ``stt_fan_out`` uploads run at once and each segment is retried on its own.
+        Utterances are released in recording order as soon as every earlier segment is done.
+        """
+        semaphore = asyncio.Semaphore(max(1, self.settings.stt_fan_out))
+        results: list[Transcript | None] = [None] * len(segments)
+
+        async def run(index: int) -> None:
+            async with semaphore:
+                results[index] = await self._transcribe_segment(segments[index], index, session_id)
+
+        tasks = [asyncio.create_task(run(index)) for index in range(len(segments))]
+        merger = _SegmentMerger()
+        aggregator = SignalAggregator()
+        utterances = Utterances()
+        merged = 0
+        try:
+            for completed in asyncio.as_completed(tasks):
+                await completed
+                while merged < len(segments) and results[merged] is not None:
+                    first = len(utterances)
+                    utterances.extend(merger.add(results[merged], segments[merged].offset_ms))
+                    for index in range(first, len(utterances)):
+                        aggregator.add_row(utterances, index)
+                        if on_utterance is not None:
+                            await on_utterance(utterances.row(index), aggregator)
+                    merged += 1
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        last = segments[-1]
+        return Transcript(
+            text=" ".join(result.text for result in results if result and result.text).strip(),
+            duration_ms=last.offset_ms + last.duration_ms,
+            utterances=utterances,
+            transport="batch_segmented",
+            raw_provider_payload={
+                "segments": [
+                    {"offset_ms": segment.offset_ms, "duration_ms": segment.duration_ms, "payload": result.raw_provider_payload}
+                    for segment, result in zip(segments, results)
+                    if result is not None
+                ]
+            },
+            signals=aggregator,
         )
 
+    async def _transcribe_segment(self, segment: AudioSegment, index: int, session_id: str) -> Transcript:
+        retries = max(0, self.settings.stt_segment_retries)
+        attempt = 0
+        while True:
+            try:
+                return await self._transcribe_batch(segment.audio_bytes, segment.content_type, session_id=f"{session_id}-{index}")
+            except Exception as exc:  # noqa: BLE001
+                if attempt >= retries:
+                    raise RuntimeError(f"STT segment {index} failed after {attempt + 1} attempts: {exc}") from exc
+                logger.warning("STT segment %d for session %s failed (%s); retrying", index, session_id, exc)
+                await asyncio.sleep(0.5 * 2**attempt)
+                attempt += 1
+
     def _http_url(self, path: str) -> str:
         return f"{self.settings.modulate_base_url.rstrip('/')}/{path.lstrip('/')}"
 
@@ -188,3 +255,41 @@ class ModulateClient:
             "application/octet-stream": "opus",
         }
         return mapping.get(content_type or "application/octet-stream", "opus")
+
+
+class _SegmentMerger:
+    """Shifts segment utterances onto the recording timeline and keeps speaker labels stable.
+
+    Diarization labels are local to each uploaded segment. Segments are cut inside pauses,
+    so the first voice of a segment is taken to be whoever spoke last before the cut; other
+    local labels map onto already-seen speakers in order of appearance, then onto new labels.
+    """
+
+    def __init__(self) -> None:
+        self.speakers: list[int] = []
+        self.last_speaker: int | None = None
+
+    def add(self, result: Transcript, offset_ms: int) -> Utterances:
+        utterances = result.utterances
+        utterances.map_start_ms(lambda start_ms: start_ms + offset_ms)
+        mapping: dict[int, int] = {}
+        for index in range(len(utterances)):
+            speaker = utterances.speaker(index)
+            if speaker is None:
+                continue
+            if speaker not in mapping:
+                mapping[speaker] = self._assign(speaker, mapping)
+            utterances.set_speaker(index, mapping[speaker])
+            self.last_speaker = mapping[speaker]
+        return utterances
+
+    def _assign(self, local: int, mapping: dict[int, int]) -> int:
+        taken = set(mapping.values())
+        if not mapping and self.last_speaker is not None:
+            return self.last_speaker
+        for speaker in self.speakers:
+            if speaker not in taken:
+                return speaker
+        label = local if local not in self.speakers and local not in taken else max([*self.speakers, *taken]) + 1
+        self.speakers.append(label)
+        return label
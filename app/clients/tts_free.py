@@ -4,14 +4,10 @@ import json
 import logging
 
 from app.core.config import Settings
+from app.core.startup import optional_provider_async
 from app.schemas.voice_loop import TTSResult
 from app.clients.tts_blackbox import BlackboxTTSClient
 
-try:
-    import edge_tts  # type: ignore
-except ImportError:  # pragma: no cover - environment-dependent
-    edge_tts = None
-
 logger = logging.getLogger(__name__)
 
 
@@ -23,6 +19,7 @@ class FreeTTSClient:
     async def synthesize_speech(self, text: str, voice: str | None = None) -> TTSResult:
         normalized_text = self._normalize_text(text)
 
+        edge_tts = await optional_provider_async("edge_tts")
         if edge_tts is None:
             logger.warning("edge-tts not installed; falling back to blackbox TTS stub")
             return await self._fallback.synthesize_speech(text=normalized_text, voice=voice)
@@ -43,6 +43,43 @@ class Settings:
     pii_phi_tagging: bool = _to_bool(os.getenv("PII_PHI_TAGGING"), default=True)
     voice_loop_data_dir: str = os.getenv("VOICE_LOOP_DATA_DIR", ".data/voice_loop")
     DATABASE_URL: str = os.getenv("DATABASE_URL", "")
+    llm_provider: str = os.getenv("LLM_PROVIDER", "airia")
+    llm_streaming: bool = _to_bool(os.getenv("LLM_STREAMING"), default=False)
+    tts_max_parallel: int = int(os.getenv("TTS_MAX_PARALLEL", "3"))
+    llm_cache_enabled: bool = _to_bool(os.getenv("LLM_CACHE_ENABLED"), default=False)
+    llm_cache_ttl_s: float = float(os.getenv("LLM_CACHE_TTL_S", "600"))
+    llm_cache_max_entries: int = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "512"))
+    llm_cache_intents: str = os.getenv("LLM_CACHE_INTENTS", "general_inquiry,schedule_appointment")
+    turn_budget_s: float = float(os.getenv("TURN_BUDGET_S", "25"))
+    stage_retries: int = int(os.getenv("STAGE_RETRIES", "1"))
+    insights_batch_size: int = int(os.getenv("INSIGHTS_BATCH_SIZE", "10"))
+    insights_max_wait_s: float = float(os.getenv("INSIGHTS_MAX_WAIT_S", "30"))
+    lexicon_path: str = os.getenv("LEXICON_PATH", "")
+    audio_preprocess_enabled: bool = _to_bool(os.getenv("AUDIO_PREPROCESS_ENABLED"), default=False)
+    vad_threshold_db: float = float(os.getenv("VAD_THRESHOLD_DB", "-45"))
+    vad_min_silence_ms: int = int(os.getenv("VAD_MIN_SILENCE_MS", "300"))
+    vad_pad_ms: int = int(os.getenv("VAD_PAD_MS", "150"))
+    long_audio_enabled: bool = _to_bool(os.getenv("LONG_AUDIO_ENABLED"), default=False)
+    long_audio_min_ms: int = int(os.getenv("LONG_AUDIO_MIN_MS", "60000"))
+    long_audio_segment_ms: int = int(os.getenv("LONG_AUDIO_SEGMENT_MS", "30000"))
+    stt_fan_out: int = int(os.getenv("STT_FAN_OUT", "4"))
+    stt_segment_retries: int = int(os.getenv("STT_SEGMENT_RETRIES", "2"))
+    admission_max_concurrent: int = int(os.getenv("ADMISSION_MAX_CONCURRENT", "32"))
+    admission_max_queue: int = int(os.getenv("ADMISSION_MAX_QUEUE", "64"))
+    admission_max_queued_per_session: int = int(os.getenv("ADMISSION_MAX_QUEUED_PER_SESSION", "1"))
+    admission_max_wait_s: float = float(os.getenv("ADMISSION_MAX_WAIT_S", "5"))
+    provider_limits: str = os.getenv("PROVIDER_LIMITS", "stt=16,llm=8,tts=16")
+    turn_jobs_max: int = int(os.getenv("TURN_JOBS_MAX", "256"))
+    turn_jobs_ttl_s: float = float(os.getenv("TURN_JOBS_TTL_S", "600"))
+    idempotency_ttl_s: float = float(os.getenv("IDEMPOTENCY_TTL_S", "600"))
+    idempotency_max_bytes: int = int(os.getenv("IDEMPOTENCY_MAX_BYTES", str(64 * 1024 * 1024)))
+    startup_warmup: bool = _to_bool(os.getenv("STARTUP_WARMUP"), default=True)
+    loop_monitor_enabled: bool = _to_bool(os.getenv("LOOP_MONITOR_ENABLED"), default=True)
+    loop_lag_interval_ms: float = float(os.getenv("LOOP_LAG_INTERVAL_MS", "50"))
+    slow_callback_ms: float = float(os.getenv("SLOW_CALLBACK_MS", "100"))
+    admin_token: str = os.getenv("ADMIN_TOKEN", "")
+    profile_interval_ms: float = float(os.getenv("PROFILE_INTERVAL_MS", "10"))
+    rules_reload_interval_s: float = float(os.getenv("RULES_RELOAD_INTERVAL_S", "2.0"))
 
 
 settings = Settings()
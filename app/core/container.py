@@ -0,0 +1,209 @@
+"""Per-worker application container.
+
+Built in the FastAPI lifespan, so every uvicorn/gunicorn worker constructs its own clients,
+stores, pools and caches after the process has started — nothing is created at import time
+or inherited across a fork. Endpoints receive it through ``Depends(get_container)``.
+
+State is one of two kinds:
+
+- shared: lives in files under ``VOICE_LOOP_DATA_DIR``, ``rules.json`` or the database, so
+  every worker reads and writes the same data (sessions, summaries, signal timelines, event
+  logs, rules, conversations). Each worker's post-call journal is claimed with a file lock.
+- worker-local: in-memory state owned by one process (admission queue, provider limits, LLM
+  response cache, async turn jobs, idempotency results, in-flight turns used for barge-in,
+  event-loop lag statistics).
+  Limits apply per worker, and follow-up requests that rely on it (``/turns/{id}/...``,
+  idempotent retries, barge-in) must reach the same worker, e.g. via sticky sessions.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import sys
+from dataclasses import dataclass, field
+from typing import Any
+
+from fastapi import Request
+
+from app.clients.llm_blackbox import BlackboxLLMClient
+from app.clients.llm_local import LocalLLMClient
+from app.clients.modulate_client import ModulateClient
+from app.clients.tts_free import FreeTTSClient
+from app.core.config import Settings
+from app.core.loop_monitor import LoopMonitor
+from app.core.startup import optional_provider, startup_profile
+from app.repositories.session_store import SessionStore
+from app.services.admission import AdmissionController, parse_provider_limits
+from app.services.appointment_manager import AppointmentManager
+from app.services.audio_preprocess import AudioPreprocessor
+from app.services.export_service import ExportService
+from app.services.idempotency import IdempotencyStore
+from app.services.job_queue import JournalClaim, claim_journal
+from app.services.response_cache import ResponseCache
+from app.services.turn_jobs import TurnJobStore
+from app.services.voice_loop_service import VoiceLoopService
+
+logger = logging.getLogger(__name__)
+
+SHARED_STATE = ("session_store", "appointment_manager", "export_service")
+WORKER_LOCAL_STATE = ("voice_loop_service", "turn_jobs", "idempotency", "job_tasks", "loop_monitor", "profile_lock")
+
+
+@dataclass
+class Container:
+    settings: Settings
+    # Shared across workers.
+    session_store: SessionStore
+    appointment_manager: AppointmentManager
+    export_service: ExportService
+    # Worker-local.
+    voice_loop_service: VoiceLoopService
+    turn_jobs: TurnJobStore
+    idempotency: IdempotencyStore | None
+    journal_claim: JournalClaim | None = None
+    loop_monitor: LoopMonitor | None = None
+    # Keeps references to running async-mode turns so they are not garbage-collected mid-turn.
+    job_tasks: set[asyncio.Task] = field(default_factory=set)
+    # One on-demand profile at a time per worker.
+    profile_lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+    @classmethod
+    def build(cls, settings: Settings) -> Container:
+        session_store = SessionStore(settings.voice_loop_data_dir)
+        appointment_manager = AppointmentManager()
+        journal_claim = None
+        if settings.llm_provider == "local":
+            llm_client = LocalLLMClient()
+        else:
+            response_cache = None
+            if settings.llm_cache_enabled:
+                response_cache = ResponseCache(
+                    max_entries=settings.llm_cache_max_entries,
+                    ttl_s=settings.llm_cache_ttl_s,
+                    allowed_intents={item.strip() for item in settings.llm_cache_intents.split(",") if item.strip()},
+                )
+            journal_claim = claim_journal(session_store.base_path / "jobs", "post_call")
+            llm_client = BlackboxLLMClient(
+                session_store,
+                response_cache=response_cache,
+                insights_batch_size=settings.insights_batch_size,
+                insights_max_wait_s=settings.insights_max_wait_s,
+                appointment_manager=appointment_manager,
+                insights_journal_path=journal_claim.path,
+            )
+        audio_preprocessor = None
+        if settings.audio_preprocess_enabled:
+            audio_preprocessor = AudioPreprocessor(
+                threshold_db=settings.vad_threshold_db,
+                min_silence_ms=settings.vad_min_silence_ms,
+                pad_ms=settings.vad_pad_ms,
+            )
+        admission = None
+        if settings.admission_max_concurrent > 0:
+            admission = AdmissionController(
+                max_concurrent=settings.admission_max_concurrent,
+                max_queue=settings.admission_max_queue,
+                max_queued_per_session=settings.admission_max_queued_per_session,
+                max_wait_s=settings.admission_max_wait_s,
+                provider_limits=parse_provider_limits(settings.provider_limits),
+            )
+        voice_loop_service = VoiceLoopService(
+            modulate_client=ModulateClient(settings),
+            llm_client=llm_client,
+            tts_client=FreeTTSClient(settings),
+            session_store=session_store,
+            llm_streaming=settings.llm_streaming,
+            tts_max_parallel=settings.tts_max_parallel,
+            turn_budget_s=settings.turn_budget_s,
+            stage_retries=settings.stage_retries,
+            audio_preprocessor=audio_preprocessor,
+            admission=admission,
+        )
+        idempotency = None
+        if settings.idempotency_max_bytes > 0:
+            idempotency = IdempotencyStore(ttl_s=settings.idempotency_ttl_s, max_bytes=settings.idempotency_max_bytes)
+        return cls(
+            settings=settings,
+            session_store=session_store,
+            appointment_manager=appointment_manager,
+            export_service=ExportService(session_store),
+            voice_loop_service=voice_loop_service,
+            turn_jobs=TurnJobStore(max_jobs=settings.turn_jobs_max, ttl_s=settings.turn_jobs_ttl_s),
+            idempotency=idempotency,
+            journal_claim=journal_claim,
+            loop_monitor=(
+                LoopMonitor(interval_ms=settings.loop_lag_interval_ms, slow_callback_ms=settings.slow_callback_ms)
+                if settings.loop_monitor_enabled
+                else None
+            ),
+        )
+
+    @property
+    def insights_queue(self):
+        return getattr(self.voice_loop_service.llm_client, "insights_queue", None)
+
+    async def start(self) -> None:
+        if self.loop_monitor is not None:
+            self.loop_monitor.start()
+        if self.insights_queue is not None:
+            # Replays post-call jobs journaled before the last shutdown.
+            self.insights_queue.start()
+        logger.info(
+            "Worker %d ready (post-call journal: %s)",
+            os.getpid(),
+            self.journal_claim.path if self.journal_claim is not None else None,
+        )
+
+    async def warmup(self) -> None:
+        """Loads the providers this worker is configured to use before it reports ready."""
+        startup_profile.warmup = "running"
+        try:
+            await asyncio.to_thread(self._load_providers)
+            # Degraded turns replay this clip instead of calling TTS with no budget left.
+            await self.voice_loop_service.prepare_degraded_reply()
+        except Exception as exc:  # noqa: BLE001
+            startup_profile.warmup = "failed"
+            startup_profile.warmup_error = str(exc)
+            logger.exception("Warmup failed; providers will load on first use: %s", exc)
+            return
+        startup_profile.warmup = "ready"
+        startup_profile.mark("warmup_done")
+
+    def _load_providers(self) -> None:
+        optional_provider("aiohttp")
+        optional_provider("edge_tts")
+        if isinstance(self.voice_loop_service.llm_client, BlackboxLLMClient):
+            optional_provider("requests")
+            from app.core.database import get_engine
+
+            # Creating the engine imports SQLAlchemy and the driver; connections stay lazy.
+            get_engine()
+
+    async def stop(self) -> None:
+        for task in list(self.job_tasks):
+            task.cancel()
+        await asyncio.gather(*self.job_tasks, return_exceptions=True)
+        if self.insights_queue is not None:
+            await self.insights_queue.stop()
+        if self.journal_claim is not None:
+            self.journal_claim.release()
+        if self.loop_monitor is not None:
+            await self.loop_monitor.stop()
+        if "app.core.database" in sys.modules:
+            from app.core.database import dispose_engine
+
+            await dispose_engine()
+
+    def describe(self) -> dict[str, Any]:
+        return {
+            "pid": os.getpid(),
+            "shared": list(SHARED_STATE),
+            "worker_local": list(WORKER_LOCAL_STATE),
+            "post_call_journal": str(self.journal_claim.path) if self.journal_claim is not None else None,
+        }
+
+
+def get_container(request: Request) -> Container:
+    return request.app.state.container
@@ -1,27 +1,55 @@
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from functools import lru_cache
+
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base
 from app.core.config import settings
 
-# Ensure we use the asyncpg driver for asynchronous FastAPI execution
-# If the connection string is a standard 'postgresql://', upgrade it to 'postgresql+asyncpg://'
-database_url = settings.DATABASE_URL
-if database_url.startswith("postgresql://"):
-    database_url = database_url.replace("postgresql://", "postgresql+asyncpg://", 1)
+Base = declarative_base()
+
 
-engine = create_async_engine(database_url, echo=False)
+def _database_url() -> str:
+    # Ensure we use the asyncpg driver for asynchronous FastAPI execution
+    # If the connection string is a standard 'postgresql://', upgrade it to 'postgresql+asyncpg://'
+    database_url = settings.DATABASE_URL
+    if database_url.startswith("postgresql://"):
+        database_url = database_url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    return database_url
 
-# Async session factory
-AsyncSessionLocal = async_sessionmaker(
-    bind=engine, 
-    autocommit=False, 
-    autoflush=False
-)
 
-Base = declarative_base()
+@lru_cache(maxsize=1)
+def get_engine() -> AsyncEngine:
+    """
+    Creates the engine on first use, so importing the app loads no DB driver and every
+    worker process builds its own connection pool after it has started.
+    """
+    return create_async_engine(_database_url(), echo=False)
+
+
+@lru_cache(maxsize=1)
+def get_sessionmaker() -> async_sessionmaker:
+    """
+    Async session factory bound to this process's engine.
+    """
+    return async_sessionmaker(
+        bind=get_engine(),
+        autocommit=False,
+        autoflush=False
+    )
+
+
+async def dispose_engine() -> None:
+    """
+    Closes pooled connections if the engine was ever created.
+    """
+    if get_engine.cache_info().currsize:
+        await get_engine().dispose()
+    get_sessionmaker.cache_clear()
+    get_engine.cache_clear()
+
 
 async def get_db():
     """
     Dependency to yield an async database session per request.
     """
-    async with AsyncSessionLocal() as session:
+    async with get_sessionmaker()() as session:
         yield session
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import asyncio
+import bisect
+import logging
+import sys
+import threading
+import time
+import traceback
+from pathlib import Path
+from types import FrameType
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+LAG_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+APP_ROOT = Path(__file__).resolve().parents[1]
+STACK_DEPTH = 12
+
+
+class LagHistogram:
+    """Fixed-bucket histogram of loop lag; percentiles are reported as bucket upper bounds."""
+
+    __slots__ = ("counts", "count", "total_ms", "max_ms")
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(LAG_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, lag_ms: float) -> None:
+        self.counts[bisect.bisect_left(LAG_BUCKETS_MS, lag_ms)] += 1
+        self.count += 1
+        self.total_ms += lag_ms
+        self.max_ms = max(self.max_ms, lag_ms)
+
+    def quantile(self, q: float) -> float | None:
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target:
+                bound = LAG_BUCKETS_MS[index] if index < len(LAG_BUCKETS_MS) else self.max_ms
+                return round(min(bound, self.max_ms), 1)
+        return round(self.max_ms, 1)
+
+    def stats(self) -> dict[str, Any]:
+        labels = [f"le_{bound}" for bound in LAG_BUCKETS_MS] + ["inf"]
+        return {
+            "samples": self.count,
+            "mean_ms": round(self.total_ms / self.count, 2) if self.count else None,
+            "p50_ms": self.quantile(0.5),
+            "p99_ms": self.quantile(0.99),
+            "max_ms": round(self.max_ms, 1),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class LoopMonitor:
+    """Samples event-loop lag and captures what the loop was running when it stalled.
+
+    A task on the loop wakes every ``interval_ms`` and records how late it woke into a
+    histogram. A watchdog thread checks whether that task is overdue; once it is more than
+    ``slow_callback_ms`` late, the loop thread's stack is captured and the stall attributed
+    to the innermost frame in app code (falling back to the innermost frame overall). When
+    the loop catches up the stall is recorded against that site with its measured duration,
+    so ``stats()`` lists blocking call sites by module and function, worst first.
+    """
+
+    def __init__(self, interval_ms: float = 50.0, slow_callback_ms: float = 100.0, max_sites: int = 50) -> None:
+        self.interval_s = interval_ms / 1000
+        self.slow_callback_s = slow_callback_ms / 1000
+        self.max_sites = max_sites
+        self.histogram = LagHistogram()
+        self.stalls = 0
+        self.stall_ms = 0.0
+        self._sites: dict[str, dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._due = 0.0
+        self._tick = 0
+        self._captured: tuple[int, str, str, list[str]] | None = None
+        self._loop_thread: int | None = None
+        self._task: asyncio.Task[None] | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stopping = threading.Event()
+
+    def start(self) -> None:
+        """Starts sampling; must be called from the event loop being monitored."""
+        if self._task is not None:
+            return
+        self._loop_thread = threading.get_ident()
+        self._due = time.monotonic() + self.interval_s
+        self._stopping.clear()
+        self._task = asyncio.get_running_loop().create_task(self._sample())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-monitor", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stopping.set()
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1.0)
+            self._watchdog = None
+
+    async def _sample(self) -> None:
+        while True:
+            self._due = time.monotonic() + self.interval_s
+            await asyncio.sleep(self.interval_s)
+            lag_s = max(0.0, time.monotonic() - self._due)
+            self.histogram.add(lag_s * 1000)
+            if lag_s >= self.slow_callback_s:
+                self._record_stall(lag_s * 1000)
+            self._tick += 1
+
+    def _watch(self) -> None:
+        poll_s = max(0.005, self.slow_callback_s / 2)
+        while not self._stopping.wait(poll_s):
+            tick = self._tick
+            if time.monotonic() - self._due < self.slow_callback_s:
+                continue
+            with self._lock:
+                if self._captured is not None and self._captured[0] == tick:
+                    continue
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is None:
+                continue
+            site, leaf, stack = _attribute(frame)
+            with self._lock:
+                self._captured = (tick, site, leaf, stack)
+
+    def _record_stall(self, duration_ms: float) -> None:
+        with self._lock:
+            captured, self._captured = self._captured, None
+            if captured is not None and captured[0] == self._tick:
+                _, site, leaf, stack = captured
+            else:
+                # Too short for the watchdog to catch in the act.
+                site, leaf, stack = "unattributed", "unattributed", []
+            self.stalls += 1
+            self.stall_ms += duration_ms
+            entry = self._sites.get(site)
+            if entry is None:
+                if len(self._sites) >= self.max_sites:
+                    site = "other"
+                    entry = self._sites.get(site)
+                if entry is None:
+                    entry = self._sites[site] = {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "leaf": leaf, "stack": stack}
+            entry["count"] += 1
+            entry["total_ms"] += duration_ms
+            if duration_ms >= entry["max_ms"]:
+                entry.update(max_ms=duration_ms, leaf=leaf, stack=stack)
+        logger.warning("Event loop blocked for %.0f ms in %s (leaf: %s)", duration_ms, site, leaf)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            sites = sorted(self._sites.items(), key=lambda item: item[1]["total_ms"], reverse=True)
+            return {
+                "interval_ms": self.interval_s * 1000,
+                "slow_callback_ms": self.slow_callback_s * 1000,
+                "lag": self.histogram.stats(),
+                "stalls": {
+                    "count": self.stalls,
+                    "total_ms": round(self.stall_ms, 1),
+                    "sites": [
+                        {
+                            "site": site,
+                            "count": entry["count"],
+                            "total_ms": round(entry["total_ms"], 1),
+                            "max_ms": round(entry["max_ms"], 1),
+                            "leaf": entry["leaf"],
+                            "stack": entry["stack"],
+                        }
+                        for site, entry in sites
+                    ],
+                },
+            }
+
+
+def _frame_label(frame: FrameType) -> str:
+    return f"{frame.f_globals.get('__name__', '?')}.{frame.f_code.co_name}"
+
+
+def _attribute(frame: FrameType) -> tuple[str, str, list[str]]:
+    """Returns (innermost app-code site, innermost frame, formatted stack) for a blocked loop."""
+    leaf = f"{_frame_label(frame)}:{frame.f_lineno}"
+    site = None
+    cursor: FrameType | None = frame
+    while cursor is not None:
+        filename = cursor.f_code.co_filename
+        if filename.startswith(str(APP_ROOT)) and not filename.endswith("loop_monitor.py"):
+            site = _frame_label(cursor)
+            break
+        cursor = cursor.f_back
+    stack = [line.rstrip() for line in traceback.format_stack(frame, limit=STACK_DEPTH)]
+    return site or leaf.rsplit(":", 1)[0], leaf, stack
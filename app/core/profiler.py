@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable
+from types import FrameType
+from typing import Any
+
+MAX_STACK_DEPTH = 64
+
+
+class TaskFilter:
+    """``StackSampler`` frame filter keeping stacks that are running one of ``tasks``.
+
+    A running task's outermost coroutine frame is on the loop thread's stack, so a sample
+    belongs to a task when that frame is one of the sample's frames. ``add`` may be called
+    from the loop thread while the sampler thread reads.
+    """
+
+    def __init__(self, tasks: list | None = None) -> None:
+        self.tasks = list(tasks or [])
+
+    def add(self, task) -> None:
+        self.tasks.append(task)
+
+    def __call__(self, frame: FrameType | None) -> bool:
+        roots = {id(root) for task in self.tasks[:] if (root := getattr(task.get_coro(), "cr_frame", None)) is not None}
+        while frame is not None:
+            if id(frame) in roots:
+                return True
+            frame = frame.f_back
+        return False
+
+
+class StackSampler:
+    """Low-overhead wall-clock sampling profiler for the running process.
+
+    A daemon thread snapshots ``sys._current_frames()`` every ``interval_ms`` and counts
+    identical stacks, so memory grows with the number of distinct stacks, not with
+    duration. ``thread_ids`` restricts sampling (e.g. to the event-loop thread); by default
+    every thread except the sampler itself is sampled. ``frame_filter`` drops stacks whose
+    leaf frame it rejects, e.g. to keep one request's tasks on a shared loop. Results export as collapsed stacks
+    (flamegraph.pl / speedscope import) or as a speedscope JSON document.
+    """
+
+    def __init__(
+        self,
+        interval_ms: float = 10.0,
+        thread_ids: set[int] | None = None,
+        frame_filter: Callable[[FrameType], bool] | None = None,
+    ) -> None:
+        self.interval_s = interval_ms / 1000
+        self.thread_ids = thread_ids
+        self.frame_filter = frame_filter
+        self.samples = 0
+        self.started: float | None = None
+        self.elapsed_s = 0.0
+        self._stacks: Counter[tuple[int, tuple[int, ...]]] = Counter()
+        self._frames: dict[tuple[str, str, int], int] = {}
+        self._thread_names: dict[int, str] = {}
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self.started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._thread.join(timeout=1.0)
+        self._thread = None
+        self.elapsed_s = time.perf_counter() - (self.started or time.perf_counter())
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        while not self._stopping.wait(self.interval_s):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id or (self.thread_ids is not None and thread_id not in self.thread_ids):
+                    continue
+                if self.frame_filter is not None and not self.frame_filter(frame):
+                    continue
+                if thread_id not in self._thread_names:
+                    if thread_id not in names:
+                        names = {thread.ident: thread.name for thread in threading.enumerate()}
+                    self._thread_names[thread_id] = names.get(thread_id, str(thread_id))
+                self._stacks[(thread_id, self._stack_key(frame))] += 1
+            self.samples += 1
+
+    def _stack_key(self, frame: FrameType | None) -> tuple[int, ...]:
+        key: list[int] = []
+        while frame is not None and len(key) < MAX_STACK_DEPTH:
+            code = frame.f_code
+            identity = (frame.f_globals.get("__name__", "?"), code.co_qualname, code.co_firstlineno)
+            index = self._frames.get(identity)
+            if index is None:
+                index = self._frames[identity] = len(self._frames)
+            key.append(index)
+            frame = frame.f_back
+        key.reverse()  # root first
+        return tuple(key)
+
+    def _frame_names(self) -> list[str]:
+        names = [""] * len(self._frames)
+        for (module, qualname, _), index in self._frames.items():
+            names[index] = f"{module}.{qualname}"
+        return names
+
+    def collapsed(self, limit: int | None = None, thread_prefix: bool | None = None) -> str:
+        """``frame;frame;leaf count`` lines, most frequent first."""
+        names = self._frame_names()
+        prefix = thread_prefix if thread_prefix is not None else len(self._thread_names) > 1
+        lines = []
+        for (thread_id, stack), count in self._stacks.most_common(limit):
+            frames = [names[index] for index in stack]
+            if prefix:
+                frames.insert(0, f"thread:{self._thread_names.get(thread_id, thread_id)}")
+            lines.append(f"{';'.join(frames)} {count}")
+        return "\n".join(lines) + ("\n" if lines else "")
+
+    def speedscope(self, name: str = "profile") -> dict[str, Any]:
+        frames = [
+            {"name": f"{module}.{qualname}", "line": line}
+            for (module, qualname, line), _ in sorted(self._frames.items(), key=lambda item: item[1])
+        ]
+        weight_ms = self.interval_s * 1000
+        profiles = []
+        for thread_id, thread_name in self._thread_names.items():
+            stacks = [(list(stack), count) for (owner, stack), count in self._stacks.items() if owner == thread_id]
+            total = sum(count for _, count in stacks) * weight_ms
+            profiles.append(
+                {
+                    "type": "sampled",
+                    "name": thread_name,
+                    "unit": "milliseconds",
+                    "startValue": 0,
+                    "endValue": total,
+                    "samples": [stack for stack, _ in stacks],
+                    "weights": [count * weight_ms for _, count in stacks],
+                }
+            )
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "almosthuman-stack-sampler",
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": profiles,
+        }
+
+    def summary(self, top: int = 100) -> dict[str, Any]:
+        return {
+            "samples": self.samples,
+            "interval_ms": self.interval_s * 1000,
+            "elapsed_ms": round(self.elapsed_s * 1000, 1),
+            "distinct_stacks": len(self._stacks),
+            "collapsed": self.collapsed(limit=top),
+        }
@@ -0,0 +1,140 @@
+"""Cold-start bookkeeping: startup phase timings, lazy provider imports and warmup state."""
+
+from __future__ import annotations
+
+import asyncio
+import importlib
+import importlib.util
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from types import ModuleType
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+WARMUP_STATES = ("pending", "running", "ready", "skipped", "failed")
+
+
+@dataclass
+class StartupProfile:
+    """Milliseconds from the first app import to each startup phase, plus provider import costs."""
+
+    started: float = field(default_factory=time.perf_counter)
+    phases: dict[str, float] = field(default_factory=dict)
+    provider_imports: dict[str, float] = field(default_factory=dict)
+    warmup: str = "pending"
+    warmup_error: str | None = None
+
+    def mark(self, phase: str) -> None:
+        """Records ``phase`` the first time it is reached; later calls are ignored."""
+        if phase not in self.phases:
+            self.phases[phase] = round((time.perf_counter() - self.started) * 1000, 1)
+
+    @property
+    def ready(self) -> bool:
+        return "lifespan_started" in self.phases and self.warmup in ("ready", "skipped")
+
+    @property
+    def status(self) -> str:
+        """``ready``, ``starting``, or ``degraded`` once warmup has failed."""
+        if self.ready:
+            return "ready"
+        return "degraded" if self.warmup == "failed" else "starting"
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "status": self.status,
+            "warmup": self.warmup,
+            "warmup_error": self.warmup_error,
+            "phases_ms": dict(self.phases),
+            "provider_imports_ms": dict(self.provider_imports),
+        }
+
+
+startup_profile = StartupProfile()
+
+_providers: dict[str, ModuleType | None] = {}
+_providers_lock = threading.Lock()
+
+
+def load_provider(name: str) -> ModuleType:
+    """Imports a provider package on first use, so workers that never call it never pay for it.
+
+    Raises ``ImportError`` when the package is not installed.
+    """
+    module = optional_provider(name)
+    if module is None:
+        raise ImportError(f"{name} is not installed")
+    return module
+
+
+def optional_provider(name: str) -> ModuleType | None:
+    """Like ``load_provider`` but returns None when the package is not installed.
+
+    A first-use import blocks the caller; on the event loop use ``optional_provider_async``.
+    """
+    try:
+        return _providers[name]
+    except KeyError:
+        pass
+    with _providers_lock:
+        if name not in _providers:
+            started = time.perf_counter()
+            try:
+                _providers[name] = importlib.import_module(name)
+            except ImportError:
+                _providers[name] = None
+            startup_profile.provider_imports[name] = round((time.perf_counter() - started) * 1000, 1)
+        return _providers[name]
+
+
+def provider_available(name: str) -> bool:
+    """Whether a provider package is installed, checked without importing it."""
+    if name in _providers:
+        return _providers[name] is not None
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+async def load_provider_async(name: str) -> ModuleType:
+    """``load_provider`` for coroutines: a first-use import runs in a worker thread."""
+    module = await optional_provider_async(name)
+    if module is None:
+        raise ImportError(f"{name} is not installed")
+    return module
+
+
+async def optional_provider_async(name: str) -> ModuleType | None:
+    """``optional_provider`` for coroutines; loaded providers return without leaving the loop."""
+    try:
+        return _providers[name]
+    except KeyError:
+        # The import, and any wait on another thread's import of it, stay off the event loop.
+        return await asyncio.to_thread(optional_provider, name)
+
+
+class FirstRequestTimer:
+    """ASGI middleware marking when the first non-probe request finished sending its headers."""
+
+    def __init__(self, app, probe_prefix: str = "/health") -> None:
+        self.app = app
+        self.probe_prefix = probe_prefix
+        self.done = False
+
+    async def __call__(self, scope, receive, send) -> None:
+        if self.done or scope["type"] != "http" or scope["path"].startswith(self.probe_prefix):
+            await self.app(scope, receive, send)
+            return
+
+        async def timed_send(message) -> None:
+            await send(message)
+            if message["type"] == "http.response.start" and not self.done:
+                self.done = True
+                startup_profile.mark("first_request")
+
+        await self.app(scope, receive, timed_send)
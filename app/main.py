@@ -1,21 +1,45 @@
-from dotenv import load_dotenv
-
-# Load environment variables from .env file before importing app modules.
-load_dotenv()
+# Imported first so startup phases are timed from the start of the app import.
+from app.core.startup import FirstRequestTimer, startup_profile
 
+import asyncio
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
 
 from app.api.routes import router as api_router
 from app.core.config import settings
-from app.core.config import settings
+from app.core.container import Container
+
+startup_profile.mark("app_imported")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Built per worker process, after startup, so no state is shared through a fork.
+    container = Container.build(settings)
+    app.state.container = container
+    await container.start()
+    startup_profile.mark("lifespan_started")
+    warmup = None
+    if settings.startup_warmup:
+        # Liveness answers right away; readiness waits for the providers to load.
+        warmup = asyncio.create_task(container.warmup())
+    else:
+        startup_profile.warmup = "skipped"
+    yield
+    if warmup is not None:
+        warmup.cancel()
+    await container.stop()
+
 
 app = FastAPI(
     title=settings.project_name,
     version=settings.version,
     description="Voice loop MVP with Modulate STT and blackbox LLM/TTS stubs",
+    lifespan=lifespan,
 )
 
 # Include API routes
@@ -24,6 +48,19 @@ frontend_dir = Path(__file__).resolve().parents[1] / "frontend"
 if frontend_dir.exists():
     app.mount("/frontend", StaticFiles(directory=str(frontend_dir)), name="frontend")
 
+app.add_middleware(FirstRequestTimer)
+
+
 @app.get("/health", tags=["system"])
+@app.get("/health/live", tags=["system"])
 def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy"}
+
+
+@app.get("/health/ready", tags=["system"])
+def readiness_check():
+    startup = startup_profile.snapshot()
+    return JSONResponse(
+        status_code=200 if startup_profile.ready else 503,
+        content={"status": startup_profile.status, "startup": startup},
+    )
\ No newline at end of file
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+def _rules_version(rules: tuple[str, ...]) -> str:
+    canonical = json.dumps(list(rules), ensure_ascii=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:12]
+
+
+@dataclass(frozen=True)
+class RulesSnapshot:
+    version: str
+    rules: tuple[str, ...]
+    prompt_text: str
+    source: str
+
+    @classmethod
+    def from_rules(cls, rules: list[str] | tuple[str, ...], source: str) -> RulesSnapshot:
+        frozen = tuple(str(rule) for rule in rules)
+        return cls(
+            version=_rules_version(frozen),
+            rules=frozen,
+            prompt_text="\n".join(f"- {rule}" for rule in frozen),
+            source=source,
+        )
+
+
+class RulesRegistry:
+    """In-memory, versioned view of ``rules.json``.
+
+    Readers get an immutable snapshot; the file is only re-checked (via mtime/size) once per
+    ``reload_interval_s``. Writes go through a temp file and ``os.replace`` so a reader never
+    observes a partially written file.
+    """
+
+    def __init__(self, path: str, default_rules: list[str], reload_interval_s: float = 2.0) -> None:
+        self.path = Path(path)
+        self.default_rules = list(default_rules)
+        self.reload_interval_s = reload_interval_s
+        self._lock = threading.Lock()
+        self._stat_key: tuple[int, int] | None = None
+        self._checked_at = time.monotonic()
+        self._snapshot = self._load()
+
+    def snapshot(self) -> RulesSnapshot:
+        now = time.monotonic()
+        if now - self._checked_at >= self.reload_interval_s:
+            self._checked_at = now
+            self._reload_if_changed()
+        return self._snapshot
+
+    def save(self, rules: list[str]) -> RulesSnapshot:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            fd, tmp_name = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                    json.dump(list(rules), handle, indent=4)
+                    handle.flush()
+                    os.fsync(handle.fileno())
+                os.replace(tmp_name, self.path)
+            except BaseException:
+                try:
+                    os.unlink(tmp_name)
+                except FileNotFoundError:
+                    pass
+                raise
+            self._stat_key = self._stat()
+            self._snapshot = RulesSnapshot.from_rules(rules, source="file")
+            logger.info("Saved rules version=%s (%d rules)", self._snapshot.version, len(rules))
+            return self._snapshot
+
+    def _reload_if_changed(self) -> None:
+        if self._stat() == self._stat_key:
+            return
+        with self._lock:
+            self._snapshot = self._load(previous=self._snapshot)
+
+    def _load(self, previous: RulesSnapshot | None = None) -> RulesSnapshot:
+        self._stat_key = self._stat()
+        if self._stat_key is None:
+            logger.error("Rules file not found at %s; using default rules", self.path)
+            return RulesSnapshot.from_rules(self.default_rules, source="default")
+        try:
+            rules = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as exc:
+            logger.warning("Could not load rules from %s: %s", self.path, exc)
+            return previous or RulesSnapshot.from_rules([], source="invalid")
+        if not isinstance(rules, list):
+            logger.warning("Rules file %s does not contain a list; ignoring it", self.path)
+            return previous or RulesSnapshot.from_rules([], source="invalid")
+        snapshot = RulesSnapshot.from_rules(rules, source="file")
+        if previous is not None and previous.version != snapshot.version:
+            logger.info("Reloaded rules version=%s from %s", snapshot.version, self.path)
+        return snapshot
+
+    def _stat(self) -> tuple[int, int] | None:
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+
+_registries: dict[str, RulesRegistry] = {}
+_registries_lock = threading.Lock()
+
+
+def get_rules_registry(path: str, default_rules: list[str], reload_interval_s: float = 2.0) -> RulesRegistry:
+    """Returns the process-wide registry for ``path`` so every manager shares one snapshot."""
+    key = os.path.abspath(path)
+    with _registries_lock:
+        registry = _registries.get(key)
+        if registry is None:
+            registry = RulesRegistry(path, default_rules, reload_interval_s=reload_interval_s)
+            _registries[key] = registry
+        return registry
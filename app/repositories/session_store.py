@@ -2,11 +2,20 @@ from __future__ import annotations
 
 import json
 import os
+from collections.abc import Iterator
+from contextlib import contextmanager, nullcontext
 from datetime import UTC, datetime
 from pathlib import Path
 from typing import Any
 
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
 from app.schemas.voice_loop import SessionRecord
+from app.services.rolling_summary import RollingSummary
+from app.services.signal_timeline import SignalTimeline
 
 
 def _utc_now() -> str:
@@ -18,8 +27,35 @@ class SessionStore:
         self.base_path = Path(base_dir)
         self.sessions_path = self.base_path / "sessions"
         self.events_path = self.base_path / "events"
+        self.summaries_path = self.base_path / "summaries"
+        self.timelines_path = self.base_path / "timelines"
+        self.locks_path = self.base_path / "locks"
         self.sessions_path.mkdir(parents=True, exist_ok=True)
         self.events_path.mkdir(parents=True, exist_ok=True)
+        self.summaries_path.mkdir(parents=True, exist_ok=True)
+        self.timelines_path.mkdir(parents=True, exist_ok=True)
+        self.locks_path.mkdir(parents=True, exist_ok=True)
+
+    @contextmanager
+    def session_lock(self, session_id: str) -> Iterator[None]:
+        """Exclusive lock on one session's files, shared with offline tools in other processes.
+
+        Held only for a read-modify-write of the session, summary and timeline files. It blocks,
+        so callers on the event loop take it through ``asyncio.to_thread``. Lock files are only
+        created for sessions that exist; an unknown id raises ``FileNotFoundError``. Without
+        ``fcntl`` (Windows) this is a no-op and offline rewrites need the server stopped.
+        """
+        if not self._session_file(session_id).exists():
+            raise FileNotFoundError(f"Session {session_id} not found")
+        if fcntl is None:
+            yield
+            return
+        with (self.locks_path / f"{session_id}.lock").open("a") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
 
     def create_session(self, session_id: str) -> SessionRecord:
         now = _utc_now()
@@ -29,7 +65,10 @@ class SessionStore:
             updated_at=now,
             turns=[],
         )
-        self._write_session(record.model_dump())
+        # Nothing else can hold the lock of a session that does not exist yet.
+        replacing = self._session_file(session_id).exists()
+        with self.session_lock(session_id) if replacing else nullcontext():
+            self._write_session(record.model_dump())
         return record
 
     def get_session(self, session_id: str) -> SessionRecord:
@@ -37,12 +76,40 @@ class SessionStore:
         return SessionRecord(**payload)
 
     def append_turn(self, session_id: str, turn: dict[str, Any]) -> SessionRecord:
-        payload = self._read_session(session_id)
-        payload.setdefault("turns", []).append(turn)
-        payload["updated_at"] = _utc_now()
-        self._write_session(payload)
+        with self.session_lock(session_id):
+            payload = self._read_session(session_id)
+            payload.setdefault("turns", []).append(turn)
+            payload["updated_at"] = _utc_now()
+            self._write_session(payload)
+
+            summary = self._read_summary(session_id, payload["turns"][:-1])
+            summary.append_turn(turn)
+            self._write_summary(session_id, summary)
+
+            timeline = self._read_timeline(session_id, payload["turns"][:-1])
+            timeline.append(turn.get("signals") or {})
+            self._write_timeline(session_id, timeline)
         return SessionRecord(**payload)
 
+    def get_summary(self, session_id: str) -> RollingSummary:
+        summary_file = self._summary_file(session_id)
+        if summary_file.exists():
+            return RollingSummary.from_dict(json.loads(summary_file.read_text(encoding="utf-8")))
+        # Sessions written before summaries existed: rebuild once and persist.
+        with self.session_lock(session_id):
+            summary = RollingSummary.from_turns(self._read_session(session_id).get("turns", []))
+            self._write_summary(session_id, summary)
+        return summary
+
+    def get_timeline(self, session_id: str) -> SignalTimeline:
+        timeline_file = self._timeline_file(session_id)
+        if timeline_file.exists():
+            return SignalTimeline.from_dict(json.loads(timeline_file.read_text(encoding="utf-8")))
+        with self.session_lock(session_id):
+            timeline = SignalTimeline.from_turns(self._read_session(session_id).get("turns", []))
+            self._write_timeline(session_id, timeline)
+        return timeline
+
     def append_event(self, session_id: str, event_type: str, payload: dict[str, Any]) -> None:
         event = {
             "timestamp": _utc_now(),
@@ -66,6 +133,30 @@ class SessionStore:
     def _event_file(self, session_id: str) -> Path:
         return self.events_path / f"{session_id}.jsonl"
 
+    def _summary_file(self, session_id: str) -> Path:
+        return self.summaries_path / f"{session_id}.json"
+
+    def _read_summary(self, session_id: str, previous_turns: list[dict[str, Any]]) -> RollingSummary:
+        summary_file = self._summary_file(session_id)
+        if summary_file.exists():
+            return RollingSummary.from_dict(json.loads(summary_file.read_text(encoding="utf-8")))
+        return RollingSummary.from_turns(previous_turns)
+
+    def _write_summary(self, session_id: str, summary: RollingSummary) -> None:
+        self._summary_file(session_id).write_text(json.dumps(summary.to_dict(), ensure_ascii=True), encoding="utf-8")
+
+    def _timeline_file(self, session_id: str) -> Path:
+        return self.timelines_path / f"{session_id}.json"
+
+    def _read_timeline(self, session_id: str, previous_turns: list[dict[str, Any]]) -> SignalTimeline:
+        timeline_file = self._timeline_file(session_id)
+        if timeline_file.exists():
+            return SignalTimeline.from_dict(json.loads(timeline_file.read_text(encoding="utf-8")))
+        return SignalTimeline.from_turns(previous_turns)
+
+    def _write_timeline(self, session_id: str, timeline: SignalTimeline) -> None:
+        self._timeline_file(session_id).write_text(json.dumps(timeline.to_dict(), ensure_ascii=True), encoding="utf-8")
+
     def _read_session(self, session_id: str) -> dict[str, Any]:
         session_file = self._session_file(session_id)
         if not session_file.exists():
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from typing import Any
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
 
 class TranscriptUtterance(BaseModel):
@@ -22,6 +22,8 @@ class TranscriptResult(BaseModel):
     utterances: list[TranscriptUtterance] = Field(default_factory=list)
     transport: str = "unknown"
     raw_provider_payload: dict[str, Any] | None = None
+    # SignalAggregator the STT client filled while utterances arrived (see app/services/transcript.py).
+    _signals: Any = PrivateAttr(default=None)
 
 
 class IntentResult(BaseModel):
@@ -66,6 +68,7 @@ class ToolCommand(BaseModel):
 class LLMResponse(BaseModel):
     text: str
     tool_commands: list[ToolCommand] = Field(default_factory=list)
+    rules_version: str | None = None
 
 
 class TTSResult(BaseModel):
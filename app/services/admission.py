@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import statistics
+import time
+from collections import Counter, OrderedDict, deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, status_code: int, reason: str, retry_after_s: int) -> None:
+        super().__init__(f"Request rejected ({reason}); retry after {retry_after_s}s")
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after_s = retry_after_s
+
+
+def parse_provider_limits(spec: str) -> dict[str, int]:
+    """Parses ``"stt=16,llm=8,tts=16"``; unlisted providers are unlimited."""
+    limits: dict[str, int] = {}
+    for item in spec.split(","):
+        name, _, value = item.partition("=")
+        if name.strip() and value.strip():
+            limits[name.strip()] = int(value)
+    return limits
+
+
+class _ProviderLimit:
+    __slots__ = ("limit", "semaphore", "in_use", "waiting")
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.semaphore = asyncio.Semaphore(limit)
+        self.in_use = 0
+        self.waiting = 0
+
+
+class AdmissionController:
+    """Bounds concurrent voice turns and queues the overflow fairly across sessions.
+
+    Up to ``max_concurrent`` turns run at once. Further requests wait in per-session FIFOs
+    that are served round-robin, so one chatty session cannot starve the others. Requests
+    are rejected immediately (429) when their session already has ``max_queued_per_session``
+    waiting, and with 503 when the whole queue is full or a wait exceeds ``max_wait_s``.
+    Every rejection carries a Retry-After estimate from recent turn durations.
+
+    Provider limits are separate semaphores taken around each STT/LLM/TTS call.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 32,
+        max_queue: int = 64,
+        max_queued_per_session: int = 1,
+        max_wait_s: float = 5.0,
+        provider_limits: dict[str, int] | None = None,
+    ) -> None:
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_queued_per_session = max_queued_per_session
+        self.max_wait_s = max_wait_s
+        self.providers = {name: _ProviderLimit(limit) for name, limit in (provider_limits or {}).items()}
+        self._active = 0
+        self._queued = 0
+        self._waiting: OrderedDict[str, deque[asyncio.Future[None]]] = OrderedDict()
+        self._wait_ms: deque[float] = deque(maxlen=512)
+        self._service_s = 1.0
+        self.admitted = 0
+        self.rejected: Counter = Counter()
+
+    @asynccontextmanager
+    async def admit(self, session_key: str) -> AsyncIterator[None]:
+        await self._acquire(session_key)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            # Smoothed turn duration feeds the Retry-After estimate.
+            self._service_s = 0.8 * self._service_s + 0.2 * (time.monotonic() - started)
+            self._release()
+
+    @asynccontextmanager
+    async def provider(self, name: str) -> AsyncIterator[None]:
+        limit = self.providers.get(name)
+        if limit is None:
+            yield
+            return
+        limit.waiting += 1
+        try:
+            await limit.semaphore.acquire()
+        finally:
+            limit.waiting -= 1
+        limit.in_use += 1
+        try:
+            yield
+        finally:
+            limit.in_use -= 1
+            limit.semaphore.release()
+
+    def retry_after_s(self) -> int:
+        backlog = (self._queued + 1) / max(1, self.max_concurrent)
+        return max(1, math.ceil(self._service_s * backlog))
+
+    async def _acquire(self, session_key: str) -> None:
+        if self._active < self.max_concurrent and not self._queued:
+            self._active += 1
+            self.admitted += 1
+            self._wait_ms.append(0.0)
+            return
+        if self._queued >= self.max_queue:
+            self._reject(503, "queue_full")
+        queue = self._waiting.get(session_key)
+        if queue is not None and len(queue) >= self.max_queued_per_session:
+            self._reject(429, "session_limit")
+
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._waiting.setdefault(session_key, deque()).append(waiter)
+        self._queued += 1
+        enqueued = time.monotonic()
+        try:
+            async with asyncio.timeout(self.max_wait_s):
+                await waiter
+        except (TimeoutError, asyncio.CancelledError) as exc:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was granted just as the caller gave up; hand it on.
+                self._release()
+            else:
+                self._withdraw(session_key, waiter)
+            if isinstance(exc, TimeoutError):
+                self._reject(503, "wait_timeout")
+            raise
+        self._wait_ms.append((time.monotonic() - enqueued) * 1000)
+
+    def _release(self) -> None:
+        self._active -= 1
+        while self._active < self.max_concurrent and self._waiting:
+            session_key, queue = self._waiting.popitem(last=False)
+            waiter = queue.popleft()
+            if queue:
+                # Round-robin: the session goes to the back of the line for its next request.
+                self._waiting[session_key] = queue
+            self._queued -= 1
+            if waiter.done():
+                continue
+            waiter.set_result(None)
+            self._active += 1
+            self.admitted += 1
+
+    def _withdraw(self, session_key: str, waiter: asyncio.Future[None]) -> None:
+        queue = self._waiting.get(session_key)
+        if queue is not None and waiter in queue:
+            queue.remove(waiter)
+            self._queued -= 1
+            if not queue:
+                del self._waiting[session_key]
+
+    def _reject(self, status_code: int, reason: str) -> None:
+        self.rejected[reason] += 1
+        raise AdmissionRejected(status_code, reason, self.retry_after_s())
+
+    def stats(self) -> dict[str, Any]:
+        waits = sorted(self._wait_ms)
+        return {
+            "active": self._active,
+            "queued": self._queued,
+            "queued_sessions": len(self._waiting),
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "rejected": dict(self.rejected),
+            "wait_ms": {
+                "p50": round(statistics.median(waits), 1) if waits else None,
+                "p95": round(waits[int(0.95 * (len(waits) - 1))], 1) if waits else None,
+                "max": round(waits[-1], 1) if waits else None,
+            },
+            "retry_after_s": self.retry_after_s(),
+            "providers": {
+                name: {"limit": limit.limit, "in_use": limit.in_use, "waiting": limit.waiting}
+                for name, limit in self.providers.items()
+            },
+        }
@@ -1,8 +1,11 @@
 import os
 import json
-import aiohttp
 from app.utils.gemini_analyzer import generate_insights_from_transcript
 from app.core.config import settings
+from app.core.startup import load_provider_async
+from app.repositories.rules_registry import RulesSnapshot, get_rules_registry
+from app.services.rolling_summary import NO_PRIOR_CONTEXT, SUMMARY_MAX_MESSAGES, format_summary_line
+from app.services.streaming_speech import LLMStream
 
 DEFAULT_IMPROVEMENT_RULES = """
 - Do not assume appointment availability.
@@ -24,54 +27,48 @@ class AppointmentManager:
             "https://api.airia.ai/v2/PipelineExecution/e08e0c25-8b5a-48db-b007-907fc9dc5dc2"
         )
         self.api_key = settings.AIRIA_API_KEY
+        self.rules_registry = get_rules_registry(
+            self.rules_file,
+            default_rules=[
+                rule.strip("- ").strip()
+                for rule in DEFAULT_IMPROVEMENT_RULES.split("\n")
+                if rule.strip()
+            ],
+            reload_interval_s=settings.rules_reload_interval_s,
+        )
+
+    def rules_snapshot(self) -> RulesSnapshot:
+        return self.rules_registry.snapshot()
 
     def load_rules(self) -> list[str]:
-        if not os.path.exists(self.rules_file):
-            print("ERROR! RULES FILE NOT FOUND")
-            return [
-                rule.strip("- ").strip() 
-                for rule in DEFAULT_IMPROVEMENT_RULES.split("\n") 
-                if rule.strip()
-            ]
-        try:
-            with open(self.rules_file, "r") as f:
-                return json.load(f)
-        except json.JSONDecodeError:
-            return []
+        return list(self.rules_registry.snapshot().rules)
 
-    def save_rules(self, rules: list[str]):
-        os.makedirs(os.path.dirname(self.rules_file), exist_ok=True)
-        with open(self.rules_file, "w") as f:
-            json.dump(rules, f, indent=4)
+    def save_rules(self, rules: list[str]) -> RulesSnapshot:
+        return self.rules_registry.save(rules)
             
     def generate_summary(self, previous_messages, state):
         if state.get("summary_generated", False):
-            return state.get("conversation_summary", "No prior context.")
+            return state.get("conversation_summary", NO_PRIOR_CONTEXT)
 
-        recent = previous_messages[-12:]
+        recent = previous_messages[-SUMMARY_MAX_MESSAGES:]
         if not recent:
-            summary = "No prior context."
+            summary = NO_PRIOR_CONTEXT
         else:
-            lines = []
-            for msg in recent:
-                role = msg.get("role", "unknown").capitalize()
-                content = " ".join(str(msg.get("content", "")).split())
-                if len(content) > 220:
-                    content = content[:220] + "..."
-                lines.append(f"- {role}: {content}")
+            lines = [format_summary_line(msg.get("role", "unknown"), msg.get("content", "")) for msg in recent]
             summary = "Conversation summary:\n" + "\n".join(lines)
 
         state["conversation_summary"] = summary
         state["summary_generated"] = True
         return summary
         
-    def build_user_prompt(self, conversation_summary, transcript_input, improvement_rules):
+    def build_user_prompt(self, conversation_summary, transcript_input, improvement_rules, signal_trend=None):
+        trend_section = f"\nCALLER SIGNAL TREND:\n{signal_trend}\n" if signal_trend else ""
         return f"""
 You are continuing an ongoing conversation.
 
 CONVERSATION SUMMARY:
 {conversation_summary}
-
+{trend_section}
 IMPORTANT IMPROVEMENT RULES:
 {improvement_rules}
 
@@ -141,61 +138,153 @@ Return only the final assistant response.
             
         return response
 
-    async def answer_user(self, transcript_input: str, previous_messages: list = None, conversation_state: dict = None, system_prompt: str = ""):
+    async def answer_user(
+        self,
+        transcript_input: str,
+        previous_messages: list = None,
+        conversation_state: dict = None,
+        system_prompt: str = "",
+        conversation_summary: str | None = None,
+        signal_trend: str | None = None,
+    ):
+        """
+        When ``conversation_summary`` is given (e.g. a session's rolling summary) it is used as-is
+        and the summary is not rebuilt from ``previous_messages``. ``signal_trend`` is an optional
+        one-line description of how the caller's signals are moving (see ``SignalTimeline``).
+        """
         if previous_messages is None:
             previous_messages = []
         if conversation_state is None:
             conversation_state = {"summary_generated": False, "conversation_summary": "No prior context."}
 
         # Build prompt dependencies
-        conversation_state["summary_generated"] = False
-        conversation_summary = self.generate_summary(previous_messages, conversation_state)
-        
-        current_rules_list = self.load_rules()
-        rules_string = "\n".join([f"- {rule}" for rule in current_rules_list])
-        
-        user_prompt = self.build_user_prompt(conversation_summary, transcript_input, rules_string)
+        precomputed_summary = conversation_summary is not None
+        if precomputed_summary:
+            conversation_state["conversation_summary"] = conversation_summary
+            conversation_state["summary_generated"] = True
+        else:
+            conversation_state["summary_generated"] = False
+            conversation_summary = self.generate_summary(previous_messages, conversation_state)
         
+        rules = self.rules_snapshot()
+        user_prompt = self.build_user_prompt(conversation_summary, transcript_input, rules.prompt_text, signal_trend)
+        assistant_output = await self.complete_prompt(user_prompt, system_prompt)
+
+        # Update tracking list
+        previous_messages.append({"role": "user", "content": transcript_input})
+        previous_messages.append({"role": "assistant", "content": assistant_output})
+        if not precomputed_summary:
+            conversation_state["summary_generated"] = False
+            self.generate_summary(previous_messages, conversation_state)
+
+        return {
+            "assistant_output": assistant_output,
+            "rules_version": rules.version,
+            "previous_messages": previous_messages,
+            "conversation_state": conversation_state,
+            "conversation_turns_json": self.messages_as_turn_json(previous_messages),
+        }
+
+    async def complete_prompt(self, user_prompt: str, system_prompt: str = "", session=None) -> str:
+        """
+        Sends an already-built prompt to the answers pipeline. Pass a shared aiohttp ``session``
+        when issuing many calls (e.g. offline evaluation) to reuse connections.
+        """
         payload = {
             "variables": {"systemPrompt": system_prompt},
             "userInput": user_prompt,
             "asyncOutput": False,
         }
-        headers = {
-            "X-API-KEY": self.api_key or "",
-            "Content-Type": "application/json",
-        }
 
         # Non-blocking async API call
+        if session is None:
+            aiohttp = await load_provider_async("aiohttp")
+            async with aiohttp.ClientSession() as own_session:
+                return await self._post_pipeline(own_session, payload)
+        return await self._post_pipeline(session, payload)
+
+    async def _post_pipeline(self, session, payload: dict) -> str:
+        async with session.post(self.airia_answers_pipeline_url, headers=self._pipeline_headers(), json=payload, timeout=30) as resp:
+            resp.raise_for_status()
+            response_json = await resp.json()
+        return self._parse_pipeline_output(response_json)
+
+    def stream_answer(
+        self,
+        transcript_input: str,
+        conversation_summary: str,
+        system_prompt: str = "",
+        signal_trend: str | None = None,
+    ) -> LLMStream:
+        """
+        Streaming variant of ``answer_user``: the pipeline is called with ``asyncOutput`` enabled
+        and text deltas are yielded as they arrive (SSE), so speech can start before the answer is done.
+        """
+        rules = self.rules_snapshot()
+        payload = {
+            "variables": {"systemPrompt": system_prompt},
+            "userInput": self.build_user_prompt(conversation_summary, transcript_input, rules.prompt_text, signal_trend),
+            "asyncOutput": True,
+        }
+        return LLMStream(deltas=self._stream_pipeline(payload), rules_version=rules.version)
+
+    async def _stream_pipeline(self, payload: dict):
+        aiohttp = await load_provider_async("aiohttp")
+        timeout = aiohttp.ClientTimeout(total=30)
         async with aiohttp.ClientSession() as session:
-            async with session.post(self.airia_answers_pipeline_url, headers=headers, json=payload, timeout=30) as resp:
+            async with session.post(self.airia_answers_pipeline_url, headers=self._pipeline_headers(), json=payload, timeout=timeout) as resp:
                 resp.raise_for_status()
-                response_json = await resp.json()
-                
-        # Parse output properly
-        assistant_output = ""
+                if "text/event-stream" not in resp.headers.get("Content-Type", ""):
+                    # Pipeline answered in one piece; hand it over as a single delta.
+                    yield self._parse_pipeline_output(await resp.json(content_type=None))
+                    return
+                async for raw_line in resp.content:
+                    # Only the line ending and the one space after "data:" are framing; plain-text
+                    # deltas carry their own leading spaces between words.
+                    line = raw_line.decode("utf-8", errors="replace").rstrip("\r\n")
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):]
+                    delta = self._parse_stream_event(data[1:] if data.startswith(" ") else data)
+                    if delta:
+                        yield delta
+
+    def _pipeline_headers(self) -> dict:
+        return {
+            "X-API-KEY": self.api_key or "",
+            "Content-Type": "application/json",
+        }
+
+    @staticmethod
+    def _parse_pipeline_output(response_json) -> str:
         if isinstance(response_json, str):
-            assistant_output = response_json
-        elif isinstance(response_json, dict):
-            assistant_output = (
+            return response_json
+        if isinstance(response_json, dict):
+            return (
                 response_json.get("output")
                 or response_json.get("result")
                 or response_json.get("message")
                 or response_json.get("output_text")
                 or json.dumps(response_json)
             )
-        else:
-            assistant_output = str(response_json)
+        return str(response_json)
 
-        # Update tracking list
-        previous_messages.append({"role": "user", "content": transcript_input})
-        previous_messages.append({"role": "assistant", "content": assistant_output})
-        conversation_state["summary_generated"] = False
-        self.generate_summary(previous_messages, conversation_state)
-
-        return {
-            "assistant_output": assistant_output,
-            "previous_messages": previous_messages,
-            "conversation_state": conversation_state,
-            "conversation_turns_json": self.messages_as_turn_json(previous_messages),
-        }
+    @staticmethod
+    def _parse_stream_event(data: str) -> str:
+        if not data or data == "[DONE]":
+            return ""
+        try:
+            event = json.loads(data)
+        except json.JSONDecodeError:
+            return data
+        if isinstance(event, str):
+            return event
+        if not isinstance(event, dict):
+            return ""
+        for key in ("content", "delta", "text", "output", "result", "message"):
+            value = event.get(key)
+            if isinstance(value, str):
+                return value
+            if isinstance(value, dict) and isinstance(value.get("content"), str):
+                return value["content"]
+        return ""
@@ -0,0 +1,346 @@
+from __future__ import annotations
+
+import bisect
+import io
+import logging
+import shutil
+import subprocess
+import wave
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from app.core.startup import load_provider, provider_available
+
+if TYPE_CHECKING:
+    from app.services.transcript import Utterances
+
+logger = logging.getLogger(__name__)
+
+WAV_CONTENT_TYPES = frozenset({"audio/wav", "audio/x-wav", "audio/wave", "audio/vnd.wave"})
+# Sample rate compressed input is decoded to when ffmpeg is available.
+DECODE_SAMPLE_RATE = 16000
+
+
+@dataclass
+class DecodedAudio:
+    samples: Any  # int16 array shaped (frames, channels)
+    sample_rate: int
+    decoder: str
+
+    @property
+    def duration_ms(self) -> int:
+        return int(len(self.samples) * 1000 / self.sample_rate)
+
+
+@dataclass
+class PreprocessedAudio:
+    """Audio to upload plus the map from its timeline back to the original recording.
+
+    ``segments`` holds ``(kept_start_ms, original_start_ms)`` for every kept span, in order.
+    """
+
+    audio_bytes: bytes
+    content_type: str
+    original_ms: int = 0
+    kept_ms: int = 0
+    original_bytes: int = 0
+    segments: list[tuple[int, int]] = field(default_factory=list)
+    applied: bool = False
+    reason: str = "disabled"
+    decoder: str | None = None
+
+    def to_original_ms(self, kept_ms: int) -> int:
+        if not self.segments:
+            return kept_ms
+        index = max(0, bisect.bisect_right([start for start, _ in self.segments], kept_ms) - 1)
+        kept_start, original_start = self.segments[index]
+        return original_start + (kept_ms - kept_start)
+
+    def restore_timestamps(self, utterances: Utterances) -> None:
+        """Rewrites utterance ``start_ms`` in place so it refers to the original audio."""
+        if not self.applied:
+            return
+        utterances.map_start_ms(self.to_original_ms)
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "applied": self.applied,
+            "reason": self.reason,
+            "decoder": self.decoder,
+            "original_ms": self.original_ms,
+            "kept_ms": self.kept_ms,
+            "original_bytes": self.original_bytes,
+            "sent_bytes": len(self.audio_bytes),
+        }
+
+
+def speech_spans(
+    samples: Any,
+    sample_rate: int,
+    frame_ms: int = 20,
+    threshold_db: float = -45.0,
+    noise_margin_db: float = 12.0,
+    min_silence_ms: int = 300,
+    pad_ms: int = 150,
+) -> list[tuple[int, int]]:
+    """Energy VAD: returns ``(start, end)`` sample ranges containing speech.
+
+    Frames are classified in one vectorized pass against the louder of an absolute floor
+    and the clip's own noise floor plus a margin. Pauses shorter than ``min_silence_ms``
+    stay inside a span and every span is padded by ``pad_ms`` on both sides.
+    """
+    numpy = load_provider("numpy")
+    mono = samples.astype(numpy.float32).mean(axis=1) / 32768.0
+    frame = max(1, sample_rate * frame_ms // 1000)
+    frames = len(mono) // frame
+    if frames == 0:
+        return []
+    energy = numpy.sqrt(numpy.mean(mono[: frames * frame].reshape(frames, frame) ** 2, axis=1) + 1e-12)
+    level_db = 20 * numpy.log10(energy)
+    threshold = max(threshold_db, float(numpy.percentile(level_db, 10)) + noise_margin_db)
+    voiced = level_db > threshold
+    if not voiced.any():
+        return []
+
+    edges = numpy.diff(numpy.concatenate(([0], voiced.astype(numpy.int8), [0])))
+    starts = numpy.flatnonzero(edges == 1)
+    ends = numpy.flatnonzero(edges == -1)
+    # Bridge short pauses: a gap survives only if it is at least min_silence_ms long.
+    gaps = starts[1:] - ends[:-1]
+    keep = numpy.concatenate(([True], gaps * frame_ms >= min_silence_ms))
+    starts = starts[keep]
+    ends = numpy.concatenate((ends[:-1][keep[1:]], ends[-1:]))
+
+    pad = pad_ms // frame_ms
+    starts = numpy.maximum(starts - pad, 0) * frame
+    ends = numpy.minimum((ends + pad) * frame, len(mono))
+    spans: list[tuple[int, int]] = []
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        if spans and start <= spans[-1][1]:
+            # Padding can make neighbours touch when pad_ms * 2 > min_silence_ms.
+            spans[-1] = (spans[-1][0], end)
+        else:
+            spans.append((start, end))
+    return spans
+
+
+class AudioPreprocessor:
+    """Trims leading/trailing silence and shortens long pauses before STT upload.
+
+    WAV/PCM input is decoded with the standard library; compressed input (webm, ogg, mp3)
+    is decoded and re-encoded only when ``ffmpeg`` is on PATH. Anything that cannot be
+    decoded, has no detectable speech or would barely shrink is passed through untouched.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        threshold_db: float = -45.0,
+        min_silence_ms: int = 300,
+        pad_ms: int = 150,
+        min_saving: float = 0.1,
+        ffmpeg_path: str | None = None,
+    ) -> None:
+        self.enabled = enabled
+        self.threshold_db = threshold_db
+        self.min_silence_ms = min_silence_ms
+        self.pad_ms = pad_ms
+        self.min_saving = min_saving
+        self.ffmpeg_path = ffmpeg_path or shutil.which("ffmpeg")
+
+    def process(self, audio_bytes: bytes, content_type: str) -> PreprocessedAudio:
+        passthrough = PreprocessedAudio(audio_bytes, content_type, original_bytes=len(audio_bytes))
+        if not self.enabled:
+            return passthrough
+        # numpy is only imported once a clip actually goes through VAD.
+        if not provider_available("numpy"):
+            passthrough.reason = "numpy_unavailable"
+            return passthrough
+
+        try:
+            decoded = self.decode(audio_bytes, content_type)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Could not decode %s audio for VAD: %s", content_type, exc)
+            decoded = None
+        if decoded is None:
+            passthrough.reason = "undecodable"
+            return passthrough
+        passthrough.decoder = decoded.decoder
+        passthrough.original_ms = passthrough.kept_ms = decoded.duration_ms
+
+        spans = speech_spans(
+            decoded.samples,
+            decoded.sample_rate,
+            threshold_db=self.threshold_db,
+            min_silence_ms=self.min_silence_ms,
+            pad_ms=self.pad_ms,
+        )
+        if not spans:
+            passthrough.reason = "no_speech_detected"
+            return passthrough
+        kept_samples = sum(end - start for start, end in spans)
+        if kept_samples > len(decoded.samples) * (1 - self.min_saving):
+            passthrough.reason = "below_min_saving"
+            return passthrough
+
+        segments: list[tuple[int, int]] = []
+        kept = 0
+        for start, end in spans:
+            segments.append((int(kept * 1000 / decoded.sample_rate), int(start * 1000 / decoded.sample_rate)))
+            kept += end - start
+        trimmed = load_provider("numpy").concatenate([decoded.samples[start:end] for start, end in spans])
+        try:
+            audio_out, content_type_out = self.encode(trimmed, decoded)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Could not re-encode trimmed audio: %s", exc)
+            passthrough.reason = "encode_failed"
+            return passthrough
+
+        return PreprocessedAudio(
+            audio_bytes=audio_out,
+            content_type=content_type_out,
+            original_ms=decoded.duration_ms,
+            kept_ms=int(kept * 1000 / decoded.sample_rate),
+            original_bytes=len(audio_bytes),
+            segments=segments,
+            applied=True,
+            reason="trimmed",
+            decoder=decoded.decoder,
+        )
+
+    def decode(self, audio_bytes: bytes, content_type: str) -> DecodedAudio | None:
+        base_type = (content_type or "").split(";")[0].strip().lower()
+        if base_type in WAV_CONTENT_TYPES or audio_bytes[:4] == b"RIFF":
+            return self._decode_wav(audio_bytes)
+        if self.ffmpeg_path is None:
+            return None
+        pcm = self._run_ffmpeg(
+            ["-i", "pipe:0", "-f", "s16le", "-ac", "1", "-ar", str(DECODE_SAMPLE_RATE), "pipe:1"],
+            audio_bytes,
+        )
+        samples = load_provider("numpy").frombuffer(pcm, dtype="<i2").reshape(-1, 1)
+        return DecodedAudio(samples=samples, sample_rate=DECODE_SAMPLE_RATE, decoder="ffmpeg")
+
+    @staticmethod
+    def _decode_wav(audio_bytes: bytes) -> DecodedAudio | None:
+        with wave.open(io.BytesIO(audio_bytes), "rb") as reader:
+            if reader.getsampwidth() != 2:
+                # 8/24/32-bit PCM is rare from browsers; let STT handle it as-is.
+                return None
+            channels = reader.getnchannels()
+            sample_rate = reader.getframerate()
+            raw = reader.readframes(reader.getnframes())
+        samples = load_provider("numpy").frombuffer(raw, dtype="<i2").reshape(-1, channels)
+        return DecodedAudio(samples=samples, sample_rate=sample_rate, decoder="wav")
+
+    def encode(self, samples: Any, decoded: DecodedAudio) -> tuple[bytes, str]:
+        if decoded.decoder == "wav":
+            buffer = io.BytesIO()
+            with wave.open(buffer, "wb") as writer:
+                writer.setnchannels(samples.shape[1])
+                writer.setsampwidth(2)
+                writer.setframerate(decoded.sample_rate)
+                writer.writeframes(samples.astype("<i2").tobytes())
+            return buffer.getvalue(), "audio/wav"
+        # Re-encode compressed input so the upload does not grow into raw PCM.
+        encoded = self._run_ffmpeg(
+            [
+                "-f", "s16le", "-ar", str(decoded.sample_rate), "-ac", "1", "-i", "pipe:0",
+                "-c:a", "libopus", "-b:a", "32k", "-f", "ogg", "pipe:1",
+            ],
+            samples.astype("<i2").tobytes(),
+        )
+        return encoded, "audio/ogg"
+
+    def _run_ffmpeg(self, args: list[str], stdin: bytes) -> bytes:
+        completed = subprocess.run(
+            [self.ffmpeg_path, "-hide_banner", "-loglevel", "error", *args],
+            input=stdin,
+            capture_output=True,
+            timeout=30,
+            check=False,
+        )
+        if completed.returncode != 0:
+            raise RuntimeError(completed.stderr.decode("utf-8", errors="replace").strip() or "ffmpeg failed")
+        return completed.stdout
+
+
+@dataclass
+class AudioSegment:
+    audio_bytes: bytes
+    content_type: str
+    offset_ms: int
+    duration_ms: int
+
+
+class AudioSplitter:
+    """Cuts long recordings into segments of at most ``max_segment_ms`` at silence boundaries.
+
+    Cut points are the midpoints of pauses found by the VAD; the latest pause that keeps a
+    segment under the limit wins, and a segment with no usable pause is cut hard at the
+    limit. Recordings shorter than ``min_split_ms`` (or that cannot be decoded) are not split.
+    """
+
+    def __init__(
+        self,
+        max_segment_ms: int = 30000,
+        min_split_ms: int = 60000,
+        threshold_db: float = -45.0,
+        min_silence_ms: int = 300,
+        codec: AudioPreprocessor | None = None,
+    ) -> None:
+        self.max_segment_ms = max_segment_ms
+        self.min_split_ms = min_split_ms
+        self.threshold_db = threshold_db
+        self.min_silence_ms = min_silence_ms
+        self.codec = codec or AudioPreprocessor(enabled=False)
+
+    def split(self, audio_bytes: bytes, content_type: str) -> list[AudioSegment]:
+        if not provider_available("numpy"):
+            return []
+        try:
+            decoded = self.codec.decode(audio_bytes, content_type)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Could not decode %s audio for splitting: %s", content_type, exc)
+            return []
+        if decoded is None or decoded.duration_ms < self.min_split_ms:
+            return []
+
+        rate = decoded.sample_rate
+        segments: list[AudioSegment] = []
+        for start, end in self.cut_points(decoded):
+            audio_out, content_type_out = self.codec.encode(decoded.samples[start:end], decoded)
+            segments.append(
+                AudioSegment(
+                    audio_bytes=audio_out,
+                    content_type=content_type_out,
+                    offset_ms=int(start * 1000 / rate),
+                    duration_ms=int((end - start) * 1000 / rate),
+                )
+            )
+        return segments
+
+    def cut_points(self, decoded: DecodedAudio) -> list[tuple[int, int]]:
+        total = len(decoded.samples)
+        max_samples = decoded.sample_rate * self.max_segment_ms // 1000
+        spans = speech_spans(
+            decoded.samples,
+            decoded.sample_rate,
+            threshold_db=self.threshold_db,
+            min_silence_ms=self.min_silence_ms,
+            pad_ms=0,
+        )
+        pauses = [(previous_end + next_start) // 2 for (_, previous_end), (next_start, _) in zip(spans, spans[1:])]
+
+        ranges: list[tuple[int, int]] = []
+        start = 0
+        while total - start > max_samples:
+            limit = start + max_samples
+            # Avoid slivers: only pauses in the back three quarters of the window qualify.
+            floor = start + max_samples // 4
+            candidates = [pause for pause in pauses if floor < pause <= limit]
+            cut = candidates[-1] if candidates else limit
+            ranges.append((start, cut))
+            start = cut
+        ranges.append((start, total))
+        return ranges
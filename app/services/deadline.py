@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import sys
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class DeadlineExceeded(TimeoutError):
+    def __init__(self, stage: str, budget_s: float) -> None:
+        super().__init__(f"Turn budget of {budget_s:.1f}s exhausted during {stage}")
+        self.stage = stage
+        self.budget_s = budget_s
+
+
+class ProviderStatusError(RuntimeError):
+    """A provider answered with an HTTP error ``status``."""
+
+    def __init__(self, message: str, status: int) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+def is_transient(exc: BaseException) -> bool:
+    """True for failures worth retrying: timeouts, dropped connections, 5xx and 429 answers."""
+    if isinstance(exc, (TimeoutError, ConnectionError)):
+        return True
+    # ProviderStatusError and aiohttp.ClientResponseError both carry the HTTP status.
+    status = getattr(exc, "status", None)
+    if isinstance(status, int):
+        return status == 429 or status >= 500
+    # aiohttp is imported lazily; if it was never loaded, none of its errors can be raised.
+    aiohttp = sys.modules.get("aiohttp")
+    return aiohttp is not None and isinstance(exc, aiohttp.ClientConnectionError)
+
+
+class TurnDeadline:
+    """Total latency budget for one voice turn, shared by every provider stage.
+
+    Each stage only gets what is left of the budget. Transient failures of idempotent calls
+    (see ``is_transient``) are retried with jittered exponential backoff, unless the remaining
+    budget could not fit another useful attempt; anything else is raised at once.
+    """
+
+    def __init__(
+        self,
+        budget_s: float,
+        retries: int = 1,
+        backoff_s: float = 0.25,
+        max_backoff_s: float = 2.0,
+        min_attempt_s: float = 1.0,
+    ) -> None:
+        self.budget_s = budget_s
+        self.retries = retries
+        self.backoff_s = backoff_s
+        self.max_backoff_s = max_backoff_s
+        self.min_attempt_s = min_attempt_s
+        self.started = time.monotonic()
+        self.stages: dict[str, dict[str, Any]] = {}
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def remaining(self) -> float:
+        return self.budget_s - self.elapsed()
+
+    async def run(self, stage: str, call: Callable[[], Awaitable[T]], idempotent: bool = True) -> T:
+        retries = self.retries if idempotent else 0
+        attempt = 0
+        stage_started = time.monotonic()
+        while True:
+            remaining = self.remaining()
+            if remaining <= 0:
+                self._record(stage, stage_started, attempt, "budget_exhausted")
+                raise DeadlineExceeded(stage, self.budget_s)
+            try:
+                async with asyncio.timeout(remaining):
+                    result = await call()
+                self._record(stage, stage_started, attempt + 1, "ok")
+                return result
+            except TimeoutError as exc:
+                if self.remaining() <= 0:
+                    self._record(stage, stage_started, attempt + 1, "budget_exhausted")
+                    raise DeadlineExceeded(stage, self.budget_s) from exc
+                error: Exception = exc
+            except Exception as exc:  # noqa: BLE001
+                error = exc
+
+            delay = min(self.max_backoff_s, self.backoff_s * (2**attempt)) * random.uniform(0.5, 1.0)
+            if attempt >= retries or not is_transient(error) or self.remaining() - delay < self.min_attempt_s:
+                self._record(stage, stage_started, attempt + 1, "failed")
+                raise error
+            logger.warning("%s attempt %d failed (%s); retrying in %.2fs", stage, attempt + 1, error, delay)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def _record(self, stage: str, stage_started: float, attempts: int, outcome: str) -> None:
+        self.stages[stage] = {
+            "ms": round((time.monotonic() - stage_started) * 1000, 1),
+            "attempts": attempts,
+            "outcome": outcome,
+        }
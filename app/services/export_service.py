@@ -0,0 +1,424 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import uuid
+from collections.abc import AsyncIterator, Iterator
+from datetime import UTC, datetime
+from typing import Any
+
+from app.core.startup import load_provider_async, provider_available
+from app.repositories.session_store import SessionStore
+
+EXPORT_KINDS = ("sessions", "turns", "events", "conversations")
+EXPORT_FORMATS = ("ndjson", "parquet")
+
+# Flat column layout used for Parquet output. Nested values are stored as JSON strings
+# so every row group shares one schema regardless of payload shape.
+EXPORT_COLUMNS: dict[str, list[tuple[str, str]]] = {
+    "sessions": [
+        ("session_id", "string"),
+        ("created_at", "string"),
+        ("updated_at", "string"),
+        ("turn_count", "int64"),
+        ("turns", "json"),
+        ("_cursor", "string"),
+    ],
+    "turns": [
+        ("session_id", "string"),
+        ("turn_index", "int64"),
+        ("timestamp", "string"),
+        ("user_text", "string"),
+        ("agent_text", "string"),
+        ("audio_mime_type", "string"),
+        ("audio_provider", "string"),
+        ("signals", "json"),
+        ("utterances", "json"),
+        ("_cursor", "string"),
+    ],
+    "events": [
+        ("session_id", "string"),
+        ("line", "int64"),
+        ("timestamp", "string"),
+        ("event_type", "string"),
+        ("payload", "json"),
+        ("_cursor", "string"),
+    ],
+    "conversations": [
+        ("id", "string"),
+        ("patient_phone", "string"),
+        ("started_at", "string"),
+        ("ended_at", "string"),
+        ("duration_seconds", "int64"),
+        ("resolution_type", "string"),
+        ("escalated", "bool"),
+        ("outcome", "string"),
+        ("conversation_json", "json"),
+        ("created_at", "string"),
+        ("isproceed", "bool"),
+        ("_cursor", "string"),
+    ],
+}
+
+
+def parse_timestamp(value: str | datetime | None) -> datetime | None:
+    if value is None or value == "":
+        return None
+    parsed = value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=UTC)
+    return parsed
+
+
+def _in_range(timestamp: str | None, since: datetime | None, until: datetime | None) -> bool:
+    if since is None and until is None:
+        return True
+    parsed = parse_timestamp(timestamp) if timestamp else None
+    if parsed is None:
+        return False
+    if since is not None and parsed < since:
+        return False
+    if until is not None and parsed >= until:
+        return False
+    return True
+
+
+def _split_cursor(cursor: str | None) -> tuple[str, int]:
+    """Cursors are ``<session_id>`` or ``<session_id>:<index>``; a bare id resumes after the session."""
+    if not cursor:
+        return "", -1
+    session_id, _, index = cursor.rpartition(":")
+    if session_id and index.isdigit():
+        return session_id, int(index)
+    return cursor, -1
+
+
+def _split_conversation_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    """Conversation cursors are ``<created_at>|<id>``."""
+    created_text, separator, row_id = cursor.partition("|")
+    if not separator:
+        raise ValueError("Conversation cursors look like <created_at>|<id>")
+    try:
+        return datetime.fromisoformat(created_text), uuid.UUID(row_id)
+    except ValueError as exc:
+        raise ValueError(f"Invalid conversation cursor: {exc}") from exc
+
+
+def validate_export_args(kind: str, after: str | None, limit: int | None) -> None:
+    """Rejects malformed ``after``/``limit`` values before any response bytes are sent."""
+    if limit is not None and limit < 0:
+        raise ValueError("limit must be >= 0")
+    if not after:
+        return
+    if kind == "conversations":
+        _split_conversation_cursor(after)
+        return
+    session_id, separator, index = after.rpartition(":")
+    if (separator and not (session_id and index.isdigit())) or "/" in after or "\\" in after:
+        raise ValueError("Cursors look like <session_id> or <session_id>:<index>")
+
+
+class _ChunkSink:
+    """Write-only file object that lets the Parquet writer be drained between row groups."""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data: bytes) -> int:
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        return None
+
+    def close(self) -> None:
+        self.closed = True
+
+    def writable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return False
+
+    def readable(self) -> bool:
+        return False
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class ExportService:
+    """Streams sessions, turns, events and ``Conversation`` rows without buffering whole datasets.
+
+    Every emitted record carries a ``_cursor`` value; passing it back as ``after`` resumes the
+    export immediately after that record.
+    """
+
+    def __init__(self, session_store: SessionStore, session_factory=None, chunk_size: int = 500) -> None:
+        self.session_store = session_store
+        self.session_factory = session_factory
+        self.chunk_size = chunk_size
+
+    def iter_sessions(
+        self,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        after: str | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        after_session, _ = _split_cursor(after)
+        for session_id in self._session_ids(self.session_store.sessions_path, ".json", after_session, since):
+            if session_id == after_session:
+                continue
+            payload = self._load_session(session_id)
+            if payload is None or not _in_range(payload.get("updated_at"), since, until):
+                continue
+            turns = payload.get("turns", [])
+            yield {
+                "session_id": session_id,
+                "created_at": payload.get("created_at"),
+                "updated_at": payload.get("updated_at"),
+                "turn_count": len(turns),
+                "turns": turns,
+                "_cursor": session_id,
+            }
+
+    def iter_turns(
+        self,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        after: str | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        after_session, after_index = _split_cursor(after)
+        for session_id in self._session_ids(self.session_store.sessions_path, ".json", after_session, since):
+            if session_id == after_session and after_index < 0:
+                continue
+            payload = self._load_session(session_id)
+            if payload is None:
+                continue
+            start = after_index + 1 if session_id == after_session else 0
+            turns = payload.get("turns", [])
+            for index in range(start, len(turns)):
+                turn = turns[index]
+                if not _in_range(turn.get("timestamp"), since, until):
+                    continue
+                yield {"session_id": session_id, "turn_index": index, **turn, "_cursor": f"{session_id}:{index}"}
+
+    def iter_events(
+        self,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        after: str | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        after_session, after_line = _split_cursor(after)
+        for session_id in self._session_ids(self.session_store.events_path, ".jsonl", after_session, since):
+            if session_id == after_session and after_line < 0:
+                continue
+            start = after_line + 1 if session_id == after_session else 0
+            event_file = self.session_store.events_path / f"{session_id}.jsonl"
+            try:
+                handle = event_file.open("r", encoding="utf-8")
+            except FileNotFoundError:
+                continue
+            with handle:
+                for line_no, line in enumerate(handle):
+                    if line_no < start or not line.strip():
+                        continue
+                    event = json.loads(line)
+                    if not _in_range(event.get("timestamp"), since, until):
+                        continue
+                    yield {
+                        "session_id": session_id,
+                        "line": line_no,
+                        "timestamp": event.get("timestamp"),
+                        "event_type": event.get("event_type"),
+                        "payload": event.get("payload", {}),
+                        "_cursor": f"{session_id}:{line_no}",
+                    }
+
+    async def aiter_conversations(
+        self,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        after: str | None = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        from sqlalchemy import and_, or_, select
+
+        from app.models.conversation import Conversation
+
+        session_factory = self.session_factory
+        if session_factory is None:
+            from app.core.database import get_sessionmaker
+
+            session_factory = get_sessionmaker()
+
+        stmt = select(Conversation).where(Conversation.created_at.is_not(None))
+        if since is not None:
+            stmt = stmt.where(Conversation.created_at >= since.astimezone(UTC).replace(tzinfo=None))
+        if until is not None:
+            stmt = stmt.where(Conversation.created_at < until.astimezone(UTC).replace(tzinfo=None))
+        if after:
+            created_at, row_id = _split_conversation_cursor(after)
+            stmt = stmt.where(
+                or_(
+                    Conversation.created_at > created_at,
+                    and_(Conversation.created_at == created_at, Conversation.id > row_id),
+                )
+            )
+        stmt = stmt.order_by(Conversation.created_at, Conversation.id).execution_options(yield_per=self.chunk_size)
+
+        async with session_factory() as db_session:
+            result = await db_session.stream_scalars(stmt)
+            async for row in result:
+                created_at = row.created_at.isoformat() if row.created_at else None
+                yield {
+                    "id": str(row.id),
+                    "patient_phone": row.patient_phone,
+                    "started_at": row.started_at.isoformat() if row.started_at else None,
+                    "ended_at": row.ended_at.isoformat() if row.ended_at else None,
+                    "duration_seconds": row.duration_seconds,
+                    "resolution_type": row.resolution_type,
+                    "escalated": row.escalated,
+                    "outcome": row.outcome,
+                    "conversation_json": row.conversation_json,
+                    "created_at": created_at,
+                    "isproceed": row.isproceed,
+                    "_cursor": f"{created_at}|{row.id}",
+                }
+
+    async def aiter_records(
+        self,
+        kind: str,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        after: str | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        if kind not in EXPORT_KINDS:
+            raise ValueError(f"Unknown export kind: {kind}")
+
+        if kind == "conversations":
+            records = self.aiter_conversations(since=since, until=until, after=after)
+        else:
+            iterator = getattr(self, f"iter_{kind}")(since=since, until=until, after=after)
+            records = self._aiter_in_thread(iterator)
+
+        emitted = 0
+        async for record in records:
+            if limit is not None and emitted >= limit:
+                break
+            emitted += 1
+            yield record
+
+    async def aiter_encoded(
+        self,
+        kind: str,
+        fmt: str = "ndjson",
+        since: datetime | None = None,
+        until: datetime | None = None,
+        after: str | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[bytes]:
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format: {fmt}")
+        if fmt == "parquet" and not provider_available("pyarrow"):
+            raise RuntimeError("pyarrow is required for Parquet export.")
+
+        records = self.aiter_records(kind, since=since, until=until, after=after, limit=limit)
+        if fmt == "ndjson":
+            async for record in records:
+                yield (json.dumps(record, ensure_ascii=True, default=str) + "\n").encode("utf-8")
+            return
+
+        # pyarrow is only imported by workers that actually write Parquet.
+        parquet = await load_provider_async("pyarrow.parquet")
+        pyarrow = await load_provider_async("pyarrow")
+        schema = self._parquet_schema(pyarrow, kind)
+        sink = _ChunkSink()
+        writer = parquet.ParquetWriter(sink, schema)
+        batch: list[dict[str, Any]] = []
+        try:
+            async for record in records:
+                batch.append(self._flatten(kind, record))
+                if len(batch) >= self.chunk_size:
+                    writer.write_table(pyarrow.Table.from_pylist(batch, schema=schema))
+                    batch.clear()
+                    yield sink.drain()
+            if batch:
+                writer.write_table(pyarrow.Table.from_pylist(batch, schema=schema))
+        finally:
+            writer.close()
+        yield sink.drain()
+
+    async def _aiter_in_thread(self, iterator: Iterator[dict[str, Any]]) -> AsyncIterator[dict[str, Any]]:
+        # File reads happen off the event loop, one bounded chunk at a time.
+        def next_chunk() -> list[dict[str, Any]]:
+            chunk: list[dict[str, Any]] = []
+            for record in iterator:
+                chunk.append(record)
+                if len(chunk) >= self.chunk_size:
+                    break
+            return chunk
+
+        while True:
+            chunk = await asyncio.to_thread(next_chunk)
+            if not chunk:
+                return
+            for record in chunk:
+                yield record
+
+    def _load_session(self, session_id: str) -> dict[str, Any] | None:
+        try:
+            return self.session_store._read_session(session_id)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    @staticmethod
+    def _session_ids(directory, suffix: str, after_session: str, since: datetime | None) -> Iterator[str]:
+        # Only file names are held in memory; contents are read one file at a time.
+        since_ts = since.timestamp() if since is not None else None
+        names: list[str] = []
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if not entry.name.endswith(suffix):
+                    continue
+                session_id = entry.name[: -len(suffix)]
+                if after_session and session_id < after_session:
+                    continue
+                # Files untouched since the start of the window cannot hold matching records.
+                if since_ts is not None and entry.stat().st_mtime < since_ts:
+                    continue
+                names.append(session_id)
+        names.sort()
+        yield from names
+
+    @staticmethod
+    def _flatten(kind: str, record: dict[str, Any]) -> dict[str, Any]:
+        row: dict[str, Any] = {}
+        for name, column_type in EXPORT_COLUMNS[kind]:
+            value = record.get(name)
+            if column_type == "json":
+                value = None if value is None else json.dumps(value, ensure_ascii=True, default=str)
+            elif column_type == "string" and value is not None:
+                value = str(value)
+            row[name] = value
+        return row
+
+    @staticmethod
+    def _parquet_schema(pyarrow, kind: str):
+        types = {
+            "string": pyarrow.string(),
+            "json": pyarrow.string(),
+            "int64": pyarrow.int64(),
+            "bool": pyarrow.bool_(),
+        }
+        return pyarrow.schema([(name, types[column_type]) for name, column_type in EXPORT_COLUMNS[kind]])
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any
+
+MAX_KEY_LENGTH = 255
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    status_code: int
+    body: bytes
+
+
+class IdempotencyStore:
+    """Replays responses for retried requests that carry the same ``Idempotency-Key``.
+
+    Requests are identified by a fingerprint of the key, the audio and the request scope
+    (session, mode), so reusing a key for different audio runs it as a new request. A
+    duplicate that arrives while the first execution is still running waits for it instead
+    of starting another; one that arrives later gets the stored body back. Stored bodies
+    expire after ``ttl_s`` and the oldest are evicted once they exceed ``max_bytes``.
+    Failed executions are not stored, so a retry after an error runs again.
+    """
+
+    def __init__(self, ttl_s: float = 600.0, max_bytes: int = 64 * 1024 * 1024) -> None:
+        self.ttl_s = ttl_s
+        self.max_bytes = max_bytes
+        # Insertion order is expiry order: entries are never reordered and share one TTL.
+        self._entries: OrderedDict[str, tuple[float, StoredResponse]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Future[StoredResponse]] = {}
+        self._bytes = 0
+        self.executed = 0
+        self.replayed = 0
+        self.joined = 0
+        self.evictions = 0
+        self.oversized = 0
+
+    @staticmethod
+    def fingerprint(key: str, audio_bytes: bytes, *scope: str | None) -> str:
+        digest = hashlib.sha256(key.encode("utf-8"))
+        digest.update(b"\x1f" + "\x1f".join(part or "" for part in scope).encode("utf-8") + b"\x1f")
+        digest.update(audio_bytes)
+        return digest.hexdigest()
+
+    async def run(
+        self,
+        fingerprint: str,
+        execute: Callable[[], Awaitable[StoredResponse]],
+    ) -> tuple[StoredResponse, bool]:
+        """Returns ``(response, replayed)``; ``execute`` runs at most once per live fingerprint."""
+        while True:
+            stored = self._lookup(fingerprint)
+            if stored is not None:
+                self.replayed += 1
+                return stored, True
+            inflight = self._inflight.get(fingerprint)
+            if inflight is None:
+                break
+            self.joined += 1
+            try:
+                return await asyncio.shield(inflight), True
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise
+                # The original request was cancelled; the next duplicate takes over.
+
+        future: asyncio.Future[StoredResponse] = asyncio.get_running_loop().create_future()
+        self._inflight[fingerprint] = future
+        self.executed += 1
+        try:
+            response = await execute()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            # Mark retrieved: with no duplicates waiting nobody else will read it.
+            future.exception()
+            raise
+        finally:
+            del self._inflight[fingerprint]
+        self._store(fingerprint, response)
+        future.set_result(response)
+        return response, False
+
+    def _lookup(self, fingerprint: str) -> StoredResponse | None:
+        self._expire()
+        entry = self._entries.get(fingerprint)
+        return entry[1] if entry is not None else None
+
+    def _store(self, fingerprint: str, response: StoredResponse) -> None:
+        size = len(response.body)
+        if size > self.max_bytes:
+            self.oversized += 1
+            return
+        self._entries[fingerprint] = (time.monotonic() + self.ttl_s, response)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            self._pop_oldest()
+            self.evictions += 1
+
+    def _expire(self) -> None:
+        now = time.monotonic()
+        while self._entries and next(iter(self._entries.values()))[0] <= now:
+            self._pop_oldest()
+
+    def _pop_oldest(self) -> None:
+        _, (_, response) = self._entries.popitem(last=False)
+        self._bytes -= len(response.body)
+
+    def stats(self) -> dict[str, Any]:
+        self._expire()
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "ttl_s": self.ttl_s,
+            "in_flight": len(self._inflight),
+            "executed": self.executed,
+            "replayed": self.replayed,
+            "joined": self.joined,
+            "evictions": self.evictions,
+            "oversized": self.oversized,
+        }
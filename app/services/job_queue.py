@@ -0,0 +1,264 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Any
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+BatchHandler = Callable[[list["QueuedJob"]], Awaitable[None]]
+
+
+@dataclass
+class JournalClaim:
+    path: Path
+    slot: int
+    lock_handle: IO[str] | None = None
+
+    def release(self) -> None:
+        if self.lock_handle is not None:
+            self.lock_handle.close()
+            self.lock_handle = None
+
+
+def claim_journal(directory: str | Path, stem: str, max_slots: int = 64) -> JournalClaim:
+    """Picks a journal file that no other live worker process is using.
+
+    Slot 0 is ``<stem>.jsonl`` and slot ``n`` is ``<stem>.<n>.jsonl``; each is guarded by an
+    exclusive ``flock`` on a sibling ``.lock`` file that the OS drops when its holder exits.
+    Workers sharing a data directory therefore never replay each other's jobs, and a
+    restarted pool of the same size reclaims (and replays) every journal it left behind.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    if fcntl is None:
+        return JournalClaim(path=directory / f"{stem}.jsonl", slot=0)
+    for slot in range(max_slots):
+        name = stem if slot == 0 else f"{stem}.{slot}"
+        handle = (directory / f"{name}.lock").open("a", encoding="utf-8")
+        try:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            handle.close()
+            continue
+        return JournalClaim(path=directory / f"{name}.jsonl", slot=slot, lock_handle=handle)
+    raise RuntimeError(f"All {max_slots} {stem} journal slots in {directory} are held by other processes")
+
+
+class QueuedJob:
+    """A job as seen by the batch handler.
+
+    ``complete(step)`` journals a finished side effect at once, so a retried job (after a
+    crash, or a later failure in the same batch) can skip it with ``done(step)``.
+    ``fail(exc)`` retries just this job while the rest of the batch is acknowledged.
+    """
+
+    __slots__ = ("_queue", "_job", "error")
+
+    def __init__(self, queue: DurableJobQueue, job: dict[str, Any]) -> None:
+        self._queue = queue
+        self._job = job
+        self.error: BaseException | None = None
+
+    @property
+    def id(self) -> str:
+        return self._job["id"]
+
+    @property
+    def payload(self) -> dict[str, Any]:
+        return self._job["payload"]
+
+    def done(self, step: str) -> bool:
+        return step in self._job.get("steps", ())
+
+    def complete(self, step: str) -> None:
+        if self.done(step):
+            return
+        self._job.setdefault("steps", []).append(step)
+        self._queue._append({"op": "step", "id": self.id, "step": step})
+
+    def fail(self, exc: BaseException) -> None:
+        self.error = exc
+
+
+class DurableJobQueue:
+    """In-process job queue backed by an append-only JSONL journal.
+
+    Jobs are journaled before they are acknowledged to the caller and marked done only
+    after the handler succeeds, so jobs pending at shutdown or crash are replayed on the
+    next start. Workers hand jobs to the handler in batches of up to ``batch_size``,
+    waiting at most ``max_wait_s`` for a batch to fill. Handlers journal completed steps
+    and fail individual jobs through ``QueuedJob``; a job is acknowledged only when the
+    handler returns without failing it.
+    """
+
+    def __init__(
+        self,
+        journal_path: str | Path,
+        handler: BatchHandler,
+        batch_size: int = 10,
+        max_wait_s: float = 30.0,
+        workers: int = 1,
+        max_attempts: int = 3,
+        compact_after: int = 1000,
+    ) -> None:
+        self.journal_path = Path(journal_path)
+        self.handler = handler
+        self.batch_size = batch_size
+        self.max_wait_s = max_wait_s
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.compact_after = compact_after
+        self._queue: asyncio.Queue[dict[str, Any]] | None = None
+        self._tasks: list[asyncio.Task[None]] = []
+        self._pending: dict[str, dict[str, Any]] = {}
+        self._journal_lines = 0
+        self.processed = 0
+        self.failed = 0
+        self.batches = 0
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue()
+        self._pending = self._recover()
+        self._rewrite_journal()
+        for job in self._pending.values():
+            self._queue.put_nowait(job)
+        if self._pending:
+            logger.info("Recovered %d pending jobs from %s", len(self._pending), self.journal_path)
+        self._tasks = [asyncio.create_task(self._worker(index)) for index in range(self.workers)]
+
+    async def stop(self, drain_timeout_s: float = 10.0) -> None:
+        if not self._tasks:
+            return
+        try:
+            async with asyncio.timeout(drain_timeout_s):
+                await self._queue.join()  # type: ignore[union-attr]
+        except TimeoutError:
+            logger.warning("Stopping %s with %d jobs still pending", self.journal_path.name, len(self._pending))
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def enqueue(self, payload: dict[str, Any]) -> str:
+        self.start()
+        job = {"id": str(uuid.uuid4()), "enqueued_at": time.time(), "attempts": 0, "payload": payload}
+        self._append({"op": "enqueue", "job": job})
+        self._pending[job["id"]] = job
+        self._queue.put_nowait(job)  # type: ignore[union-attr]
+        return job["id"]
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "pending": len(self._pending),
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "processed": self.processed,
+            "failed": self.failed,
+            "batches": self.batches,
+        }
+
+    async def _worker(self, index: int) -> None:
+        assert self._queue is not None
+        while True:
+            batch = [await self._queue.get()]
+            deadline = time.monotonic() + self.max_wait_s
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+                except TimeoutError:
+                    break
+            try:
+                await self._run_batch(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _run_batch(self, batch: list[dict[str, Any]]) -> None:
+        jobs = [QueuedJob(self, job) for job in batch]
+        try:
+            await self.handler(jobs)
+        except Exception as exc:  # noqa: BLE001
+            logger.exception("Job batch of %d failed: %s", len(batch), exc)
+            for job in batch:
+                self._retry(job)
+            return
+
+        self.batches += 1
+        for queued, job in zip(jobs, batch):
+            if queued.error is not None:
+                logger.warning("Job %s failed: %s", job["id"], queued.error)
+                self._retry(job)
+            else:
+                self.processed += 1
+                self._finish(job["id"], "ack")
+        if not self._pending and self._journal_lines >= self.compact_after:
+            self._rewrite_journal()
+
+    def _retry(self, job: dict[str, Any]) -> None:
+        job["attempts"] += 1
+        if job["attempts"] >= self.max_attempts:
+            self.failed += 1
+            logger.error("Job %s dead-lettered after %d attempts (steps done: %s)", job["id"], job["attempts"], job.get("steps", []))
+            self._finish(job["id"], "dead")
+        else:
+            self._append({"op": "retry", "id": job["id"], "attempts": job["attempts"]})
+            self._queue.put_nowait(job)  # type: ignore[union-attr]
+
+    def _finish(self, job_id: str, op: str) -> None:
+        self._pending.pop(job_id, None)
+        self._append({"op": op, "id": job_id})
+
+    def _recover(self) -> dict[str, dict[str, Any]]:
+        pending: dict[str, dict[str, Any]] = {}
+        if not self.journal_path.exists():
+            return pending
+        with self.journal_path.open("r", encoding="utf-8") as handle:
+            for line in handle:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn final line from a crash mid-write; everything before it is intact.
+                    continue
+                op = record.get("op")
+                if op == "enqueue":
+                    pending[record["job"]["id"]] = record["job"]
+                elif op == "retry" and record.get("id") in pending:
+                    pending[record["id"]]["attempts"] = record.get("attempts", 0)
+                elif op == "step" and record.get("id") in pending:
+                    steps = pending[record["id"]].setdefault("steps", [])
+                    if record.get("step") not in steps:
+                        steps.append(record.get("step"))
+                elif op in {"ack", "dead"}:
+                    pending.pop(record.get("id"), None)
+        return pending
+
+    def _rewrite_journal(self) -> None:
+        self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.journal_path.with_suffix(".tmp")
+        with tmp_path.open("w", encoding="utf-8") as handle:
+            for job in self._pending.values():
+                handle.write(json.dumps({"op": "enqueue", "job": job}, ensure_ascii=True) + os.linesep)
+        os.replace(tmp_path, self.journal_path)
+        self._journal_lines = len(self._pending)
+
+    def _append(self, record: dict[str, Any]) -> None:
+        with self.journal_path.open("a", encoding="utf-8") as handle:
+            handle.write(json.dumps(record, ensure_ascii=True) + os.linesep)
+        self._journal_lines += 1
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import json
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from app.schemas.voice_loop import EmotionResult, IntentResult
+
+DEFAULT_LEXICON_PATH = Path(__file__).resolve().parents[1] / "data" / "lexicon.json"
+
+_TERMINAL = ""
+
+
+@dataclass(frozen=True)
+class LexiconEntry:
+    kind: str
+    label: str
+    confidence: float
+
+
+@dataclass(frozen=True)
+class LexiconScan:
+    """Every lexicon hit in one text, grouped by kind and label."""
+
+    hits: dict[str, Counter] = field(default_factory=dict)
+
+    def labels(self, kind: str) -> Counter:
+        return self.hits.get(kind, Counter())
+
+    def count(self, kind: str) -> int:
+        return sum(self.labels(kind).values())
+
+
+def _insert(trie: dict, keyword: str, entry: LexiconEntry) -> None:
+    prefix = keyword.endswith("*")
+    node = trie
+    for char in " ".join(keyword.rstrip("*").lower().split()):
+        node = node.setdefault(char, {})
+    terminal = node.setdefault(_TERMINAL, {"exact": [], "prefix": []})
+    terminal["prefix" if prefix else "exact"].append(entry)
+
+
+def _trie_pattern(node: dict) -> str:
+    """Renders a keyword trie as a factored regex so shared prefixes are matched once."""
+    alternatives = []
+    for char in sorted(key for key in node if key != _TERMINAL):
+        atom = r"\s+" if char == " " else re.escape(char)
+        alternatives.append(atom + _trie_pattern(node[char]))
+    terminal = node.get(_TERMINAL)
+    if terminal and terminal["prefix"]:
+        alternatives.append(r"\w*\b")
+    elif terminal and terminal["exact"]:
+        alternatives.append(r"\b")
+    if len(alternatives) == 1:
+        return alternatives[0]
+    return "(?:" + "|".join(alternatives) + ")"
+
+
+class Lexicon:
+    """Keyword lexicon for intent, emotion and toxicity signals compiled into one regex.
+
+    Keywords match on word boundaries; a trailing ``*`` matches any word starting with the
+    stem (``book*`` matches "booking"). All keywords share one trie rendered as a single
+    regex, so one ``finditer`` pass yields every hit and its cost barely depends on how many
+    keywords there are; each hit is mapped back to its labels by walking the same trie.
+    Intent and emotion labels are listed in priority order.
+    """
+
+    def __init__(self, config: dict[str, Any]) -> None:
+        self.config = config
+        self.priority: dict[str, list[str]] = {"intent": [], "emotion": []}
+        self._confidence: dict[tuple[str, str], float] = {}
+        self._trie: dict = {}
+
+        sections = [("intent", item) for item in config.get("intents", [])]
+        sections += [("emotion", item) for item in config.get("emotions", [])]
+        toxicity = config.get("toxicity", {})
+        if toxicity.get("keywords"):
+            sections.append(("toxicity", {"label": "toxic", "confidence": toxicity.get("risk", 0.7), **toxicity}))
+
+        for kind, item in sections:
+            entry = LexiconEntry(kind=kind, label=item["label"], confidence=float(item["confidence"]))
+            self._confidence[(kind, entry.label)] = entry.confidence
+            if kind in self.priority:
+                self.priority[kind].append(entry.label)
+            for keyword in item.get("keywords", []):
+                _insert(self._trie, keyword, entry)
+
+        self.pattern = re.compile(r"\b" + _trie_pattern(self._trie), re.IGNORECASE) if self._trie else None
+        self.scan = lru_cache(maxsize=256)(self._scan)
+
+    @classmethod
+    def from_file(cls, path: str | Path) -> Lexicon:
+        with open(path, encoding="utf-8") as handle:
+            return cls(json.load(handle))
+
+    def _scan(self, text: str) -> LexiconScan:
+        hits: dict[str, Counter] = {}
+        if self.pattern is not None and text:
+            for match in self.pattern.finditer(text):
+                for entry in self._resolve(match.group(0)):
+                    hits.setdefault(entry.kind, Counter())[entry.label] += 1
+        return LexiconScan(hits=hits)
+
+    def _resolve(self, matched: str) -> list[LexiconEntry]:
+        # Exact keywords must consume the whole match; otherwise the longest stem wins.
+        node = self._trie
+        best: list[LexiconEntry] = []
+        for char in " ".join(matched.lower().split()):
+            node = node.get(char)
+            if node is None:
+                break
+            terminal = node.get(_TERMINAL)
+            if terminal and terminal["prefix"]:
+                best = terminal["prefix"]
+        else:
+            terminal = node.get(_TERMINAL)
+            if terminal and terminal["exact"]:
+                return terminal["exact"] + [entry for entry in best if entry not in terminal["exact"]]
+        return best
+
+    def intent(self, text: str) -> IntentResult:
+        found = self.scan(text).labels("intent")
+        for label in self.priority["intent"]:
+            if found[label]:
+                return IntentResult(label=label, confidence=self._confidence[("intent", label)], reason="keyword_match")
+        fallback = self.config.get("intent_fallback", {"label": "general_inquiry", "confidence": 0.55})
+        return IntentResult(label=fallback["label"], confidence=fallback["confidence"], reason="fallback")
+
+    def emotion(self, text: str) -> EmotionResult:
+        found = self.scan(text).labels("emotion")
+        for label in self.priority["emotion"]:
+            if found[label]:
+                return EmotionResult(label=label, confidence=self._confidence[("emotion", label)], source="text_heuristic")
+        fallback = self.config.get("emotion_fallback", {"label": "Neutral", "confidence": 0.6})
+        return EmotionResult(label=fallback["label"], confidence=fallback["confidence"], source="text_heuristic")
+
+    def toxicity_risk(self, text: str) -> float:
+        toxicity = self.config.get("toxicity", {})
+        if self.scan(text).count("toxicity"):
+            return float(toxicity.get("risk", 0.7))
+        return float(toxicity.get("baseline", 0.05))
+
+
+_default_lexicons: dict[str, Lexicon] = {}
+
+
+def get_lexicon(path: str | Path | None = None) -> Lexicon:
+    """Returns the shared lexicon for ``path`` (the bundled ``app/data/lexicon.json`` by default)."""
+    key = str(path or DEFAULT_LEXICON_PATH)
+    lexicon = _default_lexicons.get(key)
+    if lexicon is None:
+        lexicon = Lexicon.from_file(key)
+        _default_lexicons[key] = lexicon
+    return lexicon
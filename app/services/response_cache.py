@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import hashlib
+import re
+import time
+from collections import OrderedDict
+from typing import Any
+
+_NON_WORD = re.compile(r"[^\w\s']+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(text: str) -> str:
+    """Lowercases, drops punctuation and collapses whitespace so trivial variants share a key."""
+    return _WHITESPACE.sub(" ", _NON_WORD.sub(" ", text.lower())).strip()
+
+
+class ResponseCache:
+    """TTL + LRU cache of assistant answers for repeated, context-free questions.
+
+    Keys combine the normalized transcript, the active rules version and a digest of the
+    conversation summary, so a rules update or any prior context naturally misses. Only
+    intents in ``allowed_intents`` are ever cached.
+    """
+
+    def __init__(self, max_entries: int = 512, ttl_s: float = 600.0, allowed_intents: set[str] | None = None) -> None:
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.allowed_intents = frozenset(allowed_intents or ())
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def key(self, intent: str, text: str, rules_version: str | None, summary_digest: str) -> str | None:
+        if intent not in self.allowed_intents:
+            return None
+        normalized = normalize_query(text)
+        if not normalized:
+            return None
+        raw = "\x1f".join((normalized, rules_version or "", summary_digest))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str | None) -> str | None:
+        if key is None:
+            self.bypassed += 1
+            return None
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: str | None, value: str) -> None:
+        if key is None or not value:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl_s, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_s": self.ttl_s,
+            "allowed_intents": sorted(self.allowed_intents),
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import hashlib
+from collections import deque
+from typing import Any
+
+NO_PRIOR_CONTEXT = "No prior context."
+SUMMARY_MAX_MESSAGES = 12
+SUMMARY_MAX_MESSAGE_CHARS = 220
+SUMMARY_CHAR_BUDGET = 4000
+
+
+def format_summary_line(role: str, content: Any) -> str:
+    text = " ".join(str(content).split())
+    if len(text) > SUMMARY_MAX_MESSAGE_CHARS:
+        text = text[:SUMMARY_MAX_MESSAGE_CHARS] + "..."
+    return f"- {role.capitalize()}: {text}"
+
+
+class RollingSummary:
+    """Per-session conversation summary maintained one message at a time.
+
+    Keeps at most ``max_messages`` formatted lines and never more than ``char_budget``
+    characters, so rendering the prompt summary costs the same on turn 2 and turn 200.
+    """
+
+    def __init__(
+        self,
+        max_messages: int = SUMMARY_MAX_MESSAGES,
+        char_budget: int = SUMMARY_CHAR_BUDGET,
+        lines: list[str] | None = None,
+        message_count: int = 0,
+    ) -> None:
+        self.max_messages = max_messages
+        self.char_budget = char_budget
+        self.lines: deque[str] = deque(maxlen=max_messages)
+        self.message_count = message_count
+        self._chars = 0
+        self._rendered: str | None = None
+        for line in lines or []:
+            self._push(line)
+
+    def append(self, role: str, content: Any) -> None:
+        self._push(format_summary_line(role, content))
+        self.message_count += 1
+
+    def append_turn(self, turn: dict[str, Any]) -> None:
+        if turn.get("user_text"):
+            self.append("user", turn["user_text"])
+        if turn.get("agent_text"):
+            self.append("assistant", turn["agent_text"])
+
+    def render(self) -> str:
+        if self._rendered is None:
+            if not self.lines:
+                self._rendered = NO_PRIOR_CONTEXT
+            else:
+                self._rendered = "Conversation summary:\n" + "\n".join(self.lines)
+        return self._rendered
+
+    def digest(self) -> str:
+        return hashlib.sha256(self.render().encode("utf-8")).hexdigest()[:16]
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "max_messages": self.max_messages,
+            "char_budget": self.char_budget,
+            "message_count": self.message_count,
+            "lines": list(self.lines),
+        }
+
+    @classmethod
+    def from_dict(cls, payload: dict[str, Any]) -> RollingSummary:
+        return cls(
+            max_messages=int(payload.get("max_messages", SUMMARY_MAX_MESSAGES)),
+            char_budget=int(payload.get("char_budget", SUMMARY_CHAR_BUDGET)),
+            lines=list(payload.get("lines", [])),
+            message_count=int(payload.get("message_count", 0)),
+        )
+
+    @classmethod
+    def from_turns(cls, turns: list[dict[str, Any]]) -> RollingSummary:
+        summary = cls()
+        for turn in turns:
+            summary.append_turn(turn)
+        return summary
+
+    def _push(self, line: str) -> None:
+        if len(self.lines) == self.lines.maxlen:
+            self._chars -= len(self.lines[0])
+        self.lines.append(line)
+        self._chars += len(line)
+        while len(self.lines) > 1 and self._chars > self.char_budget:
+            self._chars -= len(self.lines.popleft())
+        self._rendered = None
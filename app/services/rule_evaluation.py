@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import asyncio
+import re
+import statistics
+import time
+from collections.abc import AsyncIterator, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Protocol
+
+from app.repositories.rules_registry import RulesSnapshot
+from app.services.export_service import ExportService
+from app.services.rolling_summary import RollingSummary
+
+_SENTENCE_END = re.compile(r"[.!?]+(?:\s|$)")
+_WORD = re.compile(r"[a-z0-9']+")
+_BOOKING_WORDS = ("book", "schedule", "appointment", "reschedule")
+_CONFIRM_WORDS = ("confirm", "to confirm", "just to check", "is that correct", "does that work")
+_FABRICATION_HINTS = ("we are open", "our hours are", "our policy is", "is available at", "i have booked")
+
+
+class PromptCompleter(Protocol):
+    async def complete_prompt(self, user_prompt: str, system_prompt: str = "", session=None) -> str:
+        ...
+
+
+@dataclass(frozen=True)
+class EvaluationCase:
+    conversation_id: str
+    turn_index: int
+    summary: str
+    user_text: str
+    reference_text: str
+
+
+def cases_from_turns(conversation_id: str, turns: list[dict[str, Any]]) -> Iterator[EvaluationCase]:
+    """Turns are ``{"user": ..., "assistant": ...}`` pairs; each user turn becomes one case."""
+    summary = RollingSummary()
+    for index, turn in enumerate(turns):
+        user_text = turn.get("user") or ""
+        reference = turn.get("assistant") or ""
+        if user_text:
+            yield EvaluationCase(conversation_id, index, summary.render(), user_text, reference)
+            summary.append("user", user_text)
+        if reference:
+            summary.append("assistant", reference)
+
+
+def iter_session_cases(export_service: ExportService, since=None, until=None, limit: int | None = None) -> Iterator[EvaluationCase]:
+    conversations = 0
+    for record in export_service.iter_sessions(since=since, until=until):
+        if limit is not None and conversations >= limit:
+            return
+        turns = [{"user": turn.get("user_text"), "assistant": turn.get("agent_text")} for turn in record["turns"]]
+        conversations += 1
+        yield from cases_from_turns(record["session_id"], turns)
+
+
+async def aiter_db_cases(export_service: ExportService, since=None, until=None, limit: int | None = None) -> AsyncIterator[EvaluationCase]:
+    async for record in export_service.aiter_records("conversations", since=since, until=until, limit=limit):
+        conversation = record.get("conversation_json") or {}
+        turns = conversation.get("turns", []) if isinstance(conversation, dict) else conversation
+        for case in cases_from_turns(record["id"], turns or []):
+            yield case
+
+
+def score_output(case: dict[str, Any], output: str, rules: tuple[str, ...]) -> dict[str, Any]:
+    """Heuristic, deterministic quality score in [0, 1] for one assistant answer.
+
+    Runs in worker processes, so it only takes plain data.
+    """
+    text = output.strip()
+    lowered = text.lower()
+    sentences = len(_SENTENCE_END.findall(text)) or (1 if text else 0)
+    words = _WORD.findall(lowered)
+    reference_words = set(_WORD.findall(case["reference_text"].lower()))
+    overlap = len(reference_words & set(words)) / len(reference_words | set(words)) if reference_words and words else 0.0
+    booking_turn = any(word in case["user_text"].lower() for word in _BOOKING_WORDS)
+
+    metrics = {
+        "conversation_id": case["conversation_id"],
+        "turn_index": case["turn_index"],
+        "empty": not text,
+        "sentences": sentences,
+        "words": len(words),
+        "within_sentence_limit": sentences <= 5,
+        "asks_question": "?" in text,
+        "confirms_details": any(phrase in lowered for phrase in _CONFIRM_WORDS),
+        "possible_fabrication": any(phrase in lowered for phrase in _FABRICATION_HINTS),
+        "reference_overlap": round(overlap, 4),
+    }
+
+    score = 0.0
+    if text:
+        score += 0.3 if metrics["within_sentence_limit"] else 0.0
+        score += 0.15 if metrics["asks_question"] else 0.0
+        score += 0.15 if (metrics["confirms_details"] or not booking_turn) else 0.0
+        score += 0.2 if not metrics["possible_fabrication"] else 0.0
+        score += 0.2 * overlap
+    metrics["score"] = round(score, 4)
+    metrics["rules_count"] = len(rules)
+    return metrics
+
+
+def score_batch(items: list[tuple[dict[str, Any], str, tuple[str, ...]]]) -> list[dict[str, Any]]:
+    return [score_output(case, output, rules) for case, output, rules in items]
+
+
+class RuleSetEvaluator:
+    """Replays stored user turns against a baseline and a candidate rule set and scores both.
+
+    LLM calls run with bounded async concurrency; scoring is CPU-bound and runs in a process pool.
+    """
+
+    def __init__(
+        self,
+        completer: PromptCompleter,
+        build_prompt,
+        concurrency: int = 16,
+        workers: int | None = None,
+        score_chunk_size: int = 64,
+    ) -> None:
+        self.completer = completer
+        self.build_prompt = build_prompt
+        self.concurrency = concurrency
+        self.workers = workers
+        self.score_chunk_size = score_chunk_size
+
+    async def evaluate(
+        self,
+        cases: Iterable[EvaluationCase] | AsyncIterator[EvaluationCase],
+        rule_sets: dict[str, RulesSnapshot],
+        session=None,
+    ) -> dict[str, Any]:
+        started = time.perf_counter()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        loop = asyncio.get_running_loop()
+        pending_scores: list[asyncio.Future] = []
+        outputs: dict[str, list[tuple[dict[str, Any], str, tuple[str, ...]]]] = {name: [] for name in rule_sets}
+        errors = 0
+
+        async def replay(case: EvaluationCase, name: str, rules: RulesSnapshot) -> None:
+            nonlocal errors
+            prompt = self.build_prompt(case.summary, case.user_text, rules.prompt_text)
+            async with semaphore:
+                try:
+                    output = await self.completer.complete_prompt(prompt, session=session)
+                except Exception:  # noqa: BLE001
+                    errors += 1
+                    output = ""
+            outputs[name].append((asdict(case), output, rules.rules))
+
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            scored: dict[str, list[dict[str, Any]]] = {name: [] for name in rule_sets}
+
+            def flush(name: str, force: bool = False) -> None:
+                while outputs[name] and (force or len(outputs[name]) >= self.score_chunk_size):
+                    chunk = outputs[name][: self.score_chunk_size]
+                    del outputs[name][: self.score_chunk_size]
+                    future = loop.run_in_executor(pool, score_batch, chunk)
+                    future.add_done_callback(lambda done, key=name: scored[key].extend(done.result()))
+                    pending_scores.append(future)
+
+            in_flight: set[asyncio.Task] = set()
+            case_count = 0
+            async for case in _aiter(cases):
+                case_count += 1
+                for name, rules in rule_sets.items():
+                    task = asyncio.create_task(replay(case, name, rules))
+                    in_flight.add(task)
+                    task.add_done_callback(in_flight.discard)
+                # Keep memory bounded: never hold more than a few batches of replays in flight.
+                if len(in_flight) >= self.concurrency * 4:
+                    await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for name in rule_sets:
+                    flush(name)
+            if in_flight:
+                await asyncio.wait(in_flight)
+            for name in rule_sets:
+                flush(name, force=True)
+            await asyncio.gather(*pending_scores)
+
+        report = {
+            "cases": case_count,
+            "llm_errors": errors,
+            "elapsed_s": round(time.perf_counter() - started, 2),
+            "rule_sets": {name: self._summarize(rule_sets[name], scored[name]) for name in rule_sets},
+        }
+        names = list(rule_sets)
+        if len(names) == 2:
+            report["comparison"] = self._compare(names[0], names[1], scored[names[0]], scored[names[1]])
+        return report
+
+    @staticmethod
+    def _summarize(rules: RulesSnapshot, results: list[dict[str, Any]]) -> dict[str, Any]:
+        if not results:
+            return {"version": rules.version, "n": 0}
+        return {
+            "version": rules.version,
+            "n": len(results),
+            "mean_score": round(statistics.fmean(item["score"] for item in results), 4),
+            "within_sentence_limit": round(statistics.fmean(item["within_sentence_limit"] for item in results), 4),
+            "asks_question": round(statistics.fmean(item["asks_question"] for item in results), 4),
+            "confirms_details": round(statistics.fmean(item["confirms_details"] for item in results), 4),
+            "possible_fabrication": round(statistics.fmean(item["possible_fabrication"] for item in results), 4),
+            "mean_reference_overlap": round(statistics.fmean(item["reference_overlap"] for item in results), 4),
+            "empty": sum(item["empty"] for item in results),
+        }
+
+    @staticmethod
+    def _compare(
+        baseline_name: str,
+        candidate_name: str,
+        baseline: list[dict[str, Any]],
+        candidate: list[dict[str, Any]],
+    ) -> dict[str, Any]:
+        # Results arrive out of order; pair them back up by case identity.
+        def key(item: dict[str, Any]) -> tuple[str, int]:
+            return item["conversation_id"], item["turn_index"]
+
+        baseline_by_case = {key(item): item["score"] for item in baseline}
+        wins = losses = ties = 0
+        deltas: list[float] = []
+        for item in candidate:
+            base_score = baseline_by_case.get(key(item))
+            if base_score is None:
+                continue
+            delta = item["score"] - base_score
+            deltas.append(delta)
+            if delta > 1e-9:
+                wins += 1
+            elif delta < -1e-9:
+                losses += 1
+            else:
+                ties += 1
+        return {
+            "baseline": baseline_name,
+            "candidate": candidate_name,
+            "paired_cases": len(deltas),
+            "candidate_wins": wins,
+            "candidate_losses": losses,
+            "ties": ties,
+            "mean_score_delta": round(statistics.fmean(deltas), 4) if deltas else 0.0,
+        }
+
+
+async def _aiter(items):
+    if hasattr(items, "__aiter__"):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
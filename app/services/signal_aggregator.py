@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from app.schemas.voice_loop import EmotionResult, TranscriptResult, TranscriptUtterance
+
+if TYPE_CHECKING:
+    from app.services.transcript import Transcript, Utterances
+
+PII_TAGS = ("<PII>", "<PHI>")
+
+
+class SignalAggregator:
+    """Running utterance-level signals, updated in O(1) per utterance.
+
+    The STT client feeds utterances as they stream in, so emotion counts, language/accent/
+    speaker sets, PII flags and pace are ready the moment the transcript completes, and a
+    partial snapshot can be published at any point before that.
+    """
+
+    __slots__ = (
+        "emotion_counts",
+        "dominant_label",
+        "languages",
+        "accents",
+        "speakers",
+        "pii_detected",
+        "word_count",
+        "utterance_count",
+        "end_ms",
+    )
+
+    def __init__(self) -> None:
+        self.emotion_counts: dict[str, int] = {}
+        self.dominant_label: str | None = None
+        self.languages: set[str] = set()
+        self.accents: set[str] = set()
+        self.speakers: set[int] = set()
+        self.pii_detected = False
+        self.word_count = 0
+        self.utterance_count = 0
+        self.end_ms = 0
+
+    @classmethod
+    def from_utterances(cls, utterances: list[TranscriptUtterance]) -> SignalAggregator:
+        aggregator = cls()
+        for utterance in utterances:
+            aggregator.add(utterance)
+        return aggregator
+
+    @classmethod
+    def from_columns(cls, utterances: Utterances) -> SignalAggregator:
+        aggregator = cls()
+        for fields in utterances.signal_fields():
+            aggregator._observe(*fields)
+        return aggregator
+
+    def add(self, utterance: TranscriptUtterance) -> None:
+        self._observe(
+            utterance.text,
+            utterance.start_ms + utterance.duration_ms,
+            utterance.speaker,
+            utterance.language,
+            utterance.emotion,
+            utterance.accent,
+        )
+
+    def add_row(self, utterances: Utterances, index: int) -> None:
+        """Adds one utterance straight from the column store, without building a model."""
+        self._observe(
+            utterances.texts[index],
+            utterances.start_ms[index] + utterances.duration_ms[index],
+            utterances.speaker(index),
+            utterances.language(index),
+            utterances.emotion(index),
+            utterances.accent(index),
+        )
+
+    def _observe(
+        self,
+        text: str,
+        end_ms: int,
+        speaker: int | None,
+        language: str | None,
+        emotion: str | None,
+        accent: str | None,
+    ) -> None:
+        self.utterance_count += 1
+        if emotion:
+            count = self.emotion_counts.get(emotion, 0) + 1
+            self.emotion_counts[emotion] = count
+            if self.dominant_label is None or count > self.emotion_counts[self.dominant_label]:
+                self.dominant_label = emotion
+        if language:
+            self.languages.add(language)
+        if accent:
+            self.accents.add(accent)
+        if speaker is not None:
+            self.speakers.add(speaker)
+        if not self.pii_detected and any(tag in text for tag in PII_TAGS):
+            self.pii_detected = True
+        self.word_count += len(text.split())
+        self.end_ms = max(self.end_ms, end_ms)
+
+    def dominant_emotion(self) -> EmotionResult | None:
+        if self.dominant_label is None:
+            return None
+        total = sum(self.emotion_counts.values())
+        confidence = round(self.emotion_counts[self.dominant_label] / total, 2)
+        return EmotionResult(label=self.dominant_label, confidence=confidence, source="modulate_stt")
+
+    def pace_wpm(self, duration_ms: int | None = None) -> float | None:
+        duration = duration_ms if duration_ms else self.end_ms
+        if duration <= 0:
+            return None
+        return round(self.word_count / (duration / 60000), 2)
+
+    def snapshot(self, duration_ms: int | None = None) -> dict[str, Any]:
+        return {
+            "utterance_count": self.utterance_count,
+            "dominant_emotion": self.dominant_label or "Neutral",
+            "languages": sorted(self.languages),
+            "accents": sorted(self.accents),
+            "speakers": sorted(self.speakers),
+            "pii_detected": self.pii_detected,
+            "speaking_pace_wpm": self.pace_wpm(duration_ms),
+        }
+
+
+def aggregate_for(transcript: Transcript | TranscriptResult) -> SignalAggregator:
+    """Returns the aggregator the STT client attached, building one only for bare transcripts."""
+    if isinstance(transcript, TranscriptResult):
+        aggregator = transcript._signals
+        if aggregator is None:
+            aggregator = transcript._signals = SignalAggregator.from_utterances(transcript.utterances)
+        return aggregator
+    if transcript.signals is None:
+        transcript.signals = SignalAggregator.from_columns(transcript.utterances)
+    return transcript.signals
@@ -0,0 +1,375 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import tempfile
+import time
+from collections import Counter
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from app.core.startup import load_provider, provider_available
+from app.repositories.session_store import SessionStore
+from app.services.lexicon import Lexicon, get_lexicon
+from app.services.signal_aggregator import PII_TAGS
+from app.services.signal_timeline import SignalTimeline
+
+logger = logging.getLogger(__name__)
+
+POSITIVE_EMOTIONS = frozenset({"Happy", "Confident", "Relieved"})
+NEGATIVE_EMOTIONS = frozenset({"Angry", "Frustrated", "Concerned", "Sad", "Anxious"})
+ESCALATING_EMOTIONS = frozenset({"Angry", "Frustrated", "Anxious"})
+BASE_ESCALATION_RISK = 0.2
+ELEVATED_ESCALATION_RISK = 0.65
+SINGLE_SPEAKER_INTERRUPTION_RISK = 0.1
+MULTI_SPEAKER_INTERRUPTION_RISK = 0.35
+# The caller already talked over the agent's previous answer.
+BARGE_IN_INTERRUPTION_RISK = 0.75
+# Times a session the server keeps appending to is re-scored before the rescore skips it.
+RESCORE_ATTEMPTS = 3
+
+
+def sentiment_for(emotion_label: str) -> str:
+    if emotion_label in POSITIVE_EMOTIONS:
+        return "positive"
+    if emotion_label in NEGATIVE_EMOTIONS:
+        return "negative"
+    return "neutral"
+
+
+def escalation_risk_for(emotion_label: str) -> float:
+    return ELEVATED_ESCALATION_RISK if emotion_label in ESCALATING_EMOTIONS else BASE_ESCALATION_RISK
+
+
+def interruption_risk_for(speaker_count: int, barged_in: bool = False) -> float:
+    if barged_in:
+        return BARGE_IN_INTERRUPTION_RISK
+    return MULTI_SPEAKER_INTERRUPTION_RISK if speaker_count > 1 else SINGLE_SPEAKER_INTERRUPTION_RISK
+
+
+@dataclass
+class TurnColumns:
+    """Stored turns flattened into parallel columns, one row per turn.
+
+    Only the per-utterance reduction (emotion counts, word counts, speaker sets) happens in
+    Python while loading; everything derived from those columns is computed array-wide.
+    """
+
+    texts: list[str] = field(default_factory=list)
+    word_counts: list[int] = field(default_factory=list)
+    duration_ms: list[int] = field(default_factory=list)
+    speaker_counts: list[int] = field(default_factory=list)
+    emotion_labels: list[str | None] = field(default_factory=list)
+    emotion_confidences: list[float] = field(default_factory=list)
+    pii: list[bool] = field(default_factory=list)
+    barged_in: list[bool] = field(default_factory=list)
+    languages: list[list[str]] = field(default_factory=list)
+    accents: list[list[str]] = field(default_factory=list)
+    speakers: list[list[int]] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def append(self, turn: dict[str, Any]) -> None:
+        text = turn.get("user_text") or ""
+        utterances = turn.get("utterances") or []
+        emotions: dict[str, int] = {}
+        dominant: str | None = None
+        languages: set[str] = set()
+        accents: set[str] = set()
+        speakers: set[int] = set()
+        words = 0
+        end_ms = 0
+        pii = False
+        for utterance in utterances:
+            utterance_text = utterance.get("text") or ""
+            emotion = utterance.get("emotion")
+            if emotion:
+                emotions[emotion] = emotions.get(emotion, 0) + 1
+                # Ties keep the label that reached the top count first, as SignalAggregator does.
+                if dominant is None or emotions[emotion] > emotions[dominant]:
+                    dominant = emotion
+            if utterance.get("language"):
+                languages.add(utterance["language"])
+            if utterance.get("accent"):
+                accents.add(utterance["accent"])
+            if utterance.get("speaker") is not None:
+                speakers.add(utterance["speaker"])
+            pii = pii or any(tag in utterance_text for tag in PII_TAGS)
+            words += len(utterance_text.split())
+            end_ms = max(end_ms, (utterance.get("start_ms") or 0) + (utterance.get("duration_ms") or 0))
+
+        if dominant is not None:
+            self.emotion_labels.append(dominant)
+            self.emotion_confidences.append(round(emotions[dominant] / sum(emotions.values()), 2))
+        else:
+            self.emotion_labels.append(None)
+            self.emotion_confidences.append(0.0)
+
+        self.texts.append(text)
+        self.word_counts.append(words if utterances else len(text.split()))
+        # Turns recorded before duration_ms was stored fall back to the last utterance end.
+        self.duration_ms.append(int(turn.get("duration_ms") or end_ms))
+        self.speaker_counts.append(len(speakers))
+        self.pii.append(pii)
+        self.barged_in.append(bool(turn.get("barged_in")))
+        self.languages.append(sorted(languages))
+        self.accents.append(sorted(accents))
+        self.speakers.append(sorted(speakers))
+
+
+def score_columns(columns: TurnColumns, lexicon: Lexicon) -> list[dict[str, Any]]:
+    """Computes a ``SignalBundle``-shaped dict for every row of ``columns``.
+
+    Equivalent to ``VoiceLoopService._build_signals`` for the stored turn, but pace,
+    sentiment, escalation, interruption and toxicity are evaluated as NumPy array
+    operations and the lexicon is scanned once per text.
+    """
+    if not provider_available("numpy"):
+        raise RuntimeError("numpy is required for batch signal scoring.")
+    numpy = load_provider("numpy")
+    rows = len(columns)
+    if not rows:
+        return []
+
+    # One lexicon pass per text yields intent, fallback emotion and toxicity together.
+    intent_labels: list[str] = []
+    intent_confidences: list[float] = []
+    intent_reasons: list[str] = []
+    toxic_hits = numpy.zeros(rows, dtype=numpy.int32)
+    intent_fallback = lexicon.config.get("intent_fallback", {"label": "general_inquiry", "confidence": 0.55})
+    emotion_fallback = lexicon.config.get("emotion_fallback", {"label": "Neutral", "confidence": 0.6})
+    emotion_labels = list(columns.emotion_labels)
+    emotion_confidences = list(columns.emotion_confidences)
+    emotion_sources = ["modulate_stt"] * rows
+    for row, text in enumerate(columns.texts):
+        scan = lexicon._scan(text)
+        found = scan.labels("intent")
+        label = next((name for name in lexicon.priority["intent"] if found[name]), None)
+        if label is None:
+            intent_labels.append(intent_fallback["label"])
+            intent_confidences.append(intent_fallback["confidence"])
+            intent_reasons.append("fallback")
+        else:
+            intent_labels.append(label)
+            intent_confidences.append(lexicon._confidence[("intent", label)])
+            intent_reasons.append("keyword_match")
+        toxic_hits[row] = scan.count("toxicity")
+        if emotion_labels[row] is None:
+            found = scan.labels("emotion")
+            label = next((name for name in lexicon.priority["emotion"] if found[name]), None)
+            if label is None:
+                emotion_labels[row], emotion_confidences[row] = emotion_fallback["label"], emotion_fallback["confidence"]
+            else:
+                emotion_labels[row], emotion_confidences[row] = label, lexicon._confidence[("emotion", label)]
+            emotion_sources[row] = "text_heuristic"
+
+    vocabulary = sorted(set(emotion_labels))
+    codes = numpy.searchsorted(numpy.array(vocabulary), numpy.array(emotion_labels))
+    sentiment_table = numpy.array([sentiment_for(name) for name in vocabulary])
+    escalation_table = numpy.array([escalation_risk_for(name) for name in vocabulary])
+    sentiments = sentiment_table[codes]
+    escalation = escalation_table[codes]
+
+    interruption = numpy.where(
+        numpy.array(columns.barged_in, dtype=bool),
+        BARGE_IN_INTERRUPTION_RISK,
+        numpy.where(
+            numpy.array(columns.speaker_counts) > 1,
+            MULTI_SPEAKER_INTERRUPTION_RISK,
+            SINGLE_SPEAKER_INTERRUPTION_RISK,
+        ),
+    )
+    toxicity = lexicon.config.get("toxicity", {})
+    toxicity_risk = numpy.where(toxic_hits > 0, float(toxicity.get("risk", 0.7)), float(toxicity.get("baseline", 0.05)))
+
+    words = numpy.array(columns.word_counts, dtype=numpy.float64)
+    duration = numpy.array(columns.duration_ms, dtype=numpy.float64)
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        pace = numpy.round(words / (duration / 60000), 2)
+    has_pace = duration > 0
+
+    results: list[dict[str, Any]] = []
+    for row in range(rows):
+        results.append(
+            {
+                "intent": {"label": intent_labels[row], "confidence": intent_confidences[row], "reason": intent_reasons[row]},
+                "emotion": {"label": emotion_labels[row], "confidence": emotion_confidences[row], "source": emotion_sources[row]},
+                "sentiment": str(sentiments[row]),
+                "toxicity_risk": float(toxicity_risk[row]),
+                "escalation_risk": float(escalation[row]),
+                "interruption_risk": float(interruption[row]),
+                "speaking_pace_wpm": float(pace[row]) if has_pace[row] else None,
+                "compliance_flags": ["pii_or_phi_detected"] if columns.pii[row] else [],
+                "pii_detected": columns.pii[row],
+                "accents": columns.accents[row],
+                "languages": columns.languages[row],
+                "speakers": columns.speakers[row],
+            }
+        )
+    return results
+
+
+def rescore_shard(paths: list[str], lexicon_path: str | None = None, dry_run: bool = False) -> dict[str, int]:
+    """Re-scores every turn in a shard of session files and rewrites the files that changed.
+
+    Runs in worker processes, so it only takes plain data. Scoring happens outside the
+    session's ``SessionStore.session_lock``, which is held only to check the file is unchanged
+    and write it with its rebuilt signal timeline; a session the server appended to since it
+    was read is re-scored and retried.
+    """
+    lexicon = get_lexicon(lexicon_path)
+    sessions: list[tuple[Path, dict[str, Any]]] = []
+    columns = TurnColumns()
+    skipped = 0
+    for raw_path in paths:
+        path = Path(raw_path)
+        try:
+            payload = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            skipped += 1
+            continue
+        sessions.append((path, payload))
+        for turn in payload.get("turns", []):
+            columns.append(turn)
+
+    scored = iter(score_columns(columns, lexicon))
+    changed_turns = written = 0
+    store: SessionStore | None = None
+    for path, payload in sessions:
+        changed = _apply_scores(payload, scored)
+        if not changed or dry_run:
+            changed_turns += changed
+            continue
+        store = store or SessionStore(str(path.parent.parent))
+        for _ in range(RESCORE_ATTEMPTS):
+            # The timeline feeds the trend text and its digest keys the response cache.
+            timeline = SignalTimeline.from_turns(payload.get("turns", []))
+            try:
+                with store.session_lock(path.stem):
+                    current = json.loads(path.read_text(encoding="utf-8"))
+                    if current.get("updated_at") == payload.get("updated_at"):
+                        if changed:
+                            _replace_json(path, payload)
+                            store._write_timeline(path.stem, timeline)
+                            written += 1
+                        break
+            except FileNotFoundError:
+                skipped += 1
+                changed = 0
+                break
+            # The server appended a turn since the read: re-score outside the lock and retry.
+            payload = current
+            changed = _apply_scores(payload, iter(score_columns(_columns_for(payload), lexicon)))
+        else:
+            logger.warning("Session %s kept changing during the rescore; leaving it for the next run", path.stem)
+            changed = 0
+        changed_turns += changed
+    return {
+        "sessions": len(sessions),
+        "turns": len(columns),
+        "changed_turns": changed_turns,
+        "written_sessions": written,
+        "skipped_sessions": skipped,
+    }
+
+
+def _columns_for(payload: dict[str, Any]) -> TurnColumns:
+    columns = TurnColumns()
+    for turn in payload.get("turns", []):
+        columns.append(turn)
+    return columns
+
+
+def _apply_scores(payload: dict[str, Any], scored: Iterator[dict[str, Any]]) -> int:
+    """Stores the next scored bundle on each turn of ``payload``; returns how many changed."""
+    changed = 0
+    for turn in payload.get("turns", []):
+        previous = turn.get("signals") or {}
+        signals = next(scored)
+        signals["extra"] = previous.get("extra", {})
+        if turn.get("degraded_stage"):
+            # Keep the markers a degraded turn stored for stages that never ran.
+            intent = previous.get("intent") or {}
+            if intent.get("reason") == "deadline_exceeded":
+                signals["intent"] = intent
+            emotion = previous.get("emotion") or {}
+            if emotion.get("source") == "derived":
+                signals["emotion"] = emotion
+                signals["sentiment"] = sentiment_for(emotion["label"])
+                signals["escalation_risk"] = escalation_risk_for(emotion["label"])
+        if signals != previous:
+            turn["signals"] = signals
+            changed += 1
+    return changed
+
+
+def _replace_json(path: Path, payload: dict[str, Any]) -> None:
+    handle, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.stem}.", suffix=".tmp")
+    try:
+        with os.fdopen(handle, "w", encoding="utf-8") as file:
+            json.dump(payload, file, indent=2, ensure_ascii=True)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def iter_shards(sessions_dir: str | Path, shard_size: int) -> Iterator[list[str]]:
+    shard: list[str] = []
+    for path in sorted(Path(sessions_dir).glob("*.json")):
+        shard.append(str(path))
+        if len(shard) >= shard_size:
+            yield shard
+            shard = []
+    if shard:
+        yield shard
+
+
+class SignalBackfill:
+    """Recomputes stored ``SignalBundle``s for every turn after a heuristic change.
+
+    Session files are grouped into shards; each shard is loaded as columns, scored in
+    vectorized form and written back atomically by a worker process.
+    """
+
+    def __init__(
+        self,
+        sessions_dir: str | Path,
+        workers: int | None = None,
+        shard_size: int = 200,
+        lexicon_path: str | None = None,
+    ) -> None:
+        self.sessions_dir = Path(sessions_dir)
+        self.workers = workers
+        self.shard_size = shard_size
+        self.lexicon_path = lexicon_path
+
+    def run(self, dry_run: bool = False) -> dict[str, Any]:
+        if not provider_available("numpy"):
+            raise RuntimeError("numpy is required for batch signal scoring.")
+        started = time.perf_counter()
+        totals: Counter = Counter()
+        shards = 0
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            futures = [
+                pool.submit(rescore_shard, shard, self.lexicon_path, dry_run)
+                for shard in iter_shards(self.sessions_dir, self.shard_size)
+            ]
+            for future in futures:
+                totals.update(future.result())
+                shards += 1
+                if shards % 50 == 0:
+                    logger.info("Re-scored %d/%d shards (%d turns)", shards, len(futures), totals["turns"])
+        elapsed = time.perf_counter() - started
+        return {
+            "shards": shards,
+            **{key: totals[key] for key in ("sessions", "turns", "changed_turns", "written_sessions", "skipped_sessions")},
+            "dry_run": dry_run,
+            "elapsed_s": round(elapsed, 2),
+            "turns_per_s": round(totals["turns"] / elapsed, 1) if elapsed > 0 else None,
+        }
@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import hashlib
+import math
+from array import array
+from typing import Any
+
+SENTIMENT_CODES = {"negative": -1, "neutral": 0, "positive": 1}
+SENTIMENT_LABELS = {code: label for label, code in SENTIMENT_CODES.items()}
+TIMELINE_WINDOW = 5
+# Per-turn slope beyond which a trend is reported as moving rather than steady.
+TREND_THRESHOLD = 0.05
+PACE_TREND_THRESHOLD = 5.0
+
+
+class _WindowFit:
+    """Running sums for the mean and least-squares slope of (turn index, value) points."""
+
+    __slots__ = ("n", "sx", "sy", "sxx", "sxy")
+
+    def __init__(self) -> None:
+        self.n = 0
+        self.sx = self.sy = self.sxx = self.sxy = 0.0
+
+    def add(self, x: int, y: float, sign: int = 1) -> None:
+        self.n += sign
+        self.sx += sign * x
+        self.sy += sign * y
+        self.sxx += sign * x * x
+        self.sxy += sign * x * y
+
+    def mean(self) -> float | None:
+        return self.sy / self.n if self.n else None
+
+    def slope(self) -> float | None:
+        denominator = self.n * self.sxx - self.sx * self.sx
+        if self.n < 2 or denominator == 0:
+            return None
+        return (self.n * self.sxy - self.sx * self.sy) / denominator
+
+
+class SignalTimeline:
+    """Per-session signal history kept as compact per-turn arrays.
+
+    Escalation risk, sentiment, pace and emotion are appended once per turn; call-wide
+    totals and the sums behind the rolling-window means and slopes are updated in O(1),
+    so ``snapshot()`` never rescans earlier turns. Unknown pace is stored as NaN.
+    """
+
+    def __init__(self, window: int = TIMELINE_WINDOW) -> None:
+        self.window = window
+        self.escalation = array("f")
+        self.sentiment = array("b")
+        self.pace = array("f")
+        self.emotion_codes = array("H")
+        self.emotions: list[str] = []
+        self.emotion_counts: list[int] = []
+        self._totals = {"escalation": 0.0, "sentiment": 0.0, "pace": 0.0, "pace_turns": 0}
+        self._fits = {"escalation": _WindowFit(), "sentiment": _WindowFit(), "pace": _WindowFit()}
+        self._snapshot: dict[str, Any] | None = None
+
+    def __len__(self) -> int:
+        return len(self.escalation)
+
+    def append(self, signals: dict[str, Any]) -> None:
+        emotion = (signals.get("emotion") or {}).get("label") or "Neutral"
+        pace = signals.get("speaking_pace_wpm")
+        self._push(
+            float(signals.get("escalation_risk") or 0.0),
+            SENTIMENT_CODES.get(signals.get("sentiment") or "neutral", 0),
+            float(pace) if pace is not None else math.nan,
+            self._emotion_code(emotion),
+        )
+
+    def _push(self, escalation: float, sentiment: int, pace: float, emotion_code: int) -> None:
+        index = len(self.escalation)
+        self.escalation.append(escalation)
+        self.sentiment.append(sentiment)
+        self.pace.append(pace)
+        self.emotion_codes.append(emotion_code)
+        self.emotion_counts[emotion_code] += 1
+
+        self._totals["escalation"] += escalation
+        self._totals["sentiment"] += sentiment
+        if not math.isnan(pace):
+            self._totals["pace"] += pace
+            self._totals["pace_turns"] += 1
+
+        self._slide(index, 1)
+        if index >= self.window:
+            self._slide(index - self.window, -1)
+        self._snapshot = None
+
+    def _slide(self, index: int, sign: int) -> None:
+        # Values come back from the float32 arrays, so adding and removing a turn cancel exactly.
+        self._fits["escalation"].add(index, self.escalation[index], sign)
+        self._fits["sentiment"].add(index, self.sentiment[index], sign)
+        if not math.isnan(self.pace[index]):
+            self._fits["pace"].add(index, self.pace[index], sign)
+
+    def _emotion_code(self, label: str) -> int:
+        try:
+            return self.emotions.index(label)
+        except ValueError:
+            self.emotions.append(label)
+            self.emotion_counts.append(0)
+            return len(self.emotions) - 1
+
+    def snapshot(self) -> dict[str, Any]:
+        if self._snapshot is None:
+            self._snapshot = self._build_snapshot()
+        return self._snapshot
+
+    def _build_snapshot(self) -> dict[str, Any]:
+        turns = len(self)
+        if not turns:
+            return {"turns": 0, "window": self.window, "current": None, "call": None, "recent": None}
+        last = turns - 1
+        recent_start = max(0, turns - self.window)
+        fits = self._fits
+        pace_turns = self._totals["pace_turns"]
+        dominant = max(range(len(self.emotions)), key=self.emotion_counts.__getitem__)
+        return {
+            "turns": turns,
+            "window": self.window,
+            "current": {
+                "emotion": self.emotions[self.emotion_codes[last]],
+                "sentiment": SENTIMENT_LABELS[self.sentiment[last]],
+                "escalation_risk": _round(self.escalation[last]),
+                "speaking_pace_wpm": None if math.isnan(self.pace[last]) else _round(self.pace[last], 1),
+            },
+            "call": {
+                "avg_escalation_risk": _round(self._totals["escalation"] / turns),
+                "avg_sentiment": _round(self._totals["sentiment"] / turns),
+                "avg_pace_wpm": _round(self._totals["pace"] / pace_turns, 1) if pace_turns else None,
+                "dominant_emotion": self.emotions[dominant],
+                "emotion_counts": dict(zip(self.emotions, self.emotion_counts)),
+            },
+            "recent": {
+                "turns": turns - recent_start,
+                "avg_escalation_risk": _round(fits["escalation"].mean()),
+                "avg_sentiment": _round(fits["sentiment"].mean()),
+                "avg_pace_wpm": _round(fits["pace"].mean(), 1),
+                "escalation_slope": _round(fits["escalation"].slope()),
+                "sentiment_slope": _round(fits["sentiment"].slope()),
+                "pace_slope": _round(fits["pace"].slope(), 1),
+                "emotions": [self.emotions[code] for code in self.emotion_codes[recent_start:]],
+            },
+        }
+
+    def describe(self) -> str | None:
+        """One-line trend summary for the LLM prompt, or None before the first turn."""
+        snapshot = self.snapshot()
+        recent = snapshot["recent"]
+        if recent is None:
+            return None
+        parts = [
+            f"escalation risk {_direction(recent['escalation_slope'], TREND_THRESHOLD, 'rising', 'falling')} "
+            f"(avg {recent['avg_escalation_risk']:.2f})",
+            f"sentiment {_direction(recent['sentiment_slope'], TREND_THRESHOLD, 'improving', 'worsening')} "
+            f"(avg {recent['avg_sentiment']:+.2f})",
+        ]
+        if recent["avg_pace_wpm"] is not None:
+            pace = _direction(recent["pace_slope"], PACE_TREND_THRESHOLD, "speeding up", "slowing down")
+            parts.append(f"pace {pace} (avg {recent['avg_pace_wpm']:.0f} wpm)")
+        return (
+            f"Caller signals over the last {recent['turns']} turn(s): " + ", ".join(parts)
+            + f"; dominant emotion this call: {snapshot['call']['dominant_emotion']}."
+        )
+
+    def digest(self) -> str:
+        return hashlib.sha256((self.describe() or "").encode("utf-8")).hexdigest()[:16]
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "window": self.window,
+            "emotions": self.emotions,
+            "emotion_counts": self.emotion_counts,
+            "escalation": self.escalation.tolist(),
+            "sentiment": self.sentiment.tolist(),
+            "pace": [None if math.isnan(value) else value for value in self.pace],
+            "emotion_codes": self.emotion_codes.tolist(),
+            "totals": self._totals,
+        }
+
+    @classmethod
+    def from_dict(cls, payload: dict[str, Any]) -> SignalTimeline:
+        timeline = cls(window=int(payload.get("window", TIMELINE_WINDOW)))
+        timeline.emotions = list(payload.get("emotions", []))
+        timeline.emotion_counts = [int(count) for count in payload.get("emotion_counts", [])]
+        timeline.escalation.extend(payload.get("escalation", []))
+        timeline.sentiment.extend(payload.get("sentiment", []))
+        timeline.pace.extend(math.nan if value is None else value for value in payload.get("pace", []))
+        timeline.emotion_codes.extend(payload.get("emotion_codes", []))
+        timeline._totals.update(payload.get("totals", {}))
+        # Totals are persisted; only the rolling window has to be replayed.
+        for index in range(max(0, len(timeline) - timeline.window), len(timeline)):
+            timeline._slide(index, 1)
+        return timeline
+
+    @classmethod
+    def from_turns(cls, turns: list[dict[str, Any]]) -> SignalTimeline:
+        timeline = cls()
+        for turn in turns:
+            timeline.append(turn.get("signals") or {})
+        return timeline
+
+
+def _round(value: float | None, digits: int = 3) -> float | None:
+    return None if value is None else round(value, digits)
+
+
+def _direction(slope: float | None, threshold: float, up: str, down: str) -> str:
+    if slope is None or abs(slope) < threshold:
+        return "steady"
+    return up if slope > 0 else down
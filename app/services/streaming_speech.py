@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import asyncio
+import io
+import json
+import re
+import wave
+from collections.abc import AsyncIterator, Awaitable, Callable
+from dataclasses import dataclass
+
+from app.clients.interfaces import TTSClientProtocol
+from app.schemas.voice_loop import TTSResult
+
+_SENTENCE_END = re.compile(r"[.!?]+[\"')\]]*\s+")
+_ABBREVIATIONS = {"dr.", "mr.", "mrs.", "ms.", "st.", "e.g.", "i.e.", "vs.", "etc."}
+
+
+@dataclass
+class LLMStream:
+    deltas: AsyncIterator[str]
+    rules_version: str | None = None
+
+
+class SentenceSplitter:
+    """Accumulates streamed text deltas and releases complete sentences.
+
+    Sentences shorter than ``min_chars`` are merged with the next one so TTS is not
+    invoked for fragments like "Sure." on their own.
+    """
+
+    def __init__(self, min_chars: int = 12) -> None:
+        self.min_chars = min_chars
+        self._buffer = ""
+
+    def feed(self, delta: str) -> list[str]:
+        self._buffer += delta
+        sentences: list[str] = []
+        start = 0
+        for match in _SENTENCE_END.finditer(self._buffer):
+            candidate = self._buffer[start : match.end()].strip()
+            last_word = candidate.rsplit(" ", 1)[-1].lower()
+            if len(candidate) < self.min_chars or last_word in _ABBREVIATIONS:
+                continue
+            sentences.append(candidate)
+            start = match.end()
+        self._buffer = self._buffer[start:]
+        return sentences
+
+    def flush(self) -> str | None:
+        remainder = self._buffer.strip()
+        self._buffer = ""
+        return remainder or None
+
+
+def _unwrap_response(text: str) -> str:
+    try:
+        payload = json.loads(text)
+    except json.JSONDecodeError:
+        return text
+    if isinstance(payload, dict) and payload.get("response") is not None:
+        return str(payload["response"])
+    return text
+
+
+async def iter_sentences(deltas: AsyncIterator[str]) -> AsyncIterator[str]:
+    splitter = SentenceSplitter()
+    started = False
+    structured = False
+    buffered: list[str] = []
+    async for delta in deltas:
+        if not delta:
+            continue
+        if not started and delta.strip():
+            started = True
+            # JSON-wrapped answers ({"response": ...}) can only be unwrapped once complete.
+            structured = delta.lstrip().startswith("{")
+        if structured:
+            buffered.append(delta)
+            continue
+        for sentence in splitter.feed(delta):
+            yield sentence
+
+    if structured:
+        for sentence in splitter.feed(_unwrap_response("".join(buffered).strip()) + " "):
+            yield sentence
+    remainder = splitter.flush()
+    if remainder:
+        yield remainder
+
+
+def concat_tts_results(results: list[TTSResult]) -> TTSResult:
+    if len(results) == 1:
+        return results[0]
+    mime_type = results[0].mime_type
+    provider = results[0].provider
+    if all(item.mime_type == "audio/wav" for item in results):
+        return TTSResult(audio_bytes=_concat_wav(results), mime_type="audio/wav", provider=provider)
+    # MPEG frames are self-delimiting, so clips can be joined byte-wise.
+    return TTSResult(audio_bytes=b"".join(item.audio_bytes for item in results), mime_type=mime_type, provider=provider)
+
+
+def _concat_wav(results: list[TTSResult]) -> bytes:
+    params = None
+    frames: list[bytes] = []
+    for item in results:
+        with wave.open(io.BytesIO(item.audio_bytes), "rb") as wav_file:
+            if params is None:
+                params = wav_file.getparams()
+            frames.append(wav_file.readframes(wav_file.getnframes()))
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav_file:
+        wav_file.setnchannels(params.nchannels)
+        wav_file.setsampwidth(params.sampwidth)
+        wav_file.setframerate(params.framerate)
+        wav_file.writeframes(b"".join(frames))
+    return buffer.getvalue()
+
+
+async def speak_stream(
+    stream: LLMStream,
+    tts_client: TTSClientProtocol,
+    on_audio: Callable[[int, str, TTSResult], Awaitable[None]] | None = None,
+    max_parallel: int = 3,
+) -> tuple[str, list[TTSResult]]:
+    """Starts TTS for each sentence as soon as the LLM finishes it.
+
+    Clips are delivered to ``on_audio`` in sentence order while later sentences are still
+    being generated. Returns the full text and the ordered clips.
+    """
+    semaphore = asyncio.Semaphore(max_parallel)
+    pending: asyncio.Queue[tuple[int, str, asyncio.Task[TTSResult]] | None] = asyncio.Queue()
+    sentences: list[str] = []
+    results: list[TTSResult] = []
+
+    async def synthesize(sentence: str) -> TTSResult:
+        async with semaphore:
+            return await tts_client.synthesize_speech(sentence)
+
+    async def deliver() -> None:
+        while (item := await pending.get()) is not None:
+            index, sentence, task = item
+            result = await task
+            results.append(result)
+            if on_audio is not None:
+                await on_audio(index, sentence, result)
+
+    deliverer = asyncio.create_task(deliver())
+    tasks: list[asyncio.Task[TTSResult]] = []
+    try:
+        async for sentence in iter_sentences(stream.deltas):
+            if deliverer.done():
+                # A clip failed; stop consuming the LLM and surface the error below.
+                break
+            task = asyncio.create_task(synthesize(sentence))
+            tasks.append(task)
+            await pending.put((len(sentences), sentence, task))
+            sentences.append(sentence)
+        await pending.put(None)
+        await deliverer
+    except BaseException:
+        deliverer.cancel()
+        for task in tasks:
+            task.cancel()
+        raise
+
+    return " ".join(sentences), results
@@ -0,0 +1,333 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import logging
+import statistics
+import tempfile
+import time
+from collections import Counter
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from app.clients.modulate_client import ModulateClient
+from app.clients.tts_blackbox import BlackboxTTSClient
+from app.core.config import Settings
+from app.repositories.session_store import SessionStore
+from app.schemas.voice_loop import LLMRequest, LLMResponse, TTSResult
+from app.services.export_service import parse_timestamp
+from app.services.streaming_speech import LLMStream
+from app.services.transcript import Transcript, Utterances
+from app.services.voice_loop_service import VoiceLoopService
+
+logger = logging.getLogger(__name__)
+
+# Used when an older event log predates per-stage timings.
+DEFAULT_STAGE_MS = {"stt": 400.0, "llm": 900.0, "tts": 350.0}
+
+
+@dataclass
+class RecordedTurn:
+    offset_s: float
+    audio_size: int
+    content_type: str
+    transcript: Transcript
+    agent_text: str
+    stage_ms: dict[str, float]
+
+
+@dataclass
+class RecordedSession:
+    session_id: str
+    started_at: datetime
+    turns: list[RecordedTurn] = field(default_factory=list)
+
+
+def load_recorded_sessions(
+    data_dir: str | Path,
+    limit: int | None = None,
+    since: datetime | None = None,
+) -> list[RecordedSession]:
+    """Rebuilds recorded calls from ``sessions/*.json`` plus ``events/*.jsonl``, oldest first.
+
+    Each ``audio_received`` event starts one ``/process`` call; the events up to the next one
+    supply its stage timings, and the n-th call is paired with the n-th stored turn. A naive
+    ``since`` is taken as UTC.
+    """
+    since = parse_timestamp(since)
+    store = SessionStore(str(data_dir))
+    sessions = []
+    for events_file in sorted(store.events_path.glob("*.jsonl")):
+        session = _load_session(store, events_file.stem)
+        if session is None or not session.turns or (since is not None and session.started_at < since):
+            continue
+        sessions.append(session)
+    sessions.sort(key=lambda session: session.started_at)
+    return sessions[:limit] if limit is not None else sessions
+
+
+def _load_session(store: SessionStore, session_id: str) -> RecordedSession | None:
+    try:
+        turns = store.get_session(session_id).turns
+    except FileNotFoundError:
+        return None
+    calls = list(_split_calls(store.load_events(session_id)))
+    if not calls:
+        return None
+    started_at = _parse_time(calls[0][0]["timestamp"])
+    session = RecordedSession(session_id=session_id, started_at=started_at)
+    for (received, following), turn in zip(calls, turns):
+        transcript = Transcript(
+            text=turn.get("user_text", ""),
+            duration_ms=int(turn.get("duration_ms") or 0),
+            utterances=Utterances.from_payloads(turn.get("utterances", [])),
+            transport="replay",
+        )
+        session.turns.append(
+            RecordedTurn(
+                offset_s=(_parse_time(received["timestamp"]) - started_at).total_seconds(),
+                audio_size=int(received.get("payload", {}).get("size_bytes") or 1),
+                content_type=received.get("payload", {}).get("content_type") or "application/octet-stream",
+                transcript=transcript,
+                agent_text=turn.get("agent_text") or "",
+                stage_ms=_stage_ms(following),
+            )
+        )
+    return session
+
+
+def _split_calls(events: list[dict[str, Any]]) -> Iterator[tuple[dict[str, Any], list[dict[str, Any]]]]:
+    received = None
+    following: list[dict[str, Any]] = []
+    for event in events:
+        if event.get("event_type") == "audio_received":
+            if received is not None:
+                yield received, following
+            received, following = event, []
+        elif received is not None:
+            following.append(event)
+    if received is not None:
+        yield received, following
+
+
+def _stage_ms(events: list[dict[str, Any]]) -> dict[str, float]:
+    for event in events:
+        if event.get("event_type") not in ("turn_completed", "turn_degraded"):
+            continue
+        payload = event.get("payload", {})
+        stages = payload.get("stages") or {}
+        timings = {name: float(stage["ms"]) for name, stage in stages.items() if name in DEFAULT_STAGE_MS}
+        if "llm" not in timings and payload.get("response_ms") is not None:
+            # Streaming turns time LLM and TTS together; split the response time between them.
+            response_ms = float(payload["response_ms"])
+            timings.setdefault("llm", response_ms * 0.7)
+            timings.setdefault("tts", response_ms * 0.3)
+        return {**DEFAULT_STAGE_MS, **timings}
+    return dict(DEFAULT_STAGE_MS)
+
+
+def _parse_time(value: str) -> datetime:
+    # Naive timestamps are UTC, so every recorded time compares with every other.
+    return parse_timestamp(value.replace("Z", "+00:00"))
+
+
+# The recorded turn being replayed; set per replay task and inherited by the service's subtasks.
+_current_turn: contextvars.ContextVar[RecordedTurn] = contextvars.ContextVar("replay_turn")
+
+
+class ReplaySTTClient(ModulateClient):
+    """Returns the recorded transcript after the recorded (scaled) STT latency.
+
+    Only transcription is replaced; intent and emotion analysis run as they do in production.
+    """
+
+    def __init__(self, settings: Settings, latency_scale: float = 1.0) -> None:
+        super().__init__(settings)
+        self.latency_scale = latency_scale
+
+    async def transcribe(self, audio_chunk: bytes, content_type: str, session_id: str, on_utterance=None) -> Transcript:
+        turn = _current_turn.get()
+        await asyncio.sleep(turn.stage_ms["stt"] / 1000 * self.latency_scale)
+        return turn.transcript.copy()
+
+
+class ReplayLLMClient:
+    """Returns the recorded agent text after the recorded (scaled) LLM latency."""
+
+    def __init__(self, latency_scale: float = 1.0) -> None:
+        self.latency_scale = latency_scale
+
+    async def generate_response(self, request: LLMRequest) -> LLMResponse:
+        turn = _current_turn.get()
+        await asyncio.sleep(turn.stage_ms["llm"] / 1000 * self.latency_scale)
+        return LLMResponse(text=turn.agent_text or "Could you say that again?", tool_commands=[], rules_version="replay")
+
+    async def stream_response(self, request: LLMRequest) -> LLMStream:
+        return LLMStream(deltas=self._stream(_current_turn.get()), rules_version="replay")
+
+    async def _stream(self, turn: RecordedTurn):
+        words = (turn.agent_text or "Could you say that again?").split(" ")
+        # Spread the recorded latency: a third to the first token, the rest across the words.
+        total_s = turn.stage_ms["llm"] / 1000 * self.latency_scale
+        await asyncio.sleep(total_s / 3)
+        per_word_s = (total_s * 2 / 3) / len(words)
+        for index, word in enumerate(words):
+            if index:
+                await asyncio.sleep(per_word_s)
+            yield word if index == 0 else " " + word
+
+
+class ReplayTTSClient:
+    """Returns one cached clip after the recorded (scaled) TTS latency."""
+
+    def __init__(self, latency_scale: float = 1.0) -> None:
+        self.latency_scale = latency_scale
+        self._clip: TTSResult | None = None
+
+    async def synthesize_speech(self, text: str, voice: str | None = None) -> TTSResult:
+        if self._clip is None:
+            self._clip = await BlackboxTTSClient().synthesize_speech(text)
+        turn = _current_turn.get()
+        await asyncio.sleep(turn.stage_ms["tts"] / 1000 * self.latency_scale)
+        return self._clip
+
+
+def _percentiles(values: list[float]) -> dict[str, float | None]:
+    if not values:
+        return {"p50": None, "p90": None, "p95": None, "p99": None, "max": None}
+    ordered = sorted(values)
+
+    def pick(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 1)
+
+    return {"p50": round(statistics.median(ordered), 1), "p90": pick(0.9), "p95": pick(0.95), "p99": pick(0.99), "max": round(ordered[-1], 1)}
+
+
+class TrafficReplay:
+    """Replays recorded sessions as load against a ``VoiceLoopService`` with stand-in providers.
+
+    Sessions start at their recorded offsets divided by ``speed`` and each session's turns
+    follow their recorded spacing, never before the previous turn has finished. At most
+    ``concurrency`` sessions are in flight; turns that start late because of that limit show
+    up as schedule lag. Provider latencies are the recorded ones times ``latency_scale``.
+    Replayed sessions are written to a throwaway data directory unless ``data_dir`` is given.
+    """
+
+    def __init__(
+        self,
+        sessions: list[RecordedSession],
+        settings: Settings,
+        speed: float = 1.0,
+        latency_scale: float = 1.0,
+        concurrency: int = 32,
+        data_dir: str | Path | None = None,
+        service_factory: Callable[[SessionStore], VoiceLoopService] | None = None,
+    ) -> None:
+        self.sessions = sessions
+        self.settings = settings
+        self.speed = speed
+        self.latency_scale = latency_scale
+        self.concurrency = concurrency
+        self.data_dir = data_dir
+        self.service_factory = service_factory or self._default_service
+        self._latencies: list[float] = []
+        self._lags: list[float] = []
+        self._statuses: Counter = Counter()
+        self._errors: Counter = Counter()
+
+    def _default_service(self, session_store: SessionStore) -> VoiceLoopService:
+        return VoiceLoopService(
+            modulate_client=ReplaySTTClient(self.settings, self.latency_scale),
+            llm_client=ReplayLLMClient(self.latency_scale),
+            tts_client=ReplayTTSClient(self.latency_scale),
+            session_store=session_store,
+            llm_streaming=self.settings.llm_streaming,
+            tts_max_parallel=self.settings.tts_max_parallel,
+            turn_budget_s=self.settings.turn_budget_s,
+            stage_retries=self.settings.stage_retries,
+        )
+
+    async def run(self) -> dict[str, Any]:
+        with tempfile.TemporaryDirectory(prefix="voice-replay-") as scratch:
+            service = self.service_factory(SessionStore(str(self.data_dir or scratch)))
+            gate = asyncio.Semaphore(self.concurrency)
+            origin = self.sessions[0].started_at if self.sessions else None
+            started = time.perf_counter()
+            await asyncio.gather(
+                *(self._replay_session(service, session, gate, origin, started) for session in self.sessions)
+            )
+            wall_s = time.perf_counter() - started
+        return self._report(wall_s)
+
+    async def _replay_session(
+        self,
+        service: VoiceLoopService,
+        session: RecordedSession,
+        gate: asyncio.Semaphore,
+        origin: datetime,
+        started: float,
+    ) -> None:
+        session_start = (session.started_at - origin).total_seconds() / self.speed
+        await asyncio.sleep(max(0.0, session_start - (time.perf_counter() - started)))
+        async with gate:
+            session_id = service.start_session().session_id
+            for turn in session.turns:
+                scheduled = session_start + turn.offset_s / self.speed
+                now = time.perf_counter() - started
+                if scheduled > now:
+                    await asyncio.sleep(scheduled - now)
+                self._lags.append(max(0.0, (time.perf_counter() - started) - scheduled) * 1000)
+                await self._replay_turn(service, session_id, turn)
+
+    async def _replay_turn(self, service: VoiceLoopService, session_id: str, turn: RecordedTurn) -> None:
+        token = _current_turn.set(turn)
+        turn_started = time.perf_counter()
+        try:
+            response = await service.process_audio(
+                audio_bytes=b"\0" * turn.audio_size,
+                content_type=turn.content_type,
+                session_id=session_id,
+            )
+        except Exception as exc:  # noqa: BLE001
+            self._errors[type(exc).__name__] += 1
+            logger.warning("Replayed turn failed in session %s: %s", session_id, exc)
+            return
+        finally:
+            _current_turn.reset(token)
+        self._latencies.append((time.perf_counter() - turn_started) * 1000)
+        self._statuses[response.output_status] += 1
+
+    def _report(self, wall_s: float) -> dict[str, Any]:
+        turns = len(self._latencies)
+        recorded_span_s = max(
+            ((session.started_at - self.sessions[0].started_at).total_seconds() + session.turns[-1].offset_s for session in self.sessions),
+            default=0.0,
+        )
+        return {
+            "sessions": len(self.sessions),
+            "turns": turns,
+            "errors": dict(self._errors),
+            "output_status": dict(self._statuses),
+            "speed": self.speed,
+            "latency_scale": self.latency_scale,
+            "concurrency": self.concurrency,
+            "recorded_span_s": round(recorded_span_s, 1),
+            "wall_s": round(wall_s, 2),
+            "throughput_turns_per_s": round(turns / wall_s, 2) if wall_s else None,
+            "latency_ms": _percentiles(self._latencies),
+            "schedule_lag_ms": _percentiles(self._lags),
+        }
+
+
+def summarize_sessions(sessions: list[RecordedSession]) -> dict[str, Any]:
+    turns = [turn for session in sessions for turn in session.turns]
+    return {
+        "sessions": len(sessions),
+        "turns": len(turns),
+        "audio_bytes": _percentiles([float(turn.audio_size) for turn in turns]),
+        "stage_ms": {stage: _percentiles([turn.stage_ms[stage] for turn in turns]) for stage in DEFAULT_STAGE_MS},
+    }
+
@@ -0,0 +1,354 @@
+from __future__ import annotations
+
+from array import array
+from collections.abc import Callable, Iterable, Iterator
+from typing import Any
+
+from pydantic import TypeAdapter
+
+from app.schemas.voice_loop import TranscriptResult, TranscriptUtterance
+
+# Emotion, accent and language labels come from a small vocabulary, so each is stored as a
+# code into one process-wide table; code 0 is None. The table is capped so odd provider labels
+# cannot grow it forever; past the cap, a transcript keeps its labels in a private table.
+_LABELS: list[str | None] = [None]
+_LABEL_CODES: dict[str, int] = {}
+_MAX_LABELS = 65535
+NO_SPEAKER = -1
+_UTTERANCE_LIST = TypeAdapter(list[TranscriptUtterance])
+
+
+class _LabelTableFull(Exception):
+    pass
+
+
+def _shared_code(value: Any) -> int:
+    if value is None:
+        return 0
+    value = str(value)
+    code = _LABEL_CODES.get(value)
+    if code is None:
+        if len(_LABELS) > _MAX_LABELS:
+            raise _LabelTableFull
+        code = _LABEL_CODES[value] = len(_LABELS)
+        _LABELS.append(value)
+    return code
+
+
+class Utterances:
+    """Column store for a transcript's utterances.
+
+    Timings and speakers live in typed arrays and labels as interned codes, so a long call
+    costs a handful of arrays instead of one Pydantic model per utterance. Codes index the
+    shared label table, or a private one (see ``_localize``) once the shared table is full. Plain dicts (for
+    stored turns and progress events) and Pydantic models (for the API response) are built on
+    first use and cached until the columns change.
+    """
+
+    __slots__ = (
+        "uuids",
+        "texts",
+        "start_ms",
+        "duration_ms",
+        "speakers",
+        "languages",
+        "emotions",
+        "accents",
+        "_labels",
+        "_codes",
+        "_dicts",
+        "_models",
+    )
+
+    def __init__(self) -> None:
+        self.uuids: list[str] = []
+        self.texts: list[str] = []
+        self.start_ms = array("q")
+        self.duration_ms = array("q")
+        self.speakers = array("i")
+        self.languages = array("H")
+        self.emotions = array("H")
+        self.accents = array("H")
+        self._labels = _LABELS
+        self._codes = _LABEL_CODES
+        self._dicts: list[dict[str, Any]] | None = None
+        self._models: list[TranscriptUtterance] | None = None
+
+    @classmethod
+    def from_payloads(cls, items: Iterable[dict[str, Any]]) -> Utterances:
+        """Builds columns from provider or stored utterance dicts (the ``TranscriptUtterance`` shape)."""
+        items = list(items)
+        utterances = cls()
+        utterances.uuids = [str(item.get("utterance_uuid", "")) for item in items]
+        utterances.texts = [str(item.get("text", "")) for item in items]
+        utterances.start_ms = array("q", [int(item.get("start_ms") or 0) for item in items])
+        utterances.duration_ms = array("q", [int(item.get("duration_ms") or 0) for item in items])
+        utterances.speakers = array(
+            "i", [NO_SPEAKER if item.get("speaker") is None else int(item["speaker"]) for item in items]
+        )
+        codes = _LABEL_CODES  # known labels resolve with one dict lookup; None and new ones fall through
+        try:
+            utterances.languages = array("H", [codes.get(item.get("language")) or _shared_code(item.get("language")) for item in items])
+            utterances.emotions = array("H", [codes.get(item.get("emotion")) or _shared_code(item.get("emotion")) for item in items])
+            utterances.accents = array("H", [codes.get(item.get("accent")) or _shared_code(item.get("accent")) for item in items])
+        except _LabelTableFull:
+            # Row by row, so the columns can switch to a private table part way through.
+            utterances = cls()
+            for item in items:
+                utterances.append_payload(item)
+        return utterances
+
+    @classmethod
+    def from_models(cls, items: Iterable[TranscriptUtterance]) -> Utterances:
+        utterances = cls()
+        for item in items:
+            utterances.append(
+                item.utterance_uuid, item.text, item.start_ms, item.duration_ms, item.speaker, item.language, item.emotion, item.accent
+            )
+        return utterances
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def append(
+        self,
+        utterance_uuid: str,
+        text: str,
+        start_ms: int = 0,
+        duration_ms: int = 0,
+        speaker: int | None = None,
+        language: str | None = None,
+        emotion: str | None = None,
+        accent: str | None = None,
+    ) -> int:
+        """Appends one utterance and returns its index."""
+        self.uuids.append(utterance_uuid)
+        self.texts.append(text)
+        self.start_ms.append(start_ms)
+        self.duration_ms.append(duration_ms)
+        self.speakers.append(NO_SPEAKER if speaker is None else speaker)
+        self._append_labels(language, emotion, accent)
+        self._invalidate()
+        return len(self.texts) - 1
+
+    def append_payload(self, data: dict[str, Any]) -> int:
+        speaker = data.get("speaker")
+        return self.append(
+            str(data.get("utterance_uuid", "")),
+            str(data.get("text", "")),
+            int(data.get("start_ms") or 0),
+            int(data.get("duration_ms") or 0),
+            None if speaker is None else int(speaker),
+            data.get("language"),
+            data.get("emotion"),
+            data.get("accent"),
+        )
+
+    def extend(self, other: Utterances) -> None:
+        self.uuids.extend(other.uuids)
+        self.texts.extend(other.texts)
+        self.start_ms.extend(other.start_ms)
+        self.duration_ms.extend(other.duration_ms)
+        self.speakers.extend(other.speakers)
+        if other._labels is self._labels:
+            self.languages.extend(other.languages)
+            self.emotions.extend(other.emotions)
+            self.accents.extend(other.accents)
+        else:
+            labels = other._labels
+            for language, emotion, accent in zip(other.languages, other.emotions, other.accents):
+                self._append_labels(labels[language], labels[emotion], labels[accent])
+        self._invalidate()
+
+    def copy(self) -> Utterances:
+        clone = Utterances()
+        clone.extend(self)
+        return clone
+
+    def map_start_ms(self, convert: Callable[[int], int], start: int = 0) -> None:
+        """Rewrites ``start_ms`` in place from index ``start`` on."""
+        for index in range(start, len(self.start_ms)):
+            self.start_ms[index] = convert(self.start_ms[index])
+        self._invalidate()
+
+    def speaker(self, index: int) -> int | None:
+        value = self.speakers[index]
+        return None if value == NO_SPEAKER else value
+
+    def set_speaker(self, index: int, speaker: int | None) -> None:
+        self.speakers[index] = NO_SPEAKER if speaker is None else speaker
+        self._invalidate()
+
+    def language(self, index: int) -> str | None:
+        return self._labels[self.languages[index]]
+
+    def emotion(self, index: int) -> str | None:
+        return self._labels[self.emotions[index]]
+
+    def accent(self, index: int) -> str | None:
+        return self._labels[self.accents[index]]
+
+    def signal_fields(self) -> Iterator[tuple[str, int, int | None, str | None, str | None, str | None]]:
+        """Yields ``(text, end_ms, speaker, language, emotion, accent)`` per utterance for signal aggregation."""
+        labels = self._labels
+        for text, start_ms, duration_ms, speaker, language, emotion, accent in zip(
+            self.texts, self.start_ms, self.duration_ms, self.speakers, self.languages, self.emotions, self.accents
+        ):
+            yield (
+                text,
+                start_ms + duration_ms,
+                None if speaker == NO_SPEAKER else speaker,
+                labels[language],
+                labels[emotion],
+                labels[accent],
+            )
+
+    def row(self, index: int) -> dict[str, Any]:
+        return {
+            "utterance_uuid": self.uuids[index],
+            "text": self.texts[index],
+            "start_ms": self.start_ms[index],
+            "duration_ms": self.duration_ms[index],
+            "speaker": self.speaker(index),
+            "language": self._labels[self.languages[index]],
+            "emotion": self._labels[self.emotions[index]],
+            "accent": self._labels[self.accents[index]],
+        }
+
+    def as_dicts(self) -> list[dict[str, Any]]:
+        """Utterances in ``TranscriptUtterance.model_dump()`` form; cached, treat as read-only."""
+        if self._dicts is None:
+            labels = self._labels
+            self._dicts = [
+                {
+                    "utterance_uuid": uuid,
+                    "text": text,
+                    "start_ms": start_ms,
+                    "duration_ms": duration_ms,
+                    "speaker": None if speaker == NO_SPEAKER else speaker,
+                    "language": labels[language],
+                    "emotion": labels[emotion],
+                    "accent": labels[accent],
+                }
+                for uuid, text, start_ms, duration_ms, speaker, language, emotion, accent in zip(
+                    self.uuids, self.texts, self.start_ms, self.duration_ms, self.speakers, self.languages, self.emotions, self.accents
+                )
+            ]
+        return self._dicts
+
+    def as_models(self) -> list[TranscriptUtterance]:
+        """Pydantic utterances for the API boundary; cached.
+
+        Built from the cached dicts in one pydantic-core call, which is faster than
+        ``model_construct`` per utterance.
+        """
+        if self._models is None:
+            self._models = _UTTERANCE_LIST.validate_python(self.as_dicts())
+        return self._models
+
+    def _append_labels(self, language: Any, emotion: Any, accent: Any) -> None:
+        # Encode before touching the columns: _code may replace them with wider arrays.
+        labels = self._labels
+        codes = self._code(language), self._code(emotion), self._code(accent)
+        if self._labels is not labels:
+            # Switched to a private table part way through the row; earlier codes are stale.
+            codes = self._code(language), self._code(emotion), self._code(accent)
+        self.languages.append(codes[0])
+        self.emotions.append(codes[1])
+        self.accents.append(codes[2])
+
+    def _code(self, value: Any) -> int:
+        if self._labels is _LABELS:
+            try:
+                return _shared_code(value)
+            except _LabelTableFull:
+                self._localize()
+        if value is None:
+            return 0
+        value = str(value)
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self._labels)
+            self._labels.append(value)
+        return code
+
+    def _localize(self) -> None:
+        """Moves the label columns to a private table holding only this transcript's labels."""
+        labels: list[str | None] = [None]
+        codes: dict[str, int] = {}
+        remap = {0: 0}
+        for column in (self.languages, self.emotions, self.accents):
+            for code in set(column) - remap.keys():
+                remap[code] = codes[_LABELS[code]] = len(labels)
+                labels.append(_LABELS[code])
+        # Wider codes: a private table is not bound by the shared table's cap.
+        self.languages = array("I", [remap[code] for code in self.languages])
+        self.emotions = array("I", [remap[code] for code in self.emotions])
+        self.accents = array("I", [remap[code] for code in self.accents])
+        self._labels = labels
+        self._codes = codes
+
+    def _invalidate(self) -> None:
+        self._dicts = None
+        self._models = None
+
+
+class Transcript:
+    """Internal transcript filled by the STT clients; ``to_result()`` is the API-facing model.
+
+    ``signals`` holds the running ``SignalAggregator`` the client updated while utterances
+    arrived, so turn signals never need a second pass over the utterances.
+    """
+
+    __slots__ = ("text", "duration_ms", "utterances", "transport", "raw_provider_payload", "signals", "_result", "_result_models")
+
+    def __init__(
+        self,
+        text: str,
+        duration_ms: int = 0,
+        utterances: Utterances | None = None,
+        transport: str = "unknown",
+        raw_provider_payload: dict[str, Any] | None = None,
+        signals: Any = None,
+    ) -> None:
+        self.text = text
+        self.duration_ms = duration_ms
+        self.utterances = utterances if utterances is not None else Utterances()
+        self.transport = transport
+        self.raw_provider_payload = raw_provider_payload
+        self.signals = signals
+        self._result: TranscriptResult | None = None
+        self._result_models: list[TranscriptUtterance] | None = None
+
+    @classmethod
+    def coerce(cls, value: Transcript | TranscriptResult) -> Transcript:
+        """Accepts either form, so STT stand-ins that still return ``TranscriptResult`` keep working."""
+        if isinstance(value, Transcript):
+            return value
+        return cls(
+            text=value.text,
+            duration_ms=value.duration_ms,
+            utterances=Utterances.from_models(value.utterances),
+            transport=value.transport,
+            raw_provider_payload=value.raw_provider_payload,
+            signals=value._signals,
+        )
+
+    def copy(self) -> Transcript:
+        return Transcript(self.text, self.duration_ms, self.utterances.copy(), self.transport, self.raw_provider_payload)
+
+    def to_result(self) -> TranscriptResult:
+        """Builds the Pydantic model once per transcript; later changes to the columns rebuild it."""
+        models = self.utterances.as_models()
+        if self._result is None or self._result_models is not models:
+            # Already-validated utterance models are accepted as-is, not validated again.
+            self._result = TranscriptResult(
+                text=self.text,
+                duration_ms=self.duration_ms,
+                utterances=models,
+                transport=self.transport,
+                raw_provider_payload=self.raw_provider_payload,
+            )
+            self._result._signals = self.signals
+            self._result_models = models
+        return self._result
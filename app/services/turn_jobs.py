@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+from typing import Any
+
+TERMINAL_STAGES = frozenset({"completed", "failed"})
+
+
+@dataclass
+class TurnJob:
+    turn_id: str
+    session_id: str
+    created: float = field(default_factory=time.monotonic)
+    status: str = "queued"
+    events: list[dict[str, Any]] = field(default_factory=list)
+    result: dict[str, Any] | None = None
+    audio_bytes: bytes | None = None
+    audio_mime_type: str | None = None
+    finished: float | None = None
+    _changed: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self.status in TERMINAL_STAGES
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "turn_id": self.turn_id,
+            "session_id": self.session_id,
+            "status": self.status,
+            "events": len(self.events),
+            "result": self.result,
+        }
+
+
+class TurnJobStore:
+    """In-memory store for voice turns run in async (job) mode.
+
+    Each job keeps its ordered progress events so a subscriber that connects late, or
+    reconnects, replays everything from the start. Finished jobs expire after ``ttl_s``;
+    when more than ``max_jobs`` are held the oldest finished jobs are evicted first.
+    Jobs are worker-local: the events stream must be read from the process that runs it.
+    """
+
+    def __init__(self, max_jobs: int = 256, ttl_s: float = 600.0) -> None:
+        self.max_jobs = max_jobs
+        self.ttl_s = ttl_s
+        self._jobs: OrderedDict[str, TurnJob] = OrderedDict()
+
+    def create(self, session_id: str) -> TurnJob:
+        self._evict()
+        job = TurnJob(turn_id=str(uuid.uuid4()), session_id=session_id)
+        self._jobs[job.turn_id] = job
+        return job
+
+    def get(self, turn_id: str) -> TurnJob | None:
+        self._evict()
+        return self._jobs.get(turn_id)
+
+    def publish(self, job: TurnJob, stage: str, payload: dict[str, Any]) -> None:
+        if job.done:
+            return
+        if stage in TERMINAL_STAGES:
+            job.status = stage
+            job.finished = time.monotonic()
+        elif job.status == "queued":
+            job.status = "running"
+        job.events.append({"id": len(job.events), "stage": stage, "payload": payload})
+        # Wake every subscriber, then re-arm for the next event.
+        job._changed.set()
+        job._changed = asyncio.Event()
+
+    async def subscribe(self, job: TurnJob, after: int = -1, keepalive_s: float = 15.0) -> AsyncIterator[dict[str, Any] | None]:
+        """Yields events with ``id > after`` as they arrive; ``None`` is a keep-alive tick."""
+        cursor = after + 1
+        while True:
+            while cursor < len(job.events):
+                event = job.events[cursor]
+                cursor += 1
+                yield event
+            if job.done:
+                return
+            changed = job._changed
+            try:
+                async with asyncio.timeout(keepalive_s):
+                    await changed.wait()
+            except TimeoutError:
+                yield None
+
+    def stats(self) -> dict[str, Any]:
+        running = sum(1 for job in self._jobs.values() if not job.done)
+        return {"jobs": len(self._jobs), "running": running, "max_jobs": self.max_jobs}
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        for turn_id in [key for key, job in self._jobs.items() if job.done and now - job.finished > self.ttl_s]:
+            del self._jobs[turn_id]
+        if len(self._jobs) < self.max_jobs:
+            return
+        for turn_id in [key for key, job in self._jobs.items() if job.done]:
+            del self._jobs[turn_id]
+            if len(self._jobs) < self.max_jobs:
+                return
@@ -1,23 +1,64 @@
 from __future__ import annotations
 
+import asyncio
 import base64
 import logging
+import time
 import uuid
+from collections.abc import Awaitable, Callable
+from contextlib import nullcontext
+from dataclasses import dataclass
 from datetime import UTC, datetime
+from typing import Any
 
 from app.clients.interfaces import LLMClientProtocol, ModulateClientProtocol, TTSClientProtocol
 from app.schemas.voice_loop import (
     EmotionResult,
     IntentResult,
     LLMRequest,
+    LLMResponse,
     SignalBundle,
     StartSessionResponse,
+    TTSResult,
     VoiceLoopProcessResponse,
 )
 from app.repositories.session_store import SessionStore
+from app.services.admission import AdmissionController
+from app.services.audio_preprocess import AudioPreprocessor, PreprocessedAudio
+from app.services.deadline import DeadlineExceeded, TurnDeadline
+from app.services.lexicon import Lexicon, get_lexicon
+from app.services.signal_aggregator import SignalAggregator, aggregate_for
+from app.services.signal_scoring import escalation_risk_for, interruption_risk_for, sentiment_for
+from app.services.streaming_speech import concat_tts_results, speak_stream
+from app.services.transcript import Transcript
 
 logger = logging.getLogger(__name__)
 
+# Receives (stage, payload) as a turn progresses, e.g. ("audio_chunk", {...}).
+ProgressCallback = Callable[[str, dict[str, Any]], Awaitable[None]]
+
+DEGRADED_REPLY_TEXT = "Sorry, I didn't catch that. Could you repeat that?"
+
+
+@dataclass
+class _ActiveTurn:
+    turn_id: str
+    started: float
+    barged_in_on: str | None = None
+    interrupted_by: str | None = None
+    response_task: asyncio.Task | None = None
+    signals: SignalBundle | None = None
+
+
+class _LimitedTTS:
+    """TTS client view that routes every clip through the service's TTS provider limit."""
+
+    def __init__(self, service: VoiceLoopService) -> None:
+        self._service = service
+
+    async def synthesize_speech(self, text: str, voice: str | None = None) -> TTSResult:
+        return await self._service._synthesize(text, voice)
+
 
 class VoiceLoopService:
     def __init__(
@@ -26,11 +67,32 @@ class VoiceLoopService:
         llm_client: LLMClientProtocol,
         tts_client: TTSClientProtocol,
         session_store: SessionStore,
+        llm_streaming: bool = False,
+        tts_max_parallel: int = 3,
+        turn_budget_s: float = 25.0,
+        stage_retries: int = 1,
+        fallback_tts_timeout_s: float = 2.0,
+        lexicon: Lexicon | None = None,
+        audio_preprocessor: AudioPreprocessor | None = None,
+        admission: AdmissionController | None = None,
     ) -> None:
         self.modulate_client = modulate_client
         self.llm_client = llm_client
         self.tts_client = tts_client
         self.session_store = session_store
+        self.llm_streaming = llm_streaming
+        self.tts_max_parallel = tts_max_parallel
+        self.turn_budget_s = turn_budget_s
+        self.stage_retries = stage_retries
+        self.fallback_tts_timeout_s = fallback_tts_timeout_s
+        self._degraded_clip: TTSResult | None = None
+        self._degraded_clip_task: asyncio.Task | None = None
+        self.lexicon = lexicon or getattr(modulate_client, "lexicon", None) or get_lexicon()
+        self.audio_preprocessor = audio_preprocessor
+        self.admission = admission
+        # Newest in-flight turn per session; a newer turn cancels the older one's LLM/TTS work.
+        self._active_turns: dict[str, _ActiveTurn] = {}
+        self.interrupted_turns = 0
 
     def start_session(self) -> StartSessionResponse:
         session_id = str(uuid.uuid4())
@@ -43,6 +105,7 @@ class VoiceLoopService:
         audio_bytes: bytes,
         content_type: str,
         session_id: str | None = None,
+        on_progress: ProgressCallback | None = None,
     ) -> VoiceLoopProcessResponse:
         current_session_id = session_id or str(uuid.uuid4())
         if session_id is None:
@@ -60,7 +123,70 @@ class VoiceLoopService:
             },
         )
 
-        transcript = await self.modulate_client.transcribe(audio_bytes, content_type, current_session_id)
+        deadline = TurnDeadline(self.turn_budget_s, retries=self.stage_retries)
+        transcript = None
+        on_utterance = None
+        if on_progress is not None:
+
+            async def on_utterance(utterance: dict[str, Any], aggregator: SignalAggregator) -> None:
+                await on_progress("partial_signals", {"text": utterance["text"], **aggregator.snapshot()})
+
+        turn = self._begin_turn(current_session_id)
+        try:
+            prepared = await self._prepare_audio(current_session_id, audio_bytes, content_type)
+            transcript = await deadline.run("stt", lambda: self._transcribe(prepared, current_session_id, on_utterance))
+            return await self._complete_turn(current_session_id, transcript, deadline, on_progress, turn)
+        except DeadlineExceeded as exc:
+            return await self._degraded_turn(current_session_id, transcript, deadline, exc, turn)
+        finally:
+            if self._active_turns.get(current_session_id) is turn:
+                del self._active_turns[current_session_id]
+
+    def _begin_turn(self, session_id: str) -> _ActiveTurn:
+        turn = _ActiveTurn(turn_id=str(uuid.uuid4()), started=time.monotonic())
+        previous = self._active_turns.get(session_id)
+        if previous is not None:
+            # The caller spoke over the agent: nobody will hear the older answer.
+            previous.interrupted_by = turn.turn_id
+            turn.barged_in_on = previous.turn_id
+            if previous.response_task is not None:
+                previous.response_task.cancel()
+        self._active_turns[session_id] = turn
+        return turn
+
+    async def _prepare_audio(self, session_id: str, audio_bytes: bytes, content_type: str) -> PreprocessedAudio:
+        if self.audio_preprocessor is None:
+            return PreprocessedAudio(audio_bytes, content_type, original_bytes=len(audio_bytes))
+        # Decoding and VAD are CPU-bound; keep them off the event loop.
+        prepared = await asyncio.to_thread(self.audio_preprocessor.process, audio_bytes, content_type)
+        self.session_store.append_event(session_id, "audio_preprocessed", prepared.summary())
+        return prepared
+
+    def _provider_slot(self, provider: str):
+        if self.admission is None:
+            return nullcontext()
+        return self.admission.provider(provider)
+
+    async def _transcribe(self, prepared: PreprocessedAudio, session_id: str, on_utterance=None) -> Transcript:
+        async with self._provider_slot("stt"):
+            result = await self.modulate_client.transcribe(
+                prepared.audio_bytes,
+                prepared.content_type,
+                session_id,
+                on_utterance=on_utterance,
+            )
+        transcript = Transcript.coerce(result)
+        prepared.restore_timestamps(transcript.utterances)
+        return transcript
+
+    async def _complete_turn(
+        self,
+        current_session_id: str,
+        transcript: Transcript,
+        deadline: TurnDeadline,
+        on_progress: ProgressCallback | None,
+        turn: _ActiveTurn,
+    ) -> VoiceLoopProcessResponse:
         self.session_store.append_event(
             current_session_id,
             "stt_completed",
@@ -72,35 +198,70 @@ class VoiceLoopService:
             },
         )
 
+        if on_progress is not None:
+            await on_progress(
+                "transcript",
+                {
+                    "text": transcript.text,
+                    "duration_ms": transcript.duration_ms,
+                    "utterances": transcript.utterances.as_dicts(),
+                },
+            )
+
         intent = await self.modulate_client.analyze_intent(transcript.text, current_session_id)
         emotion = self._dominant_emotion(transcript) or await self.modulate_client.analyze_emotion(
             transcript.text,
             current_session_id,
         )
 
-        signals = self._build_signals(intent=intent, emotion=emotion, transcript=transcript)
-        llm_request = LLMRequest(transcript=transcript, signals=signals, session_id=current_session_id)
-        llm_response = await self.llm_client.generate_response(llm_request)
+        signals = self._build_signals(
+            intent=intent,
+            emotion=emotion,
+            transcript=transcript,
+            barged_in=turn.barged_in_on is not None,
+        )
+        turn.signals = signals
+        signals_payload = signals.model_dump()
+        if on_progress is not None:
+            await on_progress("signals", signals_payload)
+        if turn.interrupted_by is not None:
+            return await self._interrupted_turn(current_session_id, transcript, signals, signals_payload, turn, "stt")
 
-        tts_result = await self.tts_client.synthesize_speech(llm_response.text)
+        llm_request = LLMRequest(transcript=transcript.to_result(), signals=signals, session_id=current_session_id)
+        response_started = time.perf_counter()
+        turn.response_task = asyncio.create_task(self._respond(llm_request, deadline, response_started, on_progress))
+        try:
+            llm_response, tts_result, first_audio_ms = await turn.response_task
+        except asyncio.CancelledError:
+            current = asyncio.current_task()
+            if turn.interrupted_by is None or (current is not None and current.cancelling()):
+                raise
+            return await self._interrupted_turn(current_session_id, transcript, signals, signals_payload, turn, "llm_tts")
         tts_audio_b64 = base64.b64encode(tts_result.audio_bytes).decode("ascii")
 
         turn_payload = {
             "timestamp": datetime.now(tz=UTC).isoformat(),
             "user_text": transcript.text,
-            "utterances": [item.model_dump() for item in transcript.utterances],
-            "signals": signals.model_dump(),
+            "duration_ms": transcript.duration_ms,
+            "utterances": transcript.utterances.as_dicts(),
+            "signals": signals_payload,
+            "barged_in": turn.barged_in_on is not None,
             "agent_text": llm_response.text,
+            "rules_version": llm_response.rules_version,
             "audio_mime_type": tts_result.mime_type,
             "audio_provider": tts_result.provider,
         }
-        self.session_store.append_turn(current_session_id, turn_payload)
+        await asyncio.to_thread(self.session_store.append_turn, current_session_id, turn_payload)
         self.session_store.append_event(
             current_session_id,
             "turn_completed",
             {
                 "agent_text": llm_response.text,
+                "rules_version": llm_response.rules_version,
                 "audio_provider": tts_result.provider,
+                "response_ms": round((time.perf_counter() - response_started) * 1000, 1),
+                "first_audio_ms": first_audio_ms,
+                "stages": deadline.stages,
             },
         )
 
@@ -113,7 +274,7 @@ class VoiceLoopService:
 
         return VoiceLoopProcessResponse(
             session_id=current_session_id,
-            transcript=transcript,
+            transcript=transcript.to_result(),
             signals=signals,
             llm_response=llm_response,
             tts_audio_b64=tts_audio_b64,
@@ -122,6 +283,195 @@ class VoiceLoopService:
             output_status="audio_generated",
         )
 
+    async def _respond(
+        self,
+        llm_request: LLMRequest,
+        deadline: TurnDeadline,
+        response_started: float,
+        on_progress: ProgressCallback | None,
+    ) -> tuple[LLMResponse, TTSResult, float | None]:
+        if self.llm_streaming and hasattr(self.llm_client, "stream_response"):
+            # Clips may already have been delivered, so the combined stage is never retried.
+            return await deadline.run(
+                "llm_tts",
+                lambda: self._respond_streaming(llm_request, response_started, on_progress),
+                idempotent=False,
+            )
+        llm_response = await deadline.run("llm", lambda: self._generate(llm_request))
+        if on_progress is not None:
+            await on_progress("llm_text", {"text": llm_response.text, "rules_version": llm_response.rules_version})
+        tts_result = await deadline.run("tts", lambda: self._synthesize(llm_response.text))
+        return llm_response, tts_result, None
+
+    async def _generate(self, llm_request: LLMRequest) -> LLMResponse:
+        async with self._provider_slot("llm"):
+            return await self.llm_client.generate_response(llm_request)
+
+    async def _synthesize(self, text: str, voice: str | None = None) -> TTSResult:
+        async with self._provider_slot("tts"):
+            return await self.tts_client.synthesize_speech(text, voice)
+
+    async def _interrupted_turn(
+        self,
+        current_session_id: str,
+        transcript: Transcript,
+        signals: SignalBundle,
+        signals_payload: dict[str, Any],
+        turn: _ActiveTurn,
+        stage: str,
+    ) -> VoiceLoopProcessResponse:
+        # Keep what the caller said so the summary and timeline stay complete; drop the answer.
+        self.interrupted_turns += 1
+        await asyncio.to_thread(
+            self.session_store.append_turn,
+            current_session_id,
+            {
+                "timestamp": datetime.now(tz=UTC).isoformat(),
+                "user_text": transcript.text,
+                "duration_ms": transcript.duration_ms,
+                "utterances": transcript.utterances.as_dicts(),
+                "signals": signals_payload,
+                "barged_in": turn.barged_in_on is not None,
+                "agent_text": "",
+                "interrupted_by": turn.interrupted_by,
+            },
+        )
+        self.session_store.append_event(
+            current_session_id,
+            "interrupted",
+            {
+                "turn_id": turn.turn_id,
+                "interrupted_by": turn.interrupted_by,
+                "stage": stage,
+                "elapsed_ms": round((time.monotonic() - turn.started) * 1000, 1),
+            },
+        )
+        logger.info("Turn %s for session_id=%s interrupted during %s", turn.turn_id, current_session_id, stage)
+        return VoiceLoopProcessResponse(
+            session_id=current_session_id,
+            transcript=transcript.to_result(),
+            signals=signals,
+            llm_response=LLMResponse(text="", tool_commands=[]),
+            tts_audio_b64="",
+            tts_mime_type="",
+            tts_provider=None,
+            output_status="interrupted",
+        )
+
+    async def _degraded_turn(
+        self,
+        current_session_id: str,
+        transcript: Transcript | None,
+        deadline: TurnDeadline,
+        exc: DeadlineExceeded,
+        turn: _ActiveTurn,
+    ) -> VoiceLoopProcessResponse:
+        logger.warning("Turn for session_id=%s degraded: %s", current_session_id, exc)
+        transcript = transcript or Transcript(text="", transport="deadline_exceeded")
+        signals = turn.signals
+        if signals is None:
+            # STT ran out of budget, so intent and emotion were never analysed; store markers.
+            signals = self._build_signals(
+                intent=IntentResult(label="general_inquiry", confidence=0.0, reason="deadline_exceeded"),
+                emotion=self._dominant_emotion(transcript) or EmotionResult(label="Neutral", confidence=0.0),
+                transcript=transcript,
+                barged_in=turn.barged_in_on is not None,
+            )
+        llm_response = LLMResponse(text=DEGRADED_REPLY_TEXT, tool_commands=[])
+        tts_result = self._degraded_audio()
+
+        await asyncio.to_thread(
+            self.session_store.append_turn,
+            current_session_id,
+            {
+                "timestamp": datetime.now(tz=UTC).isoformat(),
+                "user_text": transcript.text,
+                "duration_ms": transcript.duration_ms,
+                "utterances": transcript.utterances.as_dicts(),
+                "signals": signals.model_dump(),
+                "barged_in": turn.barged_in_on is not None,
+                "agent_text": llm_response.text,
+                "audio_mime_type": tts_result.mime_type,
+                "audio_provider": tts_result.provider,
+                "degraded_stage": exc.stage,
+            },
+        )
+        self.session_store.append_event(
+            current_session_id,
+            "turn_degraded",
+            {
+                "stage": exc.stage,
+                "budget_s": exc.budget_s,
+                "elapsed_ms": round(deadline.elapsed() * 1000, 1),
+                "stages": deadline.stages,
+            },
+        )
+        return VoiceLoopProcessResponse(
+            session_id=current_session_id,
+            transcript=transcript.to_result(),
+            signals=signals,
+            llm_response=llm_response,
+            tts_audio_b64=base64.b64encode(tts_result.audio_bytes).decode("ascii"),
+            tts_mime_type=tts_result.mime_type,
+            tts_provider=tts_result.provider,
+            output_status="degraded",
+        )
+
+    async def prepare_degraded_reply(self) -> None:
+        """Synthesizes the degraded reply clip once per worker; called from warmup."""
+        if self._degraded_clip is not None:
+            return
+        try:
+            self._degraded_clip = await asyncio.wait_for(
+                self._synthesize(DEGRADED_REPLY_TEXT),
+                timeout=self.fallback_tts_timeout_s,
+            )
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Could not synthesize degraded reply clip: %s", exc)
+
+    def _degraded_audio(self) -> TTSResult:
+        # A degraded turn has no budget left, so it never waits on TTS: without a clip it
+        # answers text-only and prepares the clip in the background for the next one.
+        if self._degraded_clip is not None:
+            return self._degraded_clip
+        if self._degraded_clip_task is None or self._degraded_clip_task.done():
+            self._degraded_clip_task = asyncio.create_task(self.prepare_degraded_reply())
+        return TTSResult(audio_bytes=b"", mime_type="audio/mpeg", provider="none")
+
+    async def _respond_streaming(
+        self,
+        llm_request: LLMRequest,
+        started: float,
+        on_progress: ProgressCallback | None,
+    ) -> tuple[LLMResponse, TTSResult, float | None]:
+        stream = await self.llm_client.stream_response(llm_request)
+        first_audio_ms: float | None = None
+
+        async def on_audio(index: int, sentence: str, clip: TTSResult) -> None:
+            nonlocal first_audio_ms
+            if first_audio_ms is None:
+                first_audio_ms = round((time.perf_counter() - started) * 1000, 1)
+            if on_progress is not None:
+                await on_progress(
+                    "audio_chunk",
+                    {
+                        "index": index,
+                        "text": sentence,
+                        "audio_b64": base64.b64encode(clip.audio_bytes).decode("ascii"),
+                        "mime_type": clip.mime_type,
+                    },
+                )
+
+        # The LLM slot covers the whole stream; each clip takes its own TTS slot.
+        async with self._provider_slot("llm"):
+            text, clips = await speak_stream(stream, _LimitedTTS(self), on_audio=on_audio, max_parallel=self.tts_max_parallel)
+        if not clips:
+            clips = [await self._synthesize(text)]
+        llm_response = LLMResponse(text=text, tool_commands=[], rules_version=stream.rules_version)
+        if on_progress is not None:
+            await on_progress("llm_text", {"text": text, "rules_version": stream.rules_version})
+        return llm_response, concat_tts_results(clips), first_audio_ms
+
     def get_session(self, session_id: str) -> dict:
         record = self.session_store.get_session(session_id)
         events = self.session_store.load_events(session_id)
@@ -130,37 +480,45 @@ class VoiceLoopService:
             "events": events,
         }
 
+    def get_signal_timeline(self, session_id: str) -> dict[str, Any]:
+        timeline = self.session_store.get_timeline(session_id)
+        return {"session_id": session_id, **timeline.snapshot(), "trend": timeline.describe()}
+
+    def metrics(self) -> dict[str, Any]:
+        response_cache = getattr(self.llm_client, "response_cache", None)
+        insights_queue = getattr(self.llm_client, "insights_queue", None)
+        return {
+            "llm_cache": response_cache.stats() if response_cache is not None else None,
+            "insights_queue": insights_queue.stats() if insights_queue is not None else None,
+            "turns": {"active": len(self._active_turns), "interrupted": self.interrupted_turns},
+            "admission": self.admission.stats() if self.admission is not None else None,
+        }
+
     @staticmethod
     def _dominant_emotion(transcript) -> EmotionResult | None:
-        emotions = [u.emotion for u in transcript.utterances if u.emotion]
-        if not emotions:
-            return None
-        label = max(set(emotions), key=emotions.count)
-        confidence = round(emotions.count(label) / len(emotions), 2)
-        return EmotionResult(label=label, confidence=confidence, source="modulate_stt")
-
-    def _build_signals(self, intent: IntentResult, emotion: EmotionResult, transcript) -> SignalBundle:
-        utterances = transcript.utterances
-        languages = sorted({u.language for u in utterances if u.language})
-        accents = sorted({u.accent for u in utterances if u.accent})
-        speakers = sorted({u.speaker for u in utterances if u.speaker is not None})
-        pii_detected = any("<PII>" in u.text or "<PHI>" in u.text for u in utterances)
-        speaking_pace_wpm = self._estimate_pace_wpm(transcript.text, transcript.duration_ms)
-
-        sentiment = "neutral"
-        if emotion.label in {"Happy", "Confident", "Relieved"}:
-            sentiment = "positive"
-        elif emotion.label in {"Angry", "Frustrated", "Concerned", "Sad", "Anxious"}:
-            sentiment = "negative"
-
-        lowered = transcript.text.lower()
-        toxicity_risk = 0.05
-        if any(word in lowered for word in ["stupid", "idiot", "hate"]):
-            toxicity_risk = 0.7
-        escalation_risk = 0.2
-        if emotion.label in {"Angry", "Frustrated", "Anxious"}:
-            escalation_risk = 0.65
-        interruption_risk = 0.35 if len(speakers) > 1 else 0.1
+        return aggregate_for(transcript).dominant_emotion()
+
+    def _build_signals(
+        self,
+        intent: IntentResult,
+        emotion: EmotionResult,
+        transcript,
+        barged_in: bool = False,
+    ) -> SignalBundle:
+        aggregate = aggregate_for(transcript)
+        languages = sorted(aggregate.languages)
+        accents = sorted(aggregate.accents)
+        speakers = sorted(aggregate.speakers)
+        pii_detected = aggregate.pii_detected
+        if aggregate.utterance_count:
+            speaking_pace_wpm = aggregate.pace_wpm(transcript.duration_ms) if transcript.duration_ms > 0 else None
+        else:
+            speaking_pace_wpm = self._estimate_pace_wpm(transcript.text, transcript.duration_ms)
+
+        sentiment = sentiment_for(emotion.label)
+        toxicity_risk = self.lexicon.toxicity_risk(transcript.text)
+        escalation_risk = escalation_risk_for(emotion.label)
+        interruption_risk = interruption_risk_for(len(speakers), barged_in)
 
         compliance_flags: list[str] = []
         if pii_detected:
@@ -1,7 +1,7 @@
 import json
 import asyncio
-import requests
 from app.core.config import settings
+from app.core.startup import load_provider_async
 
 # Dedicated system prompt for insight generation
 INSIGHT_GENERATION_PROMPT = """
@@ -98,6 +98,7 @@ async def generate_insights_from_transcript(transcript_text: str, existing_rules
     print("Calling Airia API pipeline...")
     # Make the HTTP request in a thread pool to avoid blocking the async event loop
     try:
+        requests = await load_provider_async("requests")
         response = await asyncio.to_thread(
             requests.post,
             url,
@@ -0,0 +1 @@
+"""Offline microbenchmarks for the voice-loop hot paths; run with ``python -m benchmarks``."""
@@ -0,0 +1,99 @@
+"""Run the offline microbenchmarks and gate on regressions against a stored baseline.
+
+Each result is compared with ``benchmarks/baseline.json`` after rescaling the baseline by a
+fixed reference workload, so a baseline recorded on a faster or slower machine still
+applies. Exits with status 1 when any benchmark is slower than its baseline by more than
+``--threshold``.
+
+Usage:
+    python -m benchmarks
+    python -m benchmarks --filter session_store --threshold 0.5
+    python -m benchmarks --update-baseline
+"""
+
+from __future__ import annotations
+
+import argparse
+import fnmatch
+import json
+import sys
+from pathlib import Path
+
+from benchmarks import cases
+from benchmarks.harness import REGISTRY, compare, load_baseline, measure, reference_ns, save_baseline
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filter", default="*", help="Glob (or substring) selecting benchmarks by name")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="Baseline JSON file")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown before failing, as a fraction (0.25 = 25%%)")
+    parser.add_argument("--repeats", type=int, default=5, help="Timing rounds per benchmark; the fastest is reported")
+    parser.add_argument("--target-ms", type=float, default=50.0, help="Approximate duration of each timing round")
+    parser.add_argument("--confirm", type=int, default=2, help="Re-measure a regressed benchmark up to N times before failing")
+    parser.add_argument("--update-baseline", action="store_true", help="Write the selected results to the baseline instead of gating")
+    parser.add_argument("--list", action="store_true", help="List benchmark names and exit")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = _parse_args(argv)
+    pattern = args.filter if any(char in args.filter for char in "*?[") else f"*{args.filter}*"
+    names = [name for name in REGISTRY if fnmatch.fnmatchcase(name, pattern)]
+    if args.list:
+        sys.stdout.write("\n".join(names) + "\n")
+        return
+    if not names:
+        raise SystemExit(f"No benchmarks match {args.filter!r}")
+
+    try:
+        reference = reference_ns()
+        results = []
+        for name in names:
+            result = measure(name, REGISTRY[name], repeats=args.repeats, target_s=args.target_ms / 1000)
+            results.append(result)
+            sys.stderr.write(f"{name}: {result.ns_per_op / 1000:.2f} us/op (±{result.stdev_pct:.1f}%)\n")
+        # Time the reference again afterwards so one noisy moment cannot skew every comparison.
+        reference = min(reference, reference_ns())
+    finally:
+        cases.cleanup()
+
+    baseline = load_baseline(args.baseline)
+    if args.update_baseline:
+        save_baseline(args.baseline, reference, results, previous=baseline)
+        sys.stdout.write(json.dumps({"baseline": str(args.baseline), "updated": len(results), "reference_ns": round(reference, 1)}, indent=2) + "\n")
+        return
+
+    rows = compare(results, baseline, reference, args.threshold)
+    for _ in range(args.confirm):
+        suspects = {row["name"] for row in rows if row["regressed"]}
+        if not suspects:
+            break
+        # A regression only counts if it reproduces; keep each benchmark's best time.
+        try:
+            results = [
+                min(result, measure(result.name, REGISTRY[result.name], repeats=args.repeats, target_s=args.target_ms / 1000), key=lambda item: item.ns_per_op)
+                if result.name in suspects
+                else result
+                for result in results
+            ]
+        finally:
+            cases.cleanup()
+        rows = compare(results, baseline, reference, args.threshold)
+    regressed = [row["name"] for row in rows if row["regressed"]]
+    report = {
+        "reference_ns": round(reference, 1),
+        "threshold_pct": round(args.threshold * 100, 1),
+        "benchmarks": rows,
+        "missing_baseline": [row["name"] for row in rows if row["baseline_ns"] is None],
+        "regressed": regressed,
+    }
+    sys.stdout.write(json.dumps(report, indent=2) + "\n")
+    if regressed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+import asyncio
+import shutil
+import tempfile
+import uuid
+from datetime import UTC, datetime
+from typing import Any
+
+from app.clients.tts_blackbox import BlackboxTTSClient
+from app.clients.tts_free import FreeTTSClient
+from app.repositories.session_store import SessionStore
+from app.schemas.voice_loop import (
+    EmotionResult,
+    IntentResult,
+    LLMResponse,
+    TranscriptResult,
+    TranscriptUtterance,
+    VoiceLoopProcessResponse,
+)
+from app.services.appointment_manager import AppointmentManager
+from app.services.transcript import Transcript, Utterances
+from app.services.voice_loop_service import VoiceLoopService
+from benchmarks.harness import benchmark
+
+SESSION_LENGTHS = (1, 20, 100)
+UTTERANCE_COUNTS = (1, 10, 100)
+MESSAGE_COUNTS = (2, 20, 200)
+
+_EMOTIONS = ("Neutral", "Happy", "Frustrated", "Anxious")
+_SENTENCE = "I need to move my appointment with doctor Patel to next Tuesday afternoon if possible"
+
+# Scratch directories live for the whole run and are removed by ``cleanup``.
+_scratch: list[str] = []
+
+
+def cleanup() -> None:
+    while _scratch:
+        shutil.rmtree(_scratch.pop(), ignore_errors=True)
+
+
+def _scratch_dir() -> str:
+    path = tempfile.mkdtemp(prefix="voice-bench-")
+    _scratch.append(path)
+    return path
+
+
+def make_transcript(utterances: int) -> TranscriptResult:
+    items = [
+        TranscriptUtterance(
+            utterance_uuid=str(uuid.UUID(int=index)),
+            text=_SENTENCE if index % 7 else _SENTENCE + " my number is <PII>",
+            start_ms=index * 4000,
+            duration_ms=3800,
+            speaker=index % 2,
+            language="en",
+            emotion=_EMOTIONS[index % len(_EMOTIONS)],
+            accent="American" if index % 3 else "British",
+        )
+        for index in range(utterances)
+    ]
+    return TranscriptResult(
+        text=" ".join(item.text for item in items),
+        duration_ms=utterances * 4000,
+        utterances=items,
+        transport="streaming",
+    )
+
+
+def _service() -> VoiceLoopService:
+    return VoiceLoopService(
+        modulate_client=None,
+        llm_client=None,
+        tts_client=BlackboxTTSClient(),
+        session_store=SessionStore(_scratch_dir()),
+    )
+
+
+def _signals(service: VoiceLoopService, transcript: TranscriptResult):
+    return service._build_signals(
+        IntentResult(label="reschedule", confidence=0.82),
+        EmotionResult(label="Frustrated", confidence=0.6),
+        transcript,
+    )
+
+
+def make_turn(service: VoiceLoopService, utterances: int = 10) -> dict[str, Any]:
+    transcript = make_transcript(utterances)
+    return {
+        "timestamp": datetime.now(tz=UTC).isoformat(),
+        "user_text": transcript.text,
+        "duration_ms": transcript.duration_ms,
+        "utterances": [item.model_dump() for item in transcript.utterances],
+        "signals": _signals(service, transcript).model_dump(),
+        "barged_in": False,
+        "agent_text": "Sure, I can move that for you. Does Tuesday at 3pm work?",
+        "rules_version": "bench",
+        "audio_mime_type": "audio/mpeg",
+        "audio_provider": "edge_tts_free",
+    }
+
+
+def make_messages(count: int) -> list[dict[str, Any]]:
+    return [
+        {"role": "user", "content": _SENTENCE}
+        if index % 2 == 0
+        else {"role": "assistant", "content": '{"response": "Of course. Which day works best for you?"}'}
+        for index in range(count)
+    ]
+
+
+def _seeded_store(turns: int) -> tuple[SessionStore, str, dict[str, Any]]:
+    service = _service()
+    store = SessionStore(_scratch_dir())
+    session_id = "bench"
+    store.create_session(session_id)
+    turn = make_turn(service)
+    for _ in range(turns):
+        store.append_turn(session_id, turn)
+    return store, session_id, turn
+
+
+for _turns in SESSION_LENGTHS:
+
+    @benchmark(f"session_store.append_turn[turns={_turns}]")
+    def _append_turn(turns: int = _turns):
+        store, session_id, turn = _seeded_store(turns)
+        files = (store._session_file(session_id), store._summary_file(session_id), store._timeline_file(session_id))
+        snapshot = {path: path.read_bytes() for path in files}
+
+        def reset() -> None:
+            # Keep the session at its seeded length so every call does the same work.
+            for path, data in snapshot.items():
+                path.write_bytes(data)
+
+        return (lambda: store.append_turn(session_id, turn)), reset
+
+    @benchmark(f"session_store.get_session[turns={_turns}]")
+    def _get_session(turns: int = _turns):
+        store, session_id, _ = _seeded_store(turns)
+        return lambda: store.get_session(session_id)
+
+
+for _utterances in UTTERANCE_COUNTS:
+
+    @benchmark(f"voice_loop._build_signals[utterances={_utterances}]")
+    def _build_signals(utterances: int = _utterances):
+        service = _service()
+        transcript = make_transcript(utterances)
+
+        def reset() -> None:
+            transcript._signals = None  # time the aggregation, not the cached aggregate
+
+        return (lambda: _signals(service, transcript)), reset
+
+
+for _utterances in UTTERANCE_COUNTS:
+
+    @benchmark(f"transcript.from_payloads[utterances={_utterances}]")
+    def _from_payloads(utterances: int = _utterances):
+        payloads = [item.model_dump() for item in make_transcript(utterances).utterances]
+        return lambda: Utterances.from_payloads(payloads)
+
+    @benchmark(f"transcript.to_result[utterances={_utterances}]")
+    def _to_result(utterances: int = _utterances):
+        transcript = Transcript.coerce(make_transcript(utterances))
+
+        def reset() -> None:
+            transcript.utterances = transcript.utterances.copy()  # drop the cached dicts and models
+
+        return (lambda: (transcript.utterances.as_dicts(), transcript.to_result())), reset
+
+
+@benchmark("voice_loop._estimate_pace_wpm")
+def _estimate_pace_wpm():
+    text = " ".join([_SENTENCE] * 5)
+    return lambda: VoiceLoopService._estimate_pace_wpm(text, 21000)
+
+
+for _messages in MESSAGE_COUNTS:
+
+    @benchmark(f"appointment_manager.generate_summary[messages={_messages}]")
+    def _generate_summary(messages: int = _messages):
+        manager = AppointmentManager()
+        history = make_messages(messages)
+        return lambda: manager.generate_summary(history, {})
+
+    @benchmark(f"appointment_manager.messages_as_turn_json[messages={_messages}]")
+    def _messages_as_turn_json(messages: int = _messages):
+        manager = AppointmentManager()
+        history = make_messages(messages)
+        return lambda: manager.messages_as_turn_json(history)
+
+
+@benchmark("appointment_manager.build_user_prompt")
+def _build_user_prompt():
+    manager = AppointmentManager()
+    summary = manager.generate_summary(make_messages(20), {})
+    rules = "\n".join(f"- {rule}" for rule in manager.load_rules())
+    return lambda: manager.build_user_prompt(summary, _SENTENCE, rules, signal_trend="emotion: Neutral -> Frustrated")
+
+
+@benchmark("tts_free._normalize_text[plain]")
+def _normalize_plain():
+    return lambda: FreeTTSClient._normalize_text("  Sure, I can move that for you.  ")
+
+
+@benchmark("tts_free._normalize_text[json]")
+def _normalize_json():
+    text = '{"response": "Sure, I can move that for you. Does Tuesday at 3pm work?"}'
+    return lambda: FreeTTSClient._normalize_text(text)
+
+
+@benchmark("tts_blackbox.synthesize_speech")
+def _blackbox_tts():
+    client = BlackboxTTSClient()
+    loop = asyncio.new_event_loop()
+    return lambda: loop.run_until_complete(client.synthesize_speech("Sure, I can move that for you."))
+
+
+def _process_response(utterances: int) -> VoiceLoopProcessResponse:
+    service = _service()
+    transcript = make_transcript(utterances)
+    return VoiceLoopProcessResponse(
+        session_id="bench",
+        transcript=transcript,
+        signals=_signals(service, transcript),
+        llm_response=LLMResponse(text="Sure, I can move that for you.", rules_version="bench"),
+        tts_audio_b64="",
+        tts_mime_type="audio/mpeg",
+        tts_provider="edge_tts_free",
+        output_status="audio_generated",
+    )
+
+
+for _utterances in UTTERANCE_COUNTS:
+
+    @benchmark(f"schemas.VoiceLoopProcessResponse.model_dump[utterances={_utterances}]")
+    def _model_dump(utterances: int = _utterances):
+        response = _process_response(utterances)
+        return lambda: response.model_dump()
+
+    @benchmark(f"schemas.VoiceLoopProcessResponse.model_validate[utterances={_utterances}]")
+    def _model_validate(utterances: int = _utterances):
+        payload = _process_response(utterances).model_dump()
+        return lambda: VoiceLoopProcessResponse.model_validate(payload)
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import json
+import statistics
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+# A setup function builds its inputs untimed and returns the operation to time, plus an
+# optional reset run (untimed) before every call for operations that mutate their inputs.
+Operation = Callable[[], Any]
+Setup = Callable[[], "Operation | tuple[Operation, Callable[[], None]]"]
+
+REGISTRY: dict[str, Setup] = {}
+
+
+def benchmark(name: str) -> Callable[[Setup], Setup]:
+    def register(setup: Setup) -> Setup:
+        if name in REGISTRY:
+            raise ValueError(f"Duplicate benchmark name: {name}")
+        REGISTRY[name] = setup
+        return setup
+
+    return register
+
+
+@dataclass
+class Result:
+    name: str
+    ns_per_op: float
+    stdev_pct: float
+    loops: int
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"ns_per_op": round(self.ns_per_op, 1), "stdev_pct": round(self.stdev_pct, 1), "loops": self.loops}
+
+
+def measure(name: str, setup: Setup, repeats: int = 5, target_s: float = 0.05) -> Result:
+    """Times ``setup()``'s operation; ``ns_per_op`` is the fastest of ``repeats`` rounds.
+
+    Each round runs enough calls to take about ``target_s`` so timer resolution does not
+    dominate fast operations. With a reset, calls are timed one by one and resets excluded.
+    """
+    built = setup()
+    operation, reset = built if isinstance(built, tuple) else (built, None)
+
+    def run(loops: int) -> int:
+        if reset is None:
+            started = time.perf_counter_ns()
+            for _ in range(loops):
+                operation()
+            return time.perf_counter_ns() - started
+        elapsed = 0
+        for _ in range(loops):
+            reset()
+            started = time.perf_counter_ns()
+            operation()
+            elapsed += time.perf_counter_ns() - started
+        return elapsed
+
+    run(1)  # warm caches and lazy imports
+    loops = 1
+    while True:
+        elapsed = run(loops)
+        if elapsed >= target_s * 1e9 / 5 or loops >= 1_000_000:
+            break
+        loops *= 10 if elapsed < target_s * 1e9 / 50 else 2
+    loops = max(1, int(loops * target_s * 1e9 / max(elapsed, 1)))
+
+    # Like timeit, report the fastest round: slower rounds measure machine noise, not the code.
+    rounds = [run(loops) / loops for _ in range(repeats)]
+    best = min(rounds)
+    stdev = statistics.stdev(rounds) if len(rounds) > 1 else 0.0
+    return Result(name=name, ns_per_op=best, stdev_pct=100 * stdev / best if best else 0.0, loops=loops)
+
+
+def reference_ns() -> float:
+    """Times a fixed pure-Python workload so baselines from other machines can be rescaled."""
+
+    def workload() -> None:
+        total = 0
+        for index in range(2000):
+            total += len(str(index * 31))
+        sorted({str(index): index for index in range(200)}.items())
+
+    return measure("reference", lambda: workload, repeats=15).ns_per_op
+
+
+def load_baseline(path: Path) -> dict[str, Any]:
+    if not path.exists():
+        return {"reference_ns": None, "results": {}}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def save_baseline(path: Path, reference: float, results: list[Result], previous: dict[str, Any] | None = None) -> None:
+    """Writes the baseline, rescaling kept entries so they stay comparable with the new reference."""
+    merged: dict[str, Any] = {}
+    if previous and previous.get("reference_ns"):
+        factor = reference / previous["reference_ns"]
+        for name, entry in previous.get("results", {}).items():
+            merged[name] = {**entry, "ns_per_op": round(entry["ns_per_op"] * factor, 1)}
+    merged.update({result.name: result.to_dict() for result in results})
+    payload = {"reference_ns": round(reference, 1), "results": dict(sorted(merged.items()))}
+    path.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+
+
+def compare(results: list[Result], baseline: dict[str, Any], reference: float, threshold: float) -> list[dict[str, Any]]:
+    """One row per result; ``regressed`` when slower than the (machine-rescaled) baseline by more than ``threshold``."""
+    scale = reference / baseline["reference_ns"] if baseline.get("reference_ns") else 1.0
+    rows = []
+    for result in results:
+        entry = baseline.get("results", {}).get(result.name)
+        row: dict[str, Any] = {"name": result.name, **result.to_dict(), "baseline_ns": None, "change_pct": None, "regressed": False}
+        if entry is not None:
+            expected = entry["ns_per_op"] * scale
+            change = result.ns_per_op / expected - 1
+            row.update(baseline_ns=round(expected, 1), change_pct=round(100 * change, 1), regressed=change > threshold)
+        rows.append(row)
+    return rows
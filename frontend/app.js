@@ -8,7 +8,6 @@ const player = document.getElementById("player");
 const assistantTextEl = document.getElementById("assistantText");
 const statusEl = document.getElementById("status");
 const summaryOutputEl = document.getElementById("summaryOutput");
-let currentAudioUrl = null;
 player.muted = false;
 player.volume = 1.0;
 
@@ -16,33 +15,6 @@ function setStatus(text) {
   statusEl.textContent = text;
 }
 
-function base64ToBlobUrl(base64, mimeType) {
-  const binary = atob(base64);
-  const len = binary.length;
-  const bytes = new Uint8Array(len);
-  for (let i = 0; i < len; i += 1) {
-    bytes[i] = binary.charCodeAt(i);
-  }
-  const blob = new Blob([bytes], { type: mimeType || "audio/mpeg" });
-  return URL.createObjectURL(blob);
-}
-
-function setAudioSource(base64Audio, mimeType) {
-  if (currentAudioUrl) {
-    URL.revokeObjectURL(currentAudioUrl);
-    currentAudioUrl = null;
-  }
-  if (!base64Audio) {
-    player.removeAttribute("src");
-    player.load();
-    return false;
-  }
-  currentAudioUrl = base64ToBlobUrl(base64Audio, mimeType);
-  player.src = currentAudioUrl;
-  player.load();
-  return true;
-}
-
 player.addEventListener("error", () => {
   const mediaErr = player.error;
   if (!mediaErr) {
@@ -118,43 +90,85 @@ document.getElementById("start").onclick = async () => {
   }
 };
 
+function followTurn(job) {
+  return new Promise((resolve, reject) => {
+    const events = new EventSource(job.events_url);
+    events.addEventListener("transcript", (event) => {
+      const data = JSON.parse(event.data);
+      output.textContent = `You said: ${data.text}`;
+      setStatus("Transcribed; thinking...");
+    });
+    events.addEventListener("llm_text", (event) => {
+      const data = JSON.parse(event.data);
+      assistantTextEl.textContent = data.text || "No assistant text in response.";
+      setStatus("Generating audio...");
+    });
+    events.addEventListener("completed", (event) => {
+      events.close();
+      resolve(JSON.parse(event.data));
+    });
+    events.addEventListener("failed", (event) => {
+      events.close();
+      const data = JSON.parse(event.data);
+      reject(new Error(data.detail || `HTTP ${data.status_code}`));
+    });
+    events.onerror = () => {
+      // EventSource reconnects with Last-Event-ID on its own; only give up once it stops trying.
+      if (events.readyState === EventSource.CLOSED) {
+        reject(new Error("lost connection to turn events"));
+      }
+    };
+  });
+}
+
+async function playTurnAudio(done) {
+  if (!done.audio_url) {
+    player.removeAttribute("src");
+    player.load();
+    setStatus("Done (no audio returned)");
+    return;
+  }
+  player.src = done.audio_url;
+  player.load();
+  const provider = done.tts_provider || "unknown_provider";
+  try {
+    await player.play();
+    setStatus(`Done (provider: ${provider}, mime: ${done.tts_mime_type || "unknown"})`);
+  } catch (err) {
+    setStatus(`Audio ready; click play (mime: ${done.tts_mime_type || "unknown"}). ${err}`);
+  }
+}
+
 document.getElementById("stop").onclick = async () => {
   mediaRecorder.onstop = async () => {
     try {
       setStatus("Sending audio to voice loop...");
       const blob = new Blob(chunks, { type: "audio/webm" });
-      const response = await fetch(`/api/v1/voice-loop/process?session_id=${encodeURIComponent(sessionId)}`, {
-        method: "POST",
-        headers: { "Content-Type": "audio/webm" },
-        body: blob,
-      });
+      const response = await fetch(
+        `/api/v1/voice-loop/process?mode=async&session_id=${encodeURIComponent(sessionId)}`,
+        {
+          method: "POST",
+          headers: { "Content-Type": "audio/webm" },
+          body: blob,
+        },
+      );
       if (!response.ok) {
         const failure = await response.json().catch(() => ({}));
         throw new Error(failure.detail || `HTTP ${response.status}`);
       }
-      const data = await response.json();
-      output.textContent = buildOutputForScreen(data);
-
-      const assistantText =
-        data?.llm_response?.text ||
-        data?.response ||
-        data?.message ||
-        "No assistant text in response.";
-      assistantTextEl.textContent = assistantText;
-
-      const hasAudio = setAudioSource(data.tts_audio_b64, data.tts_mime_type);
-      if (hasAudio) {
-        const provider = data.tts_provider || "unknown_provider";
-        const b64Len = data.tts_audio_b64.length;
-        try {
-          await player.play();
-          setStatus(`Done (provider: ${provider}, mime: ${data.tts_mime_type || "unknown"}, b64: ${b64Len})`);
-        } catch (err) {
-          setStatus(`Audio ready; click play (mime: ${data.tts_mime_type || "unknown"}, b64: ${b64Len}). ${err}`);
-        }
-      } else {
-        setStatus("Done (no audio returned)");
+      const job = await response.json();
+      setStatus("Transcribing...");
+      const done = await followTurn(job);
+      if (done.output_status === "interrupted") {
+        // A newer recording for this session superseded this turn; its answer is on the way.
+        setStatus("Interrupted by newer audio");
+        return;
+      }
+      const turn = await fetch(job.status_url).then((res) => res.json());
+      if (turn.result) {
+        output.textContent = buildOutputForScreen(turn.result);
       }
+      await playTurnAudio(done);
     } catch (err) {
       setStatus(`Process error: ${err}`);
     }
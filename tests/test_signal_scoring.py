@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import pytest
+
+from app.services.lexicon import get_lexicon
+from app.services.signal_aggregator import SignalAggregator
+from app.services.signal_scoring import ELEVATED_ESCALATION_RISK, TurnColumns, score_columns
+from app.services.transcript import Utterances
+
+
+def _turn(emotions: list[str]) -> dict:
+    utterances = [
+        {"utterance_uuid": str(index), "text": "okay", "start_ms": index * 1000, "duration_ms": 900, "speaker": 0, "emotion": emotion}
+        for index, emotion in enumerate(emotions)
+    ]
+    return {"user_text": " ".join(item["text"] for item in utterances), "duration_ms": 4000, "utterances": utterances}
+
+
+@pytest.mark.parametrize(
+    "emotions",
+    [
+        ["Happy", "Angry", "Angry", "Happy"],
+        ["Happy", "Angry"],
+        ["Angry", "Happy", "Happy", "Angry", "Sad"],
+        ["Neutral"],
+    ],
+)
+def test_dominant_emotion_ties_match_live_aggregator(emotions: list[str]) -> None:
+    turn = _turn(emotions)
+    utterances = Utterances.from_payloads(turn["utterances"])
+    aggregator = SignalAggregator()
+    for index in range(len(utterances)):
+        aggregator.add_row(utterances, index)
+    live = aggregator.dominant_emotion()
+
+    columns = TurnColumns()
+    columns.append(turn)
+
+    assert columns.emotion_labels == [live.label]
+    assert columns.emotion_confidences == [live.confidence]
+
+
+def test_tied_turn_rescores_to_the_live_emotion() -> None:
+    pytest.importorskip("numpy")
+    columns = TurnColumns()
+    columns.append(_turn(["Happy", "Angry", "Angry", "Happy"]))
+
+    [signals] = score_columns(columns, get_lexicon())
+
+    assert signals["emotion"]["label"] == "Angry"
+    assert signals["sentiment"] == "negative"
+    assert signals["escalation_risk"] == ELEVATED_ESCALATION_RISK